@@ -0,0 +1,113 @@
+import math
+import time
+
+import metrics
+from executor import DeadlineExceeded
+
+# 처리량 추정 EMA 가중치 (최근 배치 비중)
+THROUGHPUT_EMA_ALPHA = 0.2
+
+
+class QueueSaturated(Exception):
+    """토큰 예산이 가득 차 요청을 받을 수 없음 - retry_after 초 후 재시도 권장"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """확보한 예산 1건 - release() 는 여러 경로(정상 종료 / 연결 끊김 / GC)에서 불려도 한 번만 반영"""
+
+    def __init__(self, controller: "AdmissionController", cost: int):
+        self.controller = controller
+        self.cost = cost
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller.release(self.cost)
+
+
+class AdmissionController:
+    """처리 중/대기 중인 입력 토큰 수 기준 admission control (이벤트 루프에서만 호출)
+
+    - 예산(max_tokens)을 넘는 요청은 모델 큐에 넣지 않고 QueueSaturated 로 즉시 거절
+    - 관측 처리량(tokens/s)으로 예상 대기 시간을 계산해 마감 시간을 지킬 수 없는 요청은 DeadlineExceeded 로 거절
+    - 예산이 비어 있으면 예산보다 큰 요청도 하나는 받음 (긴 문서가 영원히 거절되지 않도록)
+    """
+
+    def __init__(self, max_tokens: int, saturation_threshold: float = 0.9):
+        self.max_tokens = max_tokens
+        self.saturation_threshold = saturation_threshold
+        self.in_flight_tokens = 0
+        self.in_flight_requests = 0
+        self.throughput: float | None = None  # 관측 처리량 (tokens/s), 첫 배치 전에는 None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_tokens > 0
+
+    @property
+    def saturation(self) -> float:
+        return self.in_flight_tokens / self.max_tokens if self.enabled else 0.0
+
+    @property
+    def saturated(self) -> bool:
+        return self.enabled and self.saturation >= self.saturation_threshold
+
+    def record_batch(self, tokens: int, seconds: float):
+        """모델 배치 처리 결과로 처리량 추정 갱신"""
+        if tokens <= 0 or seconds <= 0:
+            return
+        rate = tokens / seconds
+        if self.throughput is None:
+            self.throughput = rate
+        else:
+            self.throughput += THROUGHPUT_EMA_ALPHA * (rate - self.throughput)
+
+    def estimated_seconds(self, tokens: int) -> float:
+        """tokens 를 처리하는 데 걸릴 예상 시간 (처리량 관측 전에는 0)"""
+        if not self.throughput:
+            return 0.0
+        return tokens / self.throughput
+
+    def acquire(self, cost: int, deadline: float | None = None) -> AdmissionTicket:
+        """예산 확보 - 실패 시 QueueSaturated / DeadlineExceeded, 성공하면 반드시 ticket.release()"""
+        if self.enabled and self.in_flight_tokens > 0 and self.in_flight_tokens + cost > self.max_tokens:
+            excess = self.in_flight_tokens + cost - self.max_tokens
+            retry_after = min(max(math.ceil(self.estimated_seconds(excess)), 1), 60)
+            metrics.ADMISSION_REJECTED.inc(1, "saturated")
+            raise QueueSaturated(retry_after)
+        if deadline is not None and time.monotonic() + self.estimated_seconds(self.in_flight_tokens + cost) > deadline:
+            metrics.ADMISSION_REJECTED.inc(1, "deadline")
+            raise DeadlineExceeded("Request would miss its deadline")
+        self.in_flight_tokens += cost
+        self.in_flight_requests += 1
+        return AdmissionTicket(self, cost)
+
+    def try_acquire_background(self, cost: int, fraction: float) -> AdmissionTicket | None:
+        """낮은 우선순위 작업 (대량 채점) 예산 확보 - 확보 후 사용률이 fraction 이하일 때만, 아니면 None
+
+        대화형 요청이 쓸 여유를 항상 남기므로 대량 채점 때문에 대화형 요청이 503 으로 거절되지 않음
+        """
+        if self.enabled and self.in_flight_tokens > 0 and self.in_flight_tokens + cost > self.max_tokens * fraction:
+            return None
+        self.in_flight_tokens += cost
+        self.in_flight_requests += 1
+        return AdmissionTicket(self, cost)
+
+    def release(self, cost: int):
+        self.in_flight_tokens -= cost
+        self.in_flight_requests -= 1
+
+    def stats(self) -> dict:
+        return {
+            "queue_tokens": self.in_flight_tokens,
+            "queue_requests": self.in_flight_requests,
+            "queue_capacity_tokens": self.max_tokens,
+            "queue_saturation": round(self.saturation, 4),
+            "saturated": self.saturated,
+            "throughput_tokens_per_s": round(self.throughput, 1) if self.throughput else None,
+        }
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from admission import AdmissionController
+from executor import DeadlineExceeded, InferenceExecutor
+import metrics
+from cascade import STAGE_LLM
+from config import settings
+from model import AITextDetector, bucket_by_tokens
+from tokenization import TokenizerPool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingRequest:
+    input_ids: list[int]
+    future: asyncio.Future
+    deadline: float | None = None
+    enqueued_at: float = 0.0
+    text: str | None = None  # 있으면 추론 후 결과 캐시 / 유사 문단 인덱스에 저장
+
+
+class MicroBatcher:
+    """동시 요청을 모아 토큰 길이별로 묶어 한 번의 forward pass로 처리하는 스케줄러"""
+
+    def __init__(
+        self,
+        detector: AITextDetector,
+        executor: InferenceExecutor,
+        max_batch_size: int,
+        max_wait_ms: float,
+        admission: AdmissionController | None = None,
+        tokenizer_pool: TokenizerPool | None = None
+    ):
+        self.detector = detector
+        self.executor = executor
+        self.admission = admission
+        self.tokenizer_pool = tokenizer_pool
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue[_PendingRequest] | None = None
+        # 텍스트 요청의 캐시 / 유사 문단 / cascade 판정 대기열 (micro-batch 단위로 한 번에 처리)
+        self._cheap_queue: asyncio.Queue[_PendingRequest] | None = None
+        self._worker: asyncio.Task | None = None
+        self._cheap_worker: asyncio.Task | None = None
+
+    async def start(self):
+        """배치 워커 시작 (이벤트 루프 안에서 호출)"""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._cheap_queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        self._cheap_worker = asyncio.create_task(self._run_cheap())
+        logger.info(
+            f"Micro-batcher started: max_batch_size={self.max_batch_size}, "
+            f"max_wait={self.max_wait * 1000:.1f}ms"
+        )
+
+    async def stop(self):
+        """배치 워커 종료, 대기 중인 요청은 취소"""
+        if self._worker is None:
+            return
+        for worker in (self._worker, self._cheap_worker):
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = self._cheap_worker = None
+        for queue in (self._queue, self._cheap_queue):
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+
+    async def submit(
+        self, text: str, deadline: float | None = None, input_ids: list[int] | None = None
+    ) -> tuple[float, str]:
+        """텍스트 한 개를 큐에 넣고 (AI 확률, 응답 단계)를 기다림 (캐시/cascade 로 해결되면 큐를 거치지 않음)
+
+        input_ids 가 없으면 토큰화 풀에서 토큰화합니다.
+        캐시 조회 (SQLite / 유사 문단 MinHash), cascade 판정 (TF-IDF + LR) 은 동시 요청을 micro-batch 로 모아
+        스레드에서 한 번에 실행하고, 결과 저장도 추론 배치 단위로 스레드에서 실행합니다 (이벤트 루프를 막지 않음).
+        """
+        if self._cheap_queue is None:
+            raise RuntimeError("Batcher not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._cheap_queue.put(_PendingRequest(input_ids, future, deadline, time.monotonic(), text))
+        resolved = await future
+        if resolved is not None:
+            return resolved
+        if input_ids is None:
+            if self.tokenizer_pool is not None:
+                input_ids = (await self.tokenizer_pool.encode([text]))[0]
+            else:
+                input_ids = (await self._offload(self.detector.encode, [text]))[0]
+        fold_probs = await self.submit_ids_per_adapter(input_ids, deadline, text)
+        return sum(fold_probs) / len(fold_probs), STAGE_LLM
+
+    async def submit_ids(self, input_ids: list[int], deadline: float | None = None) -> float:
+        """토큰화된 입력 한 개를 큐에 넣고 AI 확률을 기다림 (앙상블이면 fold 평균)"""
+        fold_probs = await self.submit_ids_per_adapter(input_ids, deadline)
+        return sum(fold_probs) / len(fold_probs)
+
+    async def submit_ids_per_adapter(
+        self, input_ids: list[int], deadline: float | None = None, text: str | None = None
+    ) -> list[float]:
+        """토큰화된 입력 한 개를 큐에 넣고 어댑터별 AI 확률을 기다림
+
+        deadline(time.monotonic() 기준)이 지난 요청과 await 가 취소된 요청은 모델에 보내지 않습니다.
+        text 를 주면 배치 추론 후 배치 단위로 결과 캐시에 저장합니다.
+        """
+        if self._queue is None:
+            raise RuntimeError("Batcher not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(input_ids, future, deadline, time.monotonic(), text))
+        return await future
+
+    async def _offload(self, fn, *args):
+        """이벤트 루프를 막는 CPU/디스크 작업을 토큰화 풀 (없으면 기본 executor) 스레드에서 실행"""
+        if self.tokenizer_pool is not None:
+            return await self.tokenizer_pool.run(fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    @property
+    def queue_depth(self) -> int:
+        """큐에서 대기 중인 요청 수"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _collect(self, queue: asyncio.Queue) -> list[_PendingRequest]:
+        """첫 요청 도착 후 max_batch_size 또는 max_wait 까지 요청을 모음"""
+        loop = asyncio.get_running_loop()
+        pending = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(pending) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # 대기 중 추가로 쌓인 요청도 함께 묶음
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        return pending
+
+    def _group_by_length(self, pending: list[_PendingRequest]) -> list[list[_PendingRequest]]:
+        """토큰 길이순 정렬 후 max_batch_size / MAX_BATCH_TOKENS 단위로 분할 (패딩 최소화)"""
+        buckets = bucket_by_tokens(
+            [len(r.input_ids) for r in pending],
+            settings.MAX_BATCH_TOKENS,
+            self.max_batch_size
+        )
+        return [[pending[i] for i in bucket] for bucket in buckets]
+
+    def _drop_abandoned(self, batch: list[_PendingRequest], run_seconds: float = 0.0) -> list[_PendingRequest]:
+        """취소됐거나 마감 시간이 지난 요청 제거 - run_seconds: 배치 예상 실행 시간 (끝나기 전에 마감될 요청도 제거)"""
+        finish = time.monotonic() + run_seconds
+        alive = []
+        for r in batch:
+            if r.future.done():
+                continue
+            if r.deadline is not None and finish > r.deadline:
+                r.future.set_exception(DeadlineExceeded("Request deadline exceeded in queue"))
+                continue
+            alive.append(r)
+        return alive
+
+    async def _run_batch(self, batch: list[_PendingRequest]):
+        run_seconds = 0.0
+        if self.admission is not None:
+            run_seconds = self.admission.estimated_seconds(sum(len(r.input_ids) for r in batch))
+        batch = self._drop_abandoned(batch, run_seconds)
+        if not batch:
+            return
+
+        now = time.monotonic()
+        for r in batch:
+            metrics.STAGE_LATENCY.observe(now - r.enqueued_at, "queue_wait")
+
+        deadlines = [r.deadline for r in batch]
+        # 배치 내 가장 늦은 마감 시간까지는 실행 (일부만 만료돼도 나머지는 살림)
+        deadline = None if None in deadlines else max(deadlines)
+        try:
+            start = time.monotonic()
+            probs = await self.executor.run(
+                self.detector.score_ids_per_adapter, [r.input_ids for r in batch], deadline, deadline=deadline
+            )
+            if self.admission is not None:
+                self.admission.record_batch(sum(len(r.input_ids) for r in batch), time.monotonic() - start)
+        except Exception as e:
+            logger.error(f"Batch inference error: {str(e)}")
+            for r in batch:
+                if not r.future.done():
+                    r.future.set_exception(e)
+            return
+
+        rows = probs.T.tolist()
+        for r, fold_probs in zip(batch, rows):
+            if not r.future.done():
+                r.future.set_result(fold_probs)
+
+        # 결과 캐시 / 유사 문단 인덱스 저장은 응답 후 배치 단위로 (SQLite INSERT + commit 한 번)
+        stored = [(r.text, sum(p) / len(p)) for r, p in zip(batch, rows) if r.text is not None]
+        if stored:
+            try:
+                await self._offload(self.detector.store, [t for t, _ in stored], [p for _, p in stored])
+            except Exception as e:
+                logger.error(f"Result cache store error: {str(e)}")
+
+    async def _run_cheap(self):
+        """텍스트 요청 micro-batch 의 캐시 / 유사 문단 / cascade 판정 - 해결되면 (AI 확률, 단계), 아니면 None 으로 응답"""
+        while True:
+            pending = self._drop_abandoned(await self._collect(self._cheap_queue))
+            if not pending:
+                continue
+            try:
+                ai_probs, stages = await self._offload(self.detector.resolve_cheap, [r.text for r in pending])
+            except Exception as e:
+                logger.error(f"Cheap path error: {str(e)}")
+                ai_probs, stages = [None] * len(pending), [STAGE_LLM] * len(pending)
+            for r, p, stage in zip(pending, ai_probs, stages):
+                if not r.future.done():
+                    r.future.set_result(None if p is None else (p, stage))
+
+    async def _run(self):
+        while True:
+            pending = self._drop_abandoned(await self._collect(self._queue))
+            for batch in self._group_by_length(pending):
+                await self._run_batch(batch)
@@ -0,0 +1,280 @@
+"""
+CSV/JSONL/Parquet 대량 채점 (청크 단위 스트리밍, 중단 시 이어서 실행)
+
+    cd backend
+    python bulk_score.py ../data/kfold_csv/test_preprocessed.parquet ../outputs/test_scores.csv --text-column paragraph_text --id-column ID
+    python bulk_score.py submissions.jsonl scores.parquet --text-column text
+
+입력을 chunk_size 행씩 읽어 AITextDetector.predict_batch_staged 로 채점하고 (길이순 버킷 배치, 캐시/cascade 적용),
+결과를 바로 출력 파일에 씁니다. Parquet 입력은 텍스트/ID 열만 읽습니다. 체크포인트(<output>.checkpoint.json)가 있으면 완료된 청크를 건너뛰고 이어서 실행합니다.
+다음 청크는 토큰화 풀에서 미리 토큰화하므로 토큰화가 현재 청크의 모델 추론과 겹칩니다.
+API job 은 청크를 길이 버킷마다 별도 추론 작업으로 실행하고 버킷마다 낮은 우선순위로 admission 예산을 확보하므로
+(BULK_ADMISSION_FRACTION) 대화형 요청이 버킷 사이에 끼어들 수 있습니다.
+출력 형식은 확장자로 결정: .csv 는 append, .parquet 는 청크별 part 파일을 담은 디렉터리.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from cascade import STAGE_LLM
+from config import settings
+from tokenization import TokenizerPool
+
+logger = logging.getLogger(__name__)
+
+# 예산이 없을 때 버킷 실행을 다시 시도하기까지 대기 시간
+ADMISSION_RETRY_S = 0.05
+
+
+class BulkScorer:
+    """청크 단위 입력 읽기 / 결과 쓰기 / 체크포인트 관리 (모델 호출은 호출하는 쪽에서 수행)"""
+
+    def __init__(
+        self,
+        input_path: str,
+        output_path: str,
+        text_column: str,
+        id_column: str | None = None,
+        chunk_size: int = 1000
+    ):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.text_column = text_column
+        self.id_column = id_column
+        self.chunk_size = chunk_size
+        self.checkpoint_path = output_path + ".checkpoint.json"
+        self.parquet = output_path.endswith(".parquet")
+
+        self.chunks_done = 0
+        self.rows_done = 0
+        self.rows_this_run = 0
+        self.started_at = time.perf_counter()
+        self._output_bytes = 0
+        self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if not os.path.isfile(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if (checkpoint["input_path"], checkpoint["chunk_size"]) != (self.input_path, self.chunk_size):
+            raise ValueError(f"Checkpoint {self.checkpoint_path} was written for a different input or chunk size")
+        self.chunks_done = checkpoint["chunks_done"]
+        self.rows_done = checkpoint["rows_done"]
+        self._output_bytes = checkpoint.get("output_bytes", 0)
+
+        # 체크포인트 이후 일부만 쓰인 CSV 는 마지막 완료 청크 위치로 되돌림
+        if not self.parquet and os.path.isfile(self.output_path):
+            with open(self.output_path, "r+b") as f:
+                f.truncate(self._output_bytes)
+        logger.info(f"Resuming from checkpoint: {self.chunks_done} chunks / {self.rows_done} rows done")
+
+    def _read_chunks(self):
+        if self.input_path.endswith((".jsonl", ".json")):
+            return pd.read_json(self.input_path, lines=True, chunksize=self.chunk_size)
+        if self.input_path.endswith(".parquet"):
+            columns = [self.text_column] + ([self.id_column] if self.id_column else [])
+            batches = pq.ParquetFile(self.input_path, memory_map=True).iter_batches(batch_size=self.chunk_size, columns=columns)
+            return (batch.to_pandas() for batch in batches)
+        return pd.read_csv(self.input_path, encoding="utf-8-sig", chunksize=self.chunk_size)
+
+    def pending_chunks(self):
+        """아직 채점하지 않은 (청크 번호, DataFrame) 순회"""
+        for index, chunk in enumerate(self._read_chunks()):
+            if index < self.chunks_done:
+                continue
+            yield index, chunk
+
+    def texts(self, chunk: pd.DataFrame) -> list[str]:
+        return chunk[self.text_column].fillna("").astype(str).tolist()
+
+    def write(self, index: int, chunk: pd.DataFrame, ai_probs: list[float], stages: list[str]):
+        """청크 결과 저장 후 체크포인트 갱신"""
+        result = pd.DataFrame({"ai_probability": ai_probs, "stage": stages})
+        if self.id_column:
+            result.insert(0, self.id_column, chunk[self.id_column].to_numpy())
+        else:
+            result.insert(0, "row", range(self.rows_done, self.rows_done + len(chunk)))
+
+        if self.parquet:
+            os.makedirs(self.output_path, exist_ok=True)
+            part_path = os.path.join(self.output_path, f"part-{index:05d}.parquet")
+            result.to_parquet(part_path + ".tmp", index=False)
+            os.replace(part_path + ".tmp", part_path)
+        else:
+            write_header = self._output_bytes == 0
+            result.to_csv(
+                self.output_path,
+                mode="w" if write_header else "a",
+                header=write_header,
+                index=False,
+                encoding="utf-8-sig" if write_header else "utf-8"
+            )
+            self._output_bytes = os.path.getsize(self.output_path)
+
+        self.chunks_done = index + 1
+        self.rows_done += len(chunk)
+        self.rows_this_run += len(chunk)
+        self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        checkpoint = {
+            "input_path": self.input_path,
+            "chunk_size": self.chunk_size,
+            "chunks_done": self.chunks_done,
+            "rows_done": self.rows_done,
+            "output_bytes": self._output_bytes,
+        }
+        with open(self.checkpoint_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    @property
+    def rows_per_sec(self) -> float:
+        elapsed = time.perf_counter() - self.started_at
+        return self.rows_this_run / elapsed if elapsed > 0 else 0.0
+
+    def finish(self):
+        """완료 시 체크포인트 제거 (다음 실행은 처음부터)"""
+        if os.path.isfile(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+def run(scorer: BulkScorer, detector, tokenizer_pool: TokenizerPool):
+    """CLI 용 동기 실행 - 청크 N 추론 중에 청크 N+1 토큰화"""
+    chunks = scorer.pending_chunks()
+    item = next(chunks, None)
+    encoding = tokenizer_pool.submit(scorer.texts(item[1])) if item else None
+    while item is not None:
+        index, chunk = item
+        input_ids = encoding.result()
+        item = next(chunks, None)
+        if item is not None:
+            encoding = tokenizer_pool.submit(scorer.texts(item[1]))
+        ai_probs, stages = detector.predict_batch_staged(scorer.texts(chunk), input_ids)
+        scorer.write(index, chunk, ai_probs, stages)
+        logger.info(f"chunk {index}: {scorer.rows_done} rows done ({scorer.rows_per_sec:.1f} rows/sec)")
+    scorer.finish()
+    logger.info(f"Bulk scoring complete: {scorer.rows_done} rows -> {scorer.output_path} ({scorer.rows_per_sec:.1f} rows/sec)")
+
+
+async def score_chunk(detector, executor, admission, texts: list[str], input_ids: list[list[int]]) -> tuple[list[float], list[str]]:
+    """청크 채점 - 캐시/cascade 단계와 길이 버킷마다 별도 executor 작업 (작업 사이에 대화형 요청이 실행될 수 있음)
+
+    admission 이 있으면 작업마다 MAX_BATCH_TOKENS (버킷의 패딩 포함 토큰 수 상한) 를 낮은 우선순위로 확보하고,
+    예산이 없으면 대화형 요청이 끝날 때까지 기다림
+    """
+    ai_probs = [0.0] * len(texts)
+    stages = [STAGE_LLM] * len(texts)
+    steps = detector.iter_predict_batch_staged(texts, input_ids)
+    while True:
+        ticket = None
+        if admission is not None:
+            while (ticket := admission.try_acquire_background(settings.MAX_BATCH_TOKENS, settings.BULK_ADMISSION_FRACTION)) is None:
+                await asyncio.sleep(ADMISSION_RETRY_S)
+        try:
+            step = await executor.run(next, steps, None)
+        finally:
+            if ticket is not None:
+                ticket.release()
+        if step is None:
+            return ai_probs, stages
+        for i, p, stage in zip(*step):
+            ai_probs[i] = p
+            stages[i] = stage
+
+
+async def run_async(scorer: BulkScorer, detector, executor, tokenizer_pool: TokenizerPool, admission=None):
+    """API job 용 비동기 실행 - 파일 I/O 는 별도 스레드, 토큰화는 토큰화 풀, 추론은 inference executor 에서 수행"""
+    chunks = scorer.pending_chunks()
+
+    async def read_and_encode():
+        item = await asyncio.to_thread(next, chunks, None)
+        if item is None:
+            return None
+        return item, await asyncio.wrap_future(tokenizer_pool.submit(scorer.texts(item[1])))
+
+    prepared = await read_and_encode()
+    while prepared is not None:
+        (index, chunk), input_ids = prepared
+        # 다음 청크 읽기/토큰화를 현재 청크 추론과 동시에 진행
+        next_task = asyncio.ensure_future(read_and_encode())
+        try:
+            ai_probs, stages = await score_chunk(detector, executor, admission, scorer.texts(chunk), input_ids)
+            await asyncio.to_thread(scorer.write, index, chunk, ai_probs, stages)
+        except BaseException:
+            next_task.cancel()
+            raise
+        prepared = await next_task
+    scorer.finish()
+
+
+class BulkJob:
+    """백그라운드 대량 채점 job 상태"""
+
+    def __init__(self, job_id: str, scorer: BulkScorer):
+        self.job_id = job_id
+        self.scorer = scorer
+        self.status = "running"
+        self.error = None
+        self.task = None
+        self.finished_at: float | None = None  # time.monotonic() 기준
+
+    def start(self, detector, executor, tokenizer_pool: TokenizerPool, admission=None):
+        self.task = asyncio.create_task(self._run(detector, executor, tokenizer_pool, admission))
+
+    async def _run(self, detector, executor, tokenizer_pool: TokenizerPool, admission=None):
+        try:
+            await run_async(self.scorer, detector, executor, tokenizer_pool, admission)
+            self.status = "completed"
+        except asyncio.CancelledError:
+            # 체크포인트가 남아 있으므로 같은 output 으로 다시 시작하면 이어서 실행
+            self.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Bulk job {self.job_id} failed: {str(e)}")
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.finished_at = time.monotonic()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "input_path": self.scorer.input_path,
+            "output_path": self.scorer.output_path,
+            "rows_done": self.scorer.rows_done,
+            "rows_per_sec": round(self.scorer.rows_per_sec, 2),
+            "error": self.error,
+        }
+
+
+def main():
+    from model import detector
+
+    parser = argparse.ArgumentParser(description="Bulk score CSV/JSONL corpus")
+    parser.add_argument("input", help="입력 CSV/JSONL/Parquet 경로")
+    parser.add_argument("output", help="출력 경로 (.csv 또는 .parquet)")
+    parser.add_argument("--text-column", default="paragraph_text")
+    parser.add_argument("--id-column", default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    detector.load_model()
+    tokenizer_pool = TokenizerPool(detector, settings.TOKENIZER_WORKERS)
+    tokenizer_pool.start()
+    try:
+        run(BulkScorer(args.input, args.output, args.text_column, args.id_column, args.chunk_size), detector, tokenizer_pool)
+    finally:
+        tokenizer_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_HORIZONTAL_SPACE = re.compile(r'[ \t]+')
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화 - 유니코드 NFC, 앞뒤 공백 제거, 연속 공백/탭 축약 (줄바꿈은 유지)"""
+    text = unicodedata.normalize("NFC", text).strip()
+    return _HORIZONTAL_SPACE.sub(" ", text)
+
+
+def content_key(text: str, fingerprint: str) -> str:
+    """정규화된 텍스트 + 모델/어댑터 fingerprint 의 SHA-256"""
+    digest = hashlib.sha256()
+    digest.update(fingerprint.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """content-addressed 예측 결과 캐시 (메모리 LRU + TTL, 선택적 SQLite 디스크 계층)"""
+
+    def __init__(self, max_entries: int, ttl_s: float, sqlite_path: str = ""):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (prob, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, ai_probability REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+            logger.info(f"Result cache disk tier: {sqlite_path}")
+
+    def get(self, key: str) -> float | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT ai_probability, expires_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] >= now:
+                    self._set(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, ai_prob: float):
+        self.put_many([(key, ai_prob)])
+
+    def put_many(self, items: list[tuple[str, float]]):
+        """여러 결과를 한 번에 저장 (디스크 계층은 1회 commit)"""
+        expires_at = time.time() + self.ttl_s
+        with self._lock:
+            for key, ai_prob in items:
+                self._set(key, ai_prob, expires_at)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (key, ai_probability, expires_at) VALUES (?, ?, ?)",
+                    [(key, ai_prob, expires_at) for key, ai_prob in items]
+                )
+                self._db.commit()
+
+    def _set(self, key: str, ai_prob: float, expires_at: float):
+        self._entries[key] = (ai_prob, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
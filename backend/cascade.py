@@ -0,0 +1,78 @@
+import logging
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 응답 단계 (API 응답의 stage 필드)
+STAGE_CASCADE = "cascade"  # 1단계 경량 분류기가 확신 구간에서 응답
+STAGE_LLM = "llm"          # KANANA 모델 (결과 캐시 히트 포함)
+STAGE_NEAR_DUPLICATE = "near_duplicate"  # 유사 문단(MinHash/LSH)의 이전 LLM 점수 재사용
+
+
+def tune_thresholds(probs: np.ndarray, reference: np.ndarray, target_agreement: float) -> tuple[float, float]:
+    """1단계 확률에서 (low, high) 임계값 탐색
+
+    prob <= low 는 사람 작성(0), prob >= high 는 AI 생성(1)으로 1단계에서 바로 응답하며,
+    각 구간에서 reference(라벨 또는 LLM 판정)와의 일치율이 target_agreement 이상인 범위 중 가장 넓은 구간을 고릅니다.
+    조건을 만족하는 구간이 없으면 해당 쪽은 모두 LLM 으로 보냅니다 (low=-1, high=2).
+    """
+    order = np.argsort(probs, kind="stable")
+    p = probs[order]
+    r = reference[order]
+    counts = np.arange(1, len(p) + 1)
+
+    # 낮은 쪽: 오름차순 prefix 중 사람 작성 비율이 목표 이상인 가장 긴 prefix
+    human_rate = np.cumsum(r == 0) / counts
+    valid = np.flatnonzero((human_rate >= target_agreement) & (p < 0.5))
+    low = float(p[valid.max()]) if valid.size else -1.0
+
+    # 높은 쪽: 내림차순 prefix 중 AI 생성 비율이 목표 이상인 가장 긴 prefix
+    p_desc, r_desc = p[::-1], r[::-1]
+    ai_rate = np.cumsum(r_desc == 1) / counts
+    valid = np.flatnonzero((ai_rate >= target_agreement) & (p_desc > 0.5))
+    high = float(p_desc[valid.max()]) if valid.size else 2.0
+
+    return low, high
+
+
+class CascadeClassifier:
+    """문자 n-gram TF-IDF + 로지스틱 회귀 1단계 분류기 - 확신 구간만 직접 응답하고 나머지는 LLM 으로 전달"""
+
+    def __init__(self, pipeline, low: float, high: float, metadata: dict | None = None):
+        self.pipeline = pipeline
+        self.low = low
+        self.high = high
+        self.metadata = metadata or {}
+        self.answered = 0
+        self.escalated = 0
+
+    @classmethod
+    def load(cls, path: str) -> "CascadeClassifier":
+        state = joblib.load(path)
+        cascade = cls(state["pipeline"], state["low"], state["high"], state.get("metadata"))
+        logger.info(f"Cascade classifier loaded: low={cascade.low:.4f}, high={cascade.high:.4f}")
+        return cascade
+
+    def save(self, path: str):
+        joblib.dump(
+            {"pipeline": self.pipeline, "low": self.low, "high": self.high, "metadata": self.metadata},
+            path
+        )
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        """1단계 AI 확률"""
+        return self.pipeline.predict_proba(texts)[:, 1]
+
+    def decide(self, texts: list[str]) -> list[float | None]:
+        """확신 구간이면 1단계 AI 확률, 불확실 구간이면 None (LLM 으로 escalation)"""
+        probs = self.predict_proba(texts)
+        decided = [
+            float(p) if p <= self.low or p >= self.high else None
+            for p in probs
+        ]
+        answered = sum(p is not None for p in decided)
+        self.answered += answered
+        self.escalated += len(decided) - answered
+        return decided
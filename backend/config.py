@@ -4,17 +4,72 @@ class Settings(BaseSettings):
     # Model configuration
     MODEL_NAME: str = "kakaocorp/kanana-1.5-8b-instruct-2505"
     LORA_ADAPTER_PATH: str = "/home/gjfepfm/nugu/models/lora_adapters/kanana"
+    # peft_4bit: bitsandbytes 4-bit + LoRA (GPU) / cpu: LoRA 병합 후 CPU_DTYPE / cpu_int8: 병합 + dynamic int8
+    INFERENCE_BACKEND: str = "peft_4bit"
+    CPU_DTYPE: str = "bfloat16"  # cpu 백엔드 가중치 dtype (bfloat16 / float32)
+    MERGED_MODEL_PATH: str = ""  # export_model.py 로 만든 병합 아티팩트 (지정 시 우선 로딩)
+    # fold 어댑터 앙상블 (JSON 리스트) - 지정 시 LORA_ADAPTER_PATH 대신 하나의 base model 에 모두 로딩해 평균
+    ENSEMBLE_ADAPTER_PATHS: list[str] = []
 
     # Server configuration
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    # HTTP 워커 수 - 1 보다 크면 main.py 가 모델 서버(model_server.py)를 띄우고 워커는 Unix socket 으로 추론 요청
+    HTTP_WORKERS: int = 1
+    MODEL_SERVER_SOCKET: str = ""  # 지정 시 모델을 로딩하지 않고 이 socket 의 모델 서버 사용 (기본: 임시 디렉터리)
 
     # CORS
     CORS_ORIGINS: list = ["*"]  # Allow all origins for external access
 
     # Inference settings
     MAX_TEXT_LENGTH: int = 4096
-    BATCH_SIZE: int = 1
+    BATCH_SIZE: int = 8  # 마이크로 배치 최대 요청 수
+    BATCH_MAX_WAIT_MS: float = 5.0  # 첫 요청 이후 배치를 모으는 최대 대기 시간
+    MAX_BATCH_TOKENS: int = 16384  # 배치당 패딩 포함 최대 토큰 수 (항목 수 x 최대 길이)
+
+    # Long document (sliding window) - 학습 입력이 문단 단위이므로 윈도우도 문단 규모로 잡음 (MAX_TEXT_LENGTH 윈도우보다
+    # 학습 분포에 가깝고, 윈도우별 점수가 세밀함). MAX_BATCH_TOKENS 16384 기준 forward 한 번에 32개 윈도우
+    LONG_WINDOW_TOKENS: int = 512
+    LONG_WINDOW_STRIDE: int = 384  # 윈도우 간 겹침 = WINDOW - STRIDE
+    INFERENCE_WORKERS: int = 1  # 모델 추론 전용 스레드 수
+    TOKENIZER_WORKERS: int = 2  # 토큰화 전용 스레드 수 (모델 forward 와 겹쳐서 실행)
+    TORCH_NUM_THREADS: int = 0  # torch intra-op 스레드 수 (0: CPU 코어 / INFERENCE_WORKERS)
+    REQUEST_TIMEOUT_S: float = 30.0  # 요청별 추론 마감 시간 (X-Request-Timeout-Ms 헤더로 더 짧게 지정 가능)
+
+    # Admission control - 처리 중/대기 중 입력 토큰 예산 (0: 비활성화)
+    ADMISSION_MAX_TOKENS: int = 65536
+    ADMISSION_SATURATION_THRESHOLD: float = 0.9  # 예산 사용률이 이 이상이면 /api/ready 가 503 (saturated)
+    BULK_ADMISSION_FRACTION: float = 0.5  # 대량 채점 job 은 예산 사용률이 이 이하일 때만 버킷 실행 (나머지는 대화형 요청 몫)
+
+    # Cascade (1단계 경량 분류기, train_cascade.py 로 학습)
+    CASCADE_ENABLED: bool = False
+    CASCADE_MODEL_PATH: str = "../models/cascade/cascade.joblib"
+
+    # Early exit (중간 layer probe, notebooks/kanana_early_exit.py 로 학습) - 단일 어댑터 / 병합 모델 전용
+    EARLY_EXIT_ENABLED: bool = False
+    EARLY_EXIT_PROBES_PATH: str = "../models/early_exit/probes.pt"
+
+    # Bulk scoring job API 가 읽고 쓸 수 있는 디렉터리
+    BULK_DATA_DIR: str = "../data"
+    BULK_JOB_TTL_S: float = 3600.0  # 끝난 job(완료/취소/실패) 상태를 조회할 수 있는 시간, 이후 목록에서 제거
+
+    # Result cache
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 100_000  # 메모리 LRU 최대 항목 수
+    CACHE_TTL_S: float = 7 * 24 * 3600  # 결과 유효 시간
+    CACHE_SQLITE_PATH: str = ""  # 지정 시 재시작 후에도 유지되는 디스크 계층 사용
+
+    # Near-duplicate reuse (MinHash/LSH) - 조금 고친 재제출 문단에 이전 점수 재사용
+    NEAR_DUP_ENABLED: bool = False
+    NEAR_DUP_THRESHOLD: float = 0.9  # 추정 Jaccard 유사도 (문자 4-gram) 이상이면 재사용
+    NEAR_DUP_MAX_ENTRIES: int = 50_000  # 메모리 LRU 최대 항목 수
+    NEAR_DUP_MIN_CHARS: int = 100  # 이보다 짧은 문단은 인덱싱/재사용하지 않음
+    NEAR_DUP_SQLITE_PATH: str = ""  # 지정 시 재시작 후에도 유지되는 디스크 계층 사용
+
+    # Prefix KV cache - 끝부분만 고친 재제출 문서는 공통 토큰 접두사의 key/value 를 재사용 (단일 어댑터 전용)
+    PREFIX_CACHE_ENABLED: bool = False
+    PREFIX_CACHE_MAX_BYTES: int = 2 * 1024 ** 3  # 저장한 KV 텐서 메모리 합 상한 (초과 시 LRU 제거)
+    PREFIX_CACHE_MIN_TOKENS: int = 64  # 공통 접두사가 이보다 짧으면 일반 배치 forward 사용
 
     class Config:
         env_file = ".env"
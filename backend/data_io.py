@@ -0,0 +1,130 @@
+"""
+전처리 / 학습 / 채점 데이터 파일 읽기/쓰기 - Parquet 우선, CSV 는 호환용 (형식은 확장자로 결정)
+
+- Parquet: 필요한 열만 읽고 (column projection) memory map 으로 파일을 열어 불필요한 복사를 줄임
+- 토큰 열: 전처리 시 토크나이저 결과를 input_ids (large_list<int32>) 열로 텍스트 옆에 저장
+  스키마 메타데이터에 토크나이저 hash / max_length / 원본 텍스트 열을 기록해 학습 시 설정이 같을 때만 재사용
+- CSV: 원본 데이터와 제출 파일용 (utf-8-sig)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PARQUET_SUFFIX = ".parquet"
+CSV_SUFFIX = ".csv"
+TOKEN_COLUMN = "input_ids"
+
+
+def is_parquet(path: str) -> bool:
+    return path.endswith(PARQUET_SUFFIX)
+
+
+def find_table(directory: str, stem: str) -> str:
+    """{directory}/{stem}.parquet 가 있으면 그 경로, 없으면 {stem}.csv (이전 전처리 결과 호환)"""
+    parquet_path = os.path.join(directory, stem + PARQUET_SUFFIX)
+    return parquet_path if os.path.exists(parquet_path) else os.path.join(directory, stem + CSV_SUFFIX)
+
+
+def table_columns(path: str) -> list[str]:
+    """파일의 열 이름 (Parquet 은 footer, CSV 는 헤더만 읽음)"""
+    if is_parquet(path):
+        return pq.read_schema(path).names
+    return pd.read_csv(path, encoding="utf-8-sig", nrows=0).columns.tolist()
+
+
+def table_metadata(path: str) -> dict[str, str]:
+    """Parquet 스키마 메타데이터 (pandas 메타데이터 제외, CSV 는 빈 dict)"""
+    if not is_parquet(path):
+        return {}
+    metadata = pq.read_schema(path).metadata or {}
+    return {k.decode(): v.decode() for k, v in metadata.items() if k != b"pandas"}
+
+
+def read_arrow(path: str, columns: list[str] | None = None) -> pa.Table:
+    """Parquet -> Arrow Table (columns 만 읽음)"""
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+def read_table(path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Parquet/CSV -> DataFrame (columns 만 읽음, 토큰 열은 제외하고 요청할 것)"""
+    if is_parquet(path):
+        return read_arrow(path, columns).to_pandas()
+    return pd.read_csv(path, encoding="utf-8-sig", usecols=columns)
+
+
+def write_table(
+    df: pd.DataFrame,
+    path: str,
+    tokens: tuple[np.ndarray, np.ndarray] | None = None,
+    metadata: dict[str, str] | None = None
+):
+    """DataFrame -> Parquet/CSV (임시 파일에 쓴 뒤 교체)
+
+    tokens 가 있으면 (tokens, offsets) 를 TOKEN_COLUMN 열로 추가 (Parquet 만)
+    """
+    tmp_path = f"{path}.tmp"
+    if not is_parquet(path):
+        if tokens is not None or metadata:
+            raise ValueError(f"Token columns and metadata require Parquet output: {path}")
+        df.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+        os.replace(tmp_path, path)
+        return
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if tokens is not None:
+        table = table.append_column(TOKEN_COLUMN, token_list_array(*tokens))
+    if metadata:
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            **{k.encode(): str(v).encode() for k, v in metadata.items()}
+        })
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def tokenize_texts(texts: list[str], tokenizer, max_length: int, chunk_size: int = 10_000) -> tuple[np.ndarray, np.ndarray]:
+    """텍스트 -> (이어 붙인 토큰 int32, 경계 offsets int64) - 문단 i = tokens[offsets[i]:offsets[i + 1]]"""
+    chunks = []
+    for start in range(0, len(texts), chunk_size):
+        chunks.extend(tokenizer(texts[start:start + chunk_size], truncation=True, max_length=max_length)["input_ids"])
+    lengths = np.fromiter((len(ids) for ids in chunks), dtype=np.int64, count=len(chunks))
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    tokens = np.fromiter((t for ids in chunks for t in ids), dtype=np.int32, count=int(offsets[-1]))
+    return tokens, offsets
+
+
+def token_list_array(tokens: np.ndarray, offsets: np.ndarray) -> pa.LargeListArray:
+    """(tokens, offsets) -> large_list<int32> (numpy 버퍼를 그대로 사용)"""
+    return pa.LargeListArray.from_arrays(pa.array(offsets, type=pa.int64()), pa.array(tokens, type=pa.int32()))
+
+
+def token_arrays(column: pa.ChunkedArray | pa.Array) -> tuple[np.ndarray, np.ndarray]:
+    """large_list<int32> 열 -> (tokens, offsets) - chunk 가 하나면 Arrow 버퍼를 복사 없이 numpy 로 봄"""
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+    offsets = column.offsets.to_numpy()
+    tokens = column.values.to_numpy()[offsets[0]:offsets[-1]]
+    if offsets[0]:
+        offsets = offsets - offsets[0]
+    return tokens, offsets
+
+
+def token_metadata(tokenizer_digest: str, max_length: int, text_column: str) -> dict[str, str]:
+    """토큰 열을 만든 설정 - 학습 시 이 값이 모두 같아야 토큰 열을 재사용"""
+    return {
+        "tokenizer_hash": tokenizer_digest,
+        "token_max_length": str(max_length),
+        "token_text_column": text_column,
+    }
+
+
+def has_tokens(path: str, expected: dict[str, str]) -> bool:
+    """파일에 expected 설정으로 만든 토큰 열이 있는지 (Parquet footer 만 읽음)"""
+    if not is_parquet(path) or TOKEN_COLUMN not in table_columns(path):
+        return False
+    metadata = table_metadata(path)
+    return all(metadata.get(k) == v for k, v in expected.items())
@@ -0,0 +1,294 @@
+"""
+중간 decoder layer probe 를 이용한 early exit
+
+선택한 layer 출력의 non-pad 평균 pooling 에 로지스틱 회귀 probe 를 붙이고, probe 확률이 확신 구간
+(low 이하 또는 high 이상)이면 그 layer 에서 forward 를 멈춥니다. 확신하지 못한 입력은 끝까지 계산하여
+기존 분류 헤드와 같은 확률을 냅니다. probe 학습은 notebooks/kanana_early_exit.py 를 참고하세요.
+"""
+import logging
+import time
+
+import numpy as np
+import torch
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+# 임계값 calibration 의 일치율 하한 (단측 95%)
+CALIBRATION_Z = 1.645
+
+
+def agreement_lower_bound(rate: np.ndarray, counts: np.ndarray, z: float) -> np.ndarray:
+    """일치율의 Wilson 하한 (z: 단측 정규 분위수, 0 이면 rate 그대로) - 적은 샘플로 정한 구간일수록 낮게 잡음"""
+    if z <= 0:
+        return rate
+    z2 = z * z
+    center = rate + z2 / (2 * counts)
+    spread = z * np.sqrt(rate * (1 - rate) / counts + z2 / (4 * counts * counts))
+    return (center - spread) / (1 + z2 / counts)
+
+
+def tune_exit_thresholds(
+    probs: np.ndarray, reference: np.ndarray, target_agreement: float, z: float = CALIBRATION_Z
+) -> tuple[float, float]:
+    """probe 확률에서 (low, high) 종료 임계값 탐색 - cascade.tune_thresholds 와 같은 구간 탐색을 Wilson 하한으로
+
+    점 추정 일치율로 가장 넓은 구간을 고르면 경계 부근의 calibration 오차에 맞춰져 검증 셋 일치율이 목표보다 낮아지므로,
+    구간 일치율의 하한이 target_agreement 이상인 범위 중 가장 넓은 구간을 고릅니다 (없으면 low=-1, high=2).
+    """
+    order = np.argsort(probs, kind="stable")
+    p = probs[order]
+    r = reference[order]
+    counts = np.arange(1, len(p) + 1)
+
+    human_rate = agreement_lower_bound(np.cumsum(r == 0) / counts, counts, z)
+    valid = np.flatnonzero((human_rate >= target_agreement) & (p < 0.5))
+    low = float(p[valid.max()]) if valid.size else -1.0
+
+    p_desc, r_desc = p[::-1], r[::-1]
+    ai_rate = agreement_lower_bound(np.cumsum(r_desc == 1) / counts, counts, z)
+    valid = np.flatnonzero((ai_rate >= target_agreement) & (p_desc > 0.5))
+    high = float(p_desc[valid.max()]) if valid.size else 2.0
+
+    return low, high
+
+
+def pooled_hidden(hidden: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    """non-pad 토큰 평균 pooling (float32) - shape (batch, hidden)"""
+    mask = attention_mask.unsqueeze(-1).to(torch.float32)
+    return (hidden.float() * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+
+
+def last_token_index(attention_mask: torch.Tensor) -> torch.Tensor:
+    """행별 마지막 non-pad 토큰 위치 (left / right padding 모두)"""
+    positions = torch.arange(attention_mask.shape[1], device=attention_mask.device)
+    return (positions * attention_mask).argmax(dim=-1)
+
+
+def _additive_mask(attention_mask: torch.Tensor, dtype: torch.dtype) -> torch.Tensor:
+    """(batch, 1, seq, seq) causal + key padding mask (LlamaModel 내부 mask 와 같은 의미)"""
+    seq_len = attention_mask.shape[1]
+    causal = torch.ones(seq_len, seq_len, dtype=torch.bool, device=attention_mask.device).tril()
+    allowed = causal[None, None] & attention_mask[:, None, None, :].bool()
+    mask = torch.zeros(allowed.shape, dtype=dtype, device=attention_mask.device)
+    return mask.masked_fill(~allowed, torch.finfo(dtype).min)
+
+
+class ProbeHeads:
+    """layer 별 로지스틱 회귀 probe + 종료 임계값 (StandardScaler 는 가중치에 합쳐서 저장)"""
+
+    def __init__(
+        self,
+        layers: list[int],
+        weight: torch.Tensor,
+        bias: torch.Tensor,
+        low: list[float],
+        high: list[float],
+        metadata: dict | None = None
+    ):
+        self.layers = list(layers)  # probe 를 붙인 layer (0-based, 오름차순) - 이 layer 출력 뒤에서 종료 판단
+        self.weight = weight.float()  # (probe 수, hidden)
+        self.bias = bias.float()  # (probe 수,)
+        self.low = list(low)
+        self.high = list(high)
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, path: str) -> "ProbeHeads":
+        state = torch.load(path, map_location="cpu", weights_only=True)
+        probes = cls(state["layers"], state["weight"], state["bias"], state["low"], state["high"], state.get("metadata"))
+        logger.info(f"Early-exit probes loaded: layers={probes.layers}")
+        return probes
+
+    def save(self, path: str):
+        torch.save({
+            "layers": self.layers,
+            "weight": self.weight,
+            "bias": self.bias,
+            "low": self.low,
+            "high": self.high,
+            "metadata": self.metadata,
+        }, path)
+
+    def predict_proba(self, k: int, pooled: torch.Tensor) -> torch.Tensor:
+        """k 번째 probe 의 AI 확률"""
+        weight = self.weight[k].to(pooled.device)
+        return torch.sigmoid(pooled @ weight + self.bias[k].item())
+
+    def confident(self, k: int, probs: torch.Tensor) -> torch.Tensor:
+        return (probs <= self.low[k]) | (probs >= self.high[k])
+
+    @classmethod
+    def fit(
+        cls,
+        train_features: dict[int, np.ndarray],
+        train_targets: np.ndarray,
+        calib_features: dict[int, np.ndarray],
+        calib_reference: np.ndarray,
+        target_agreement: float,
+        C: float = 1.0,
+        metadata: dict | None = None,
+        z: float = CALIBRATION_Z
+    ) -> "ProbeHeads":
+        """layer 별 probe 학습 후 calibration 셋에서 reference(전체 모델 판정)와의 일치율로 임계값 조정
+
+        calibration 셋은 학습 셋과 분리하고, 이전 layer 에서 종료하지 않은 입력만으로 다음 layer 임계값을 정합니다.
+        종료 구간 일치율은 Wilson 하한(z)으로 비교합니다 (tune_exit_thresholds).
+        """
+        layers = sorted(train_features)
+        weights, biases, lows, highs = [], [], [], []
+        remaining = np.ones(len(calib_reference), dtype=bool)
+        for layer in layers:
+            scaler = StandardScaler().fit(train_features[layer])
+            clf = LogisticRegression(C=C, max_iter=2000)
+            clf.fit(scaler.transform(train_features[layer]), train_targets)
+            # (x - mean) / scale @ w + b  ->  x @ (w / scale) + (b - mean / scale @ w)
+            weight = clf.coef_[0] / scaler.scale_
+            bias = clf.intercept_[0] - float(scaler.mean_ @ weight)
+            weights.append(weight)
+            biases.append(bias)
+
+            probs = 1.0 / (1.0 + np.exp(-(calib_features[layer] @ weight + bias)))
+            if remaining.any():
+                low, high = tune_exit_thresholds(probs[remaining], calib_reference[remaining], target_agreement, z)
+            else:
+                low, high = -1.0, 2.0
+            lows.append(low)
+            highs.append(high)
+            remaining &= ~((probs <= low) | (probs >= high))
+        return cls(
+            layers,
+            torch.tensor(np.stack(weights), dtype=torch.float32),
+            torch.tensor(biases, dtype=torch.float32),
+            lows,
+            highs,
+            metadata
+        )
+
+
+def early_exit_forward(
+    backbone,
+    head,
+    probes: ProbeHeads,
+    input_ids: torch.Tensor,
+    attention_mask: torch.Tensor
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """입력별로 probe 가 확신하는 layer 에서 멈추는 forward - (AI 확률, 실행한 layer 수) 반환
+
+    종료한 행은 배치에서 빼고, 뒤쪽이 모두 패딩인 열은 잘라낸 뒤 다음 layer 를 계산합니다.
+    끝까지 간 입력은 norm + 분류 헤드를 마지막 non-pad 토큰에 적용합니다 (기존 forward 와 동일).
+    """
+    batch, seq_len = input_ids.shape
+    num_layers = len(backbone.layers)
+    probs = torch.empty(batch, dtype=torch.float32)
+    depth = torch.full((batch,), num_layers, dtype=torch.long)
+    rows = torch.arange(batch)
+    probe_index = {layer: k for k, layer in enumerate(probes.layers)}
+
+    hidden = backbone.embed_tokens(input_ids)
+    position_ids = torch.arange(seq_len, device=hidden.device).unsqueeze(0)
+    cos, sin = backbone.rotary_emb(hidden, position_ids)
+    mask = attention_mask.to(hidden.device)
+    causal_mask = _additive_mask(mask, hidden.dtype)
+
+    for layer_idx, layer in enumerate(backbone.layers):
+        length = hidden.shape[1]
+        outputs = layer(
+            hidden,
+            attention_mask=causal_mask,
+            position_ids=position_ids[:, :length],
+            position_embeddings=(cos[:, :length], sin[:, :length]),
+        )
+        hidden = outputs[0] if isinstance(outputs, tuple) else outputs
+
+        k = probe_index.get(layer_idx)
+        if k is None or layer_idx == num_layers - 1:
+            continue
+        probe_probs = probes.predict_proba(k, pooled_hidden(hidden, mask)).cpu()
+        done = probes.confident(k, probe_probs)
+        if not done.any():
+            continue
+        probs[rows[done]] = probe_probs[done]
+        depth[rows[done]] = layer_idx + 1
+        keep = ~done
+        if not keep.any():
+            return probs, depth
+        rows = rows[keep]
+        keep = keep.to(hidden.device)
+        hidden, mask = hidden[keep], mask[keep]
+        # 남은 행이 모두 패딩인 뒤쪽 열 제거 (right padding 에서 긴 입력이 종료하면 짧아짐)
+        length = int(last_token_index(mask).max()) + 1
+        hidden, mask = hidden[:, :length], mask[:, :length]
+        causal_mask = _additive_mask(mask, hidden.dtype)
+
+    hidden = backbone.norm(hidden)
+    last = hidden[torch.arange(hidden.shape[0], device=hidden.device), last_token_index(mask)]
+    logits = head(last)
+    probs[rows] = torch.softmax(logits.float(), dim=-1)[:, 1].cpu()
+    return probs, depth
+
+
+def length_sorted_batches(tokenizer, input_ids: list[list[int]], batch_size: int):
+    """길이순 배치 - (원래 인덱스, 패딩된 입력) yield (패딩 최소화)"""
+    order = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        yield indices, tokenizer.pad({"input_ids": [input_ids[i] for i in indices]}, padding=True, return_tensors="pt")
+
+
+def collect_features(
+    model, tokenizer, input_ids: list[list[int]], layers: list[int], batch_size: int
+) -> tuple[dict[int, np.ndarray], np.ndarray]:
+    """layer 별 pooled hidden state 와 전체 모델 AI 확률 (probe 학습용)"""
+    features = {layer: np.zeros((len(input_ids), model.config.hidden_size), dtype=np.float32) for layer in layers}
+    full_probs = np.zeros(len(input_ids), dtype=np.float32)
+    with torch.no_grad():
+        for indices, inputs in length_sorted_batches(tokenizer, input_ids, batch_size):
+            outputs = model(**inputs, output_hidden_states=True)
+            mask = inputs["attention_mask"].to(outputs.logits.device)
+            # hidden_states[0] 은 embedding, hidden_states[i + 1] 이 layer i 출력
+            for layer in layers:
+                features[layer][indices] = pooled_hidden(outputs.hidden_states[layer + 1], mask).cpu().numpy()
+            full_probs[indices] = torch.softmax(outputs.logits.float(), dim=-1)[:, 1].cpu().numpy()
+    return features, full_probs
+
+
+def evaluate(model, backbone, head, tokenizer, probes: ProbeHeads, input_ids: list[list[int]], batch_size: int) -> dict:
+    """전체 forward 와 early exit 의 지연 시간 / 평균 종료 깊이 / 판정 일치율 비교"""
+    num_layers = len(backbone.layers)
+    full_probs = np.zeros(len(input_ids), dtype=np.float32)
+    exit_probs = np.zeros(len(input_ids), dtype=np.float32)
+    depth = np.zeros(len(input_ids), dtype=np.int64)
+    full_seconds = exit_seconds = 0.0
+    with torch.no_grad():
+        for indices, inputs in length_sorted_batches(tokenizer, input_ids, batch_size):
+            start = time.perf_counter()
+            logits = model(**inputs).logits
+            if logits.is_cuda:
+                torch.cuda.synchronize(logits.device)
+            full_seconds += time.perf_counter() - start
+            full_probs[indices] = torch.softmax(logits.float(), dim=-1)[:, 1].cpu().numpy()
+
+            start = time.perf_counter()
+            probs, layers = early_exit_forward(backbone, head, probes, inputs["input_ids"], inputs["attention_mask"])
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+            exit_seconds += time.perf_counter() - start
+            exit_probs[indices] = probs.numpy()
+            depth[indices] = layers.numpy()
+
+    exits = {str(layer + 1): int((depth == layer + 1).sum()) for layer in probes.layers}
+    exits[str(num_layers)] = int((depth == num_layers).sum())
+    return {
+        "samples": len(input_ids),
+        "num_layers": num_layers,
+        "mean_exit_depth": round(float(depth.mean()), 3),
+        "exit_counts": exits,
+        "agreement": round(float(((full_probs > 0.5) == (exit_probs > 0.5)).mean()), 4),
+        "full_seconds": round(full_seconds, 3),
+        "early_exit_seconds": round(exit_seconds, 3),
+        "latency_saved": round(1 - exit_seconds / full_seconds, 4) if full_seconds else 0.0,
+        "full_probs": full_probs,
+        "early_exit_probs": exit_probs,
+    }
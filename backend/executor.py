@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """요청 마감 시간이 지나 모델 추론을 건너뜀"""
+
+
+class InferenceExecutor:
+    """모델 추론 전용 스레드 풀 (이벤트 루프를 막지 않도록 forward pass를 분리)"""
+
+    def __init__(self, num_workers: int = 1, torch_threads: int = 0):
+        self.num_workers = max(1, num_workers)
+        # 0 이면 CPU 코어를 워커 수로 나눠 intra-op 스레드 수 결정
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // self.num_workers)
+        self._pool: ThreadPoolExecutor | None = None
+
+    def start(self):
+        if self._pool is not None:
+            return
+        torch.set_num_threads(self.torch_threads)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.num_workers,
+            thread_name_prefix="inference"
+        )
+        logger.info(
+            f"Inference executor started: workers={self.num_workers}, "
+            f"torch_threads={self.torch_threads}"
+        )
+
+    def shutdown(self):
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    async def run(self, fn, *args, deadline: float | None = None):
+        """fn(*args) 를 추론 스레드에서 실행
+
+        deadline 은 time.monotonic() 기준이며, 작업이 시작될 때 이미 지났으면 모델을 호출하지 않습니다.
+        대기 중인 작업은 await 하는 쪽이 취소되면 실행되지 않습니다.
+        """
+        if self._pool is None:
+            raise RuntimeError("Inference executor not started")
+
+        def job():
+            if deadline is not None and time.monotonic() > deadline:
+                raise DeadlineExceeded("Request deadline exceeded before inference")
+            return fn(*args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, job)
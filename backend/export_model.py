@@ -0,0 +1,112 @@
+"""
+LoRA 병합 모델 아티팩트 export (서버 cold start 단축용)
+
+    cd backend
+    python export_model.py --output ../models/merged/kanana --dtype bfloat16
+    python export_model.py --output ../models/merged/kanana-4bit --quantize-4bit   # GPU 필요
+
+LORA_ADAPTER_PATH 의 어댑터를 base model 에 병합하여 분류 헤드를 포함한 단일 safetensors 파일(mmap 로딩 가능),
+토크나이저, export_info.json(어댑터 config hash, 토크나이저 hash, PEFT 로딩 시간과 측정 조건)을 저장합니다.
+서버는 MERGED_MODEL_PATH 에 이 경로를 지정하면 아티팩트를 우선 로딩합니다.
+
+- PEFT 로딩 시간은 export 호스트에서 CPU / --dtype / 양자화 없이 측정합니다. 서버는 같은 호스트에서
+  INFERENCE_BACKEND=cpu, CPU_DTYPE=--dtype 로 로딩할 때만 이 시간과 비교해 로그를 남깁니다.
+- 병합 후 양자화는 LoRA delta 까지 4-bit 로 양자화하므로 PEFT 경로(4-bit base + bf16 LoRA)와 수치가 조금 다릅니다.
+  --quantize-4bit 없이 만든 아티팩트를 peft_4bit 로 서빙해도 로딩 시 같은 방식으로 양자화됩니다.
+"""
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import torch
+from peft import PeftConfig, PeftModel
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from config import settings
+from model import EXPORT_INFO_FILE, adapter_hash, bnb_4bit_config, load_profile, tokenizer_hash
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 단일 파일로 저장하기 위한 shard 크기 상한
+SINGLE_SHARD_SIZE = "1000GB"
+
+
+def save_replacing(model, output_dir: str):
+    """임시 디렉터리에 저장한 뒤 파일 단위로 os.replace - 로딩된(mmap) 파일에 직접 덮어쓰지 않음"""
+    tmp_dir = tempfile.mkdtemp(prefix=".export-", dir=output_dir)
+    try:
+        model.save_pretrained(tmp_dir, safe_serialization=True, max_shard_size=SINGLE_SHARD_SIZE)
+        for name in os.listdir(tmp_dir):
+            os.replace(os.path.join(tmp_dir, name), os.path.join(output_dir, name))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def export(adapter_path: str, output_dir: str, dtype: str, quantize_4bit: bool):
+    os.makedirs(output_dir, exist_ok=True)
+
+    # 1. 서버와 같은 PEFT 로딩 경로 (소요 시간을 기록해 startup 시 비교)
+    start = time.perf_counter()
+    peft_config = PeftConfig.from_pretrained(adapter_path)
+    tokenizer = AutoTokenizer.from_pretrained(adapter_path)
+    base_model = AutoModelForSequenceClassification.from_pretrained(
+        peft_config.base_model_name_or_path,
+        num_labels=2,
+        torch_dtype=getattr(torch, dtype)
+    )
+    model = PeftModel.from_pretrained(base_model, adapter_path, is_trainable=False)
+    peft_load_seconds = time.perf_counter() - start
+    logger.info(f"PEFT model loaded in {peft_load_seconds:.1f}s")
+
+    # 2. LoRA 병합 (modules_to_save 분류 헤드 포함) 후 단일 safetensors 저장
+    merged = model.merge_and_unload()
+    merged.eval()
+    save_replacing(merged, output_dir)
+    tokenizer.save_pretrained(output_dir)
+    del model, merged, base_model
+
+    # 3. 선택: 병합 가중치를 4-bit 로 재로딩해 양자화된 상태로 저장 (로딩 시 양자화 생략)
+    if quantize_4bit:
+        quantized = AutoModelForSequenceClassification.from_pretrained(
+            output_dir,
+            quantization_config=bnb_4bit_config(),
+            torch_dtype=torch.bfloat16,
+            device_map="auto"
+        )
+        save_replacing(quantized, output_dir)
+        del quantized
+
+    info = {
+        "config_hash": adapter_hash(adapter_path),
+        "tokenizer_hash": tokenizer_hash(tokenizer),
+        "base_model": peft_config.base_model_name_or_path,
+        "adapter_path": os.path.abspath(adapter_path),
+        "dtype": dtype,
+        "quantized_4bit": quantize_4bit,
+        "peft_load_seconds": round(peft_load_seconds, 2),
+        "peft_load_profile": load_profile("cpu", dtype),
+        "exported_at": dt.datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(output_dir, EXPORT_INFO_FILE), "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    logger.info(f"Merged artifact saved: {output_dir} (config_hash={info['config_hash'][:12]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export merged LoRA model artifact")
+    parser.add_argument("--adapter", default=settings.LORA_ADAPTER_PATH, help="LoRA 어댑터 경로")
+    parser.add_argument("--output", required=True, help="아티팩트 저장 경로")
+    parser.add_argument("--dtype", default="bfloat16", choices=["bfloat16", "float32"])
+    parser.add_argument("--quantize-4bit", action="store_true", help="bitsandbytes 4-bit 로 양자화해 저장 (GPU 필요)")
+    args = parser.parse_args()
+    export(args.adapter, args.output, args.dtype, args.quantize_4bit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import asyncio
+import itertools
+import logging
+import os
+import pickle
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+from executor import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# frame = 4-byte big-endian 길이 + pickle 본문 (같은 호스트의 신뢰된 프로세스 간 통신 전용, socket 은 0600)
+FRAME_HEADER = struct.Struct(">I")
+
+
+class RemoteError(RuntimeError):
+    """모델 서버에서 발생한 예외 (원래 예외 타입 이름 포함)"""
+
+
+def remote_exception(error_type: str, message: str) -> Exception:
+    """모델 서버 오류 응답 -> 예외 (마감 시간 초과는 DeadlineExceeded 그대로 전달)"""
+    if error_type == DeadlineExceeded.__name__:
+        return DeadlineExceeded(message)
+    return RemoteError(f"{error_type}: {message}")
+
+
+def encode_frame(message) -> bytes:
+    body = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader):
+    header = await reader.readexactly(FRAME_HEADER.size)
+    (length,) = FRAME_HEADER.unpack(header)
+    return pickle.loads(await reader.readexactly(length))
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> bytes:
+    chunks = bytearray()
+    while len(chunks) < n:
+        chunk = sock.recv(n - len(chunks))
+        if not chunk:
+            raise ConnectionError("Model server closed the connection")
+        chunks.extend(chunk)
+    return bytes(chunks)
+
+
+class ModelClient:
+    """모델 서버 Unix socket 클라이언트 - 한 연결에서 여러 스레드의 요청을 request id 로 다중화
+
+    요청은 (request_id, method, args, 남은 시간 초 또는 None), 응답은 (request_id, ok, result 또는 (오류 타입, 메시지)) 입니다.
+    프로세스마다 time.monotonic() 기준이 다르므로 마감 시각 대신 남은 시간을 보내고 모델 서버가 마감 시각을 다시 계산합니다.
+    연결이 끊기면 대기 중인 요청은 ConnectionError 로 끝나고 다음 호출 때 다시 연결합니다.
+    """
+
+    def __init__(self, socket_path: str, timeout_s: float):
+        self.socket_path = socket_path
+        self.timeout_s = timeout_s
+        self._sock: socket.socket | None = None
+        self._send_lock = threading.Lock()
+        self._pending: dict[int, Future] = {}
+        self._ids = itertools.count()
+
+    def connect(self, wait_s: float = 0.0):
+        """모델 서버에 연결 - wait_s 동안 socket 이 생길 때까지 재시도 (모델 로딩 대기)"""
+        deadline = time.monotonic() + wait_s
+        while True:
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self.socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.5)
+        self._sock = sock
+        threading.Thread(target=self._read_loop, args=(sock,), name="model-client", daemon=True).start()
+        logger.info(f"Connected to model server at {self.socket_path}")
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def call(self, method: str, *args, deadline: float | None = None):
+        """method(*args) 를 모델 서버에서 실행하고 결과를 기다림 (스레드 안전, deadline 은 time.monotonic() 기준)"""
+        timeout_s = self.timeout_s
+        remaining_s = None
+        if deadline is not None:
+            remaining_s = deadline - time.monotonic()
+            if remaining_s <= 0:
+                raise DeadlineExceeded("Request deadline exceeded before model server call")
+            timeout_s = min(timeout_s, remaining_s)
+        request_id = next(self._ids)
+        future = Future()
+        self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                if self._sock is None:
+                    self.connect()
+                try:
+                    self._sock.sendall(encode_frame((request_id, method, args, remaining_s)))
+                except OSError:
+                    self.close()
+                    raise
+            try:
+                return future.result(timeout_s)
+            except TimeoutError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise DeadlineExceeded("Request deadline exceeded waiting for model server") from None
+                raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _read_loop(self, sock: socket.socket):
+        try:
+            while True:
+                (length,) = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+                request_id, ok, result = pickle.loads(_recv_exactly(sock, length))
+                future = self._pending.get(request_id)
+                if future is None:
+                    continue  # 타임아웃으로 포기한 요청
+                if ok:
+                    future.set_result(result)
+                else:
+                    future.set_exception(remote_exception(*result))
+        except OSError as e:
+            if self._sock is sock:
+                logger.error(f"Model server connection lost: {e}")
+                self._sock = None
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(ConnectionError("Model server connection lost"))
+
+
+def bind_unix_socket(path: str) -> socket.socket:
+    """이전 실행이 남긴 socket 파일을 지우고 소유자 전용(0600)으로 bind"""
+    if os.path.exists(path):
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(old_umask)
+    return sock
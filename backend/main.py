@@ -1,12 +1,28 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+import asyncio
+from contextlib import contextmanager
+import json
 import logging
+import os
+import time
+import uuid
+import weakref
 import torch
 import re
 
 from config import settings
-from schemas import PredictRequest, PredictResponse, HealthResponse, SentenceAnalysisRequest, SentenceAnalysisResponse, OverallAnalysis
+from schemas import PredictRequest, PredictResponse, HealthResponse, SentenceAnalysisRequest, SentenceAnalysisResponse, OverallAnalysis, CacheStatsResponse, EnsemblePredictResponse, BulkScoreRequest, BulkJobStatus, LongPredictRequest, LongPredictResponse, TokenizedPredictRequest, TokenizedPredictResponse, TokenizerInfoResponse
 from model import detector
+from admission import AdmissionController, AdmissionTicket, QueueSaturated
+from batcher import MicroBatcher
+from tokenization import TokenizerPool
+import metrics
+from bulk_score import BulkJob, BulkScorer
+from cascade import STAGE_LLM
+from executor import DeadlineExceeded, InferenceExecutor
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +35,83 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# 모델 추론 전용 executor (이벤트 루프 blocking 방지)
+inference_executor = InferenceExecutor(settings.INFERENCE_WORKERS, settings.TORCH_NUM_THREADS)
+
+# 토큰화 전용 스레드 풀 (모델 forward 와 겹쳐서 실행, 동시 요청은 batch 토큰화)
+tokenizer_pool = TokenizerPool(detector, settings.TOKENIZER_WORKERS)
+
+# 입력 토큰 기준 admission control (예산 초과 시 503 + Retry-After, 마감 시간을 지킬 수 없으면 504)
+admission = AdmissionController(settings.ADMISSION_MAX_TOKENS, settings.ADMISSION_SATURATION_THRESHOLD)
+
+# Micro-batching scheduler (동시 /api/predict 요청을 묶어서 추론)
+batcher = MicroBatcher(
+    detector, inference_executor, settings.BATCH_SIZE, settings.BATCH_MAX_WAIT_MS, admission, tokenizer_pool
+)
+
+# 서비스 상태 gauge (조회 시점에 읽음)
+metrics.Gauge("batcher_queue_depth", "Requests waiting in the micro-batching queue", lambda: {(): batcher.queue_depth})
+metrics.Gauge("admission_queue_tokens", "Input tokens admitted and not yet finished", lambda: {(): admission.in_flight_tokens})
+metrics.Gauge("admission_queue_saturation", "Admitted tokens / ADMISSION_MAX_TOKENS", lambda: {(): admission.saturation})
+metrics.Gauge(
+    "result_cache_events", "Result cache counters (hits, disk_hits, misses, entries)",
+    lambda: {
+        (key,): value for key, value in detector.cache_stats().items()
+        if key in ("hits", "disk_hits", "misses", "entries")
+    },
+    ("event",)
+)
+metrics.Gauge(
+    "near_duplicate_events", "Near-duplicate index counters (reused = model calls saved, misses, entries)",
+    lambda: {
+        (key,): value for key, value in detector.near_duplicate_stats().items()
+        if key in ("reused", "misses", "entries")
+    },
+    ("event",)
+)
+metrics.Gauge(
+    "prefix_cache_events", "Prefix KV cache counters (hits, misses, entries, bytes, reused_tokens = tokens not recomputed)",
+    lambda: {
+        (key,): value for key, value in detector.prefix_cache_stats().items()
+        if key in ("hits", "misses", "entries", "bytes", "reused_tokens")
+    },
+    ("event",)
+)
+metrics.Gauge("result_cache_hit_rate", "Result cache hit rate", lambda: {(): detector.cache_stats().get("hit_rate", 0.0)})
+metrics.Gauge(
+    "cascade_decisions", "Inputs answered by the cascade first stage vs escalated to the LLM",
+    lambda: {} if detector.cascade is None else {
+        ("answered",): detector.cascade.answered,
+        ("escalated",): detector.cascade.escalated
+    },
+    ("decision",)
+)
+
+# 대량 채점 job (job_id -> BulkJob) - 끝난 job 은 BULK_JOB_TTL_S 이후 제거
+bulk_jobs: dict[str, BulkJob] = {}
+
+# 클라이언트 연결 끊김 확인 주기
+DISCONNECT_POLL_INTERVAL_S = 0.1
+
+# 클라이언트 지정 마감 시간 (요청 도착 기준 ms, REQUEST_TIMEOUT_S 보다 길게는 불가)
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+# 문단 구분자 (빈 줄 기준 - 두 번 이상의 연속 줄바꿈)
+PARAGRAPH_SEPARATOR = re.compile(r'\n\s*\n')
+
+def split_paragraphs(text: str) -> tuple[list[str], list[int]]:
+    """빈 줄 기준 문단 분리 - (문단 리스트, 원문 기준 각 문단의 끝 문자 위치)"""
+    paragraphs, char_ends = [], []
+    start = 0
+    bounds = [(m.start(), m.end()) for m in PARAGRAPH_SEPARATOR.finditer(text)] + [(len(text), len(text))]
+    for sep_start, sep_end in bounds:
+        segment = text[start:sep_start]
+        if segment.strip():
+            paragraphs.append(segment.strip())
+            char_ends.append(start + len(segment.rstrip()))
+        start = sep_end
+    return paragraphs, char_ends
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -28,75 +121,486 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """엔드포인트별 지연 시간 기록 (라우트 템플릿 기준)"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    endpoint = route.path if route is not None else "unmatched"
+    metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint, str(response.status_code))
+    return response
+
 @app.on_event("startup")
 async def startup_event():
     """Load model on startup"""
     logger.info("Starting up API server...")
-    detector.load_model()
+    inference_executor.start()
+    tokenizer_pool.start()
+    if settings.MODEL_SERVER_SOCKET:
+        # HTTP 워커 모드: 모델은 model_server.py 프로세스에 한 번만 로딩
+        detector.connect_model_server(settings.MODEL_SERVER_SOCKET)
+    else:
+        detector.load_model()
+    await batcher.start()
     logger.info("API server ready")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop batching worker on shutdown"""
+    await batcher.stop()
+    inference_executor.shutdown()
+    tokenizer_pool.shutdown()
+
+async def run_inference(http_request: Request, coro, deadline: float):
+    """추론 코루틴 실행 - 마감 시간 초과 또는 클라이언트 연결 끊김 시 취소
+
+    취소된 요청은 큐/executor 에서 빠지므로 모델 시간을 쓰지 않습니다.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            timeout = min(DISCONNECT_POLL_INTERVAL_S, deadline - time.monotonic())
+            if timeout <= 0:
+                raise HTTPException(status_code=504, detail="Inference deadline exceeded")
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                raise HTTPException(status_code=499, detail="Client closed request")
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Inference deadline exceeded")
+    finally:
+        task.cancel()
+
+def request_deadline(http_request: Request) -> float:
+    """요청 마감 시간 (time.monotonic 기준) - DEADLINE_HEADER 와 REQUEST_TIMEOUT_S 중 짧은 쪽"""
+    timeout_s = settings.REQUEST_TIMEOUT_S
+    value = http_request.headers.get(DEADLINE_HEADER)
+    if value is not None:
+        try:
+            timeout_ms = float(value)
+        except ValueError:
+            timeout_ms = float("nan")
+        if not timeout_ms > 0:
+            raise HTTPException(status_code=400, detail=f"{DEADLINE_HEADER} must be a positive number")
+        timeout_s = min(timeout_s, timeout_ms / 1000)
+    return time.monotonic() + timeout_s
+
+def admit(cost: int, deadline: float) -> AdmissionTicket:
+    """admission 예산 확보 - 성공하면 반드시 ticket.release()"""
+    try:
+        return admission.acquire(cost, deadline)
+    except QueueSaturated as e:
+        raise HTTPException(
+            status_code=503, detail="Inference queue saturated", headers={"Retry-After": str(e.retry_after)}
+        )
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Request would miss its deadline")
+
+@contextmanager
+def admitted(cost: int, deadline: float):
+    ticket = admit(cost, deadline)
+    try:
+        yield
+    finally:
+        ticket.release()
+
+def token_cost(input_ids: list[list[int]]) -> int:
+    """admission 비용 - 모델에 들어갈 (MAX_TEXT_LENGTH 로 잘린) 입력 토큰 수 합"""
+    return sum(len(ids) for ids in input_ids)
+
+async def encode_analysis(text: str, paragraphs: list[str], mode: str) -> list[list[int]]:
+    """문단 분석 입력 토큰화 - single_pass 는 전체 텍스트만, independent 는 [전체] + 문단별"""
+    return await tokenizer_pool.encode([text] if mode == "single_pass" else [text] + paragraphs)
+
 @app.get("/api/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness) - 프로세스가 응답하면 항상 200, admission 상태는 참고용"""
     return HealthResponse(
         status="healthy",
-        model_loaded=detector.model is not None,
-        gpu_available=torch.cuda.is_available()
+        model_loaded=detector.ready,
+        gpu_available=torch.cuda.is_available(),
+        **admission.stats()
+    )
+
+@app.get("/api/ready", response_model=HealthResponse)
+async def readiness_check(response: Response):
+    """Readiness - 모델 로딩 전이거나 admission 예산이 포화되면 503 (로드밸런서가 다른 replica 로 라우팅)"""
+    status = "ready"
+    if not detector.ready:
+        status = "loading"
+    elif admission.saturated:
+        status = "saturated"
+    if status != "ready":
+        response.status_code = 503
+    return HealthResponse(
+        status=status,
+        model_loaded=detector.ready,
+        gpu_available=torch.cuda.is_available(),
+        **admission.stats()
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/cache", response_model=CacheStatsResponse)
+def cache_stats():
+    """Result cache hit/miss counters + near-duplicate reuse (model calls saved) + prefix KV cache reuse"""
+    # 모델 서버 모드에서는 prefix KV 캐시 통계를 socket 으로 조회하므로 스레드풀에서 실행
+    return CacheStatsResponse(
+        **detector.cache_stats(),
+        near_duplicate=detector.near_duplicate_stats(),
+        prefix_cache=detector.prefix_cache_stats()
     )
 
 @app.post("/api/predict", response_model=PredictResponse)
-async def predict(request: PredictRequest):
+async def predict(request: PredictRequest, http_request: Request):
     """Predict AI generation probability"""
+    deadline = request_deadline(http_request)
     try:
-        result = detector.predict(request.text)
+        input_ids = await tokenizer_pool.encode([request.text])
+        with admitted(token_cost(input_ids), deadline):
+            ai_prob, stage = await run_inference(
+                http_request, batcher.submit(request.text, deadline, input_ids[0]), deadline
+            )
+        result = detector.format_result(ai_prob)
         return PredictResponse(
             text=request.text[:100] + "..." if len(request.text) > 100 else request.text,
             ai_probability=result["ai_probability"],
             prediction=result["prediction"],
             confidence=result["confidence"],
-            char_count=len(request.text)
+            char_count=len(request.text),
+            stage=stage
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail="Prediction failed")
 
-@app.post("/api/analyze-sentences", response_model=SentenceAnalysisResponse)
-async def analyze_sentences(request: SentenceAnalysisRequest):
-    """Analyze text paragraph by paragraph (배치 처리)"""
-    try:
-        # 1. 전체 텍스트 평가 (한 번에)
-        full_result = detector.predict(request.text)
+@app.get("/api/tokenizer", response_model=TokenizerInfoResponse)
+async def tokenizer_info():
+    """사전 토큰화 클라이언트용 토크나이저 정보 - /api/predict-ids 에 tokenizer_hash 를 함께 보냄"""
+    if not detector.ready:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return TokenizerInfoResponse(
+        tokenizer_hash=detector.tokenizer_digest,
+        vocab_size=len(detector.tokenizer),
+        max_length=settings.MAX_TEXT_LENGTH
+    )
 
-        # 2. 문단 분리 (빈 줄 기준 - 두 번 이상의 연속 줄바꿈)
-        paragraphs = re.split(r'\n\s*\n', request.text)
-        paragraphs = [p.strip() for p in paragraphs if p.strip()]
+@app.post("/api/predict-ids", response_model=TokenizedPredictResponse)
+async def predict_ids(request: TokenizedPredictRequest, http_request: Request):
+    """사전 토큰화된 입력 예측 - 서버 토큰화를 건너뜀 (결과 캐시 / cascade 는 텍스트 기준이라 사용하지 않음)"""
+    if not detector.ready:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if request.tokenizer_hash != detector.tokenizer_digest:
+        raise HTTPException(status_code=409, detail="Tokenizer hash mismatch, fetch /api/tokenizer and re-tokenize")
+    input_ids = request.input_ids
+    if len(input_ids) > settings.MAX_TEXT_LENGTH:
+        raise HTTPException(status_code=422, detail=f"input_ids longer than {settings.MAX_TEXT_LENGTH} tokens")
+    vocab_size = len(detector.tokenizer)
+    if any(token_id < 0 or token_id >= vocab_size for token_id in input_ids):
+        raise HTTPException(status_code=422, detail=f"input_ids must be in [0, {vocab_size})")
+    deadline = request_deadline(http_request)
+    try:
+        with admitted(len(input_ids), deadline):
+            ai_prob = await run_inference(http_request, batcher.submit_ids(input_ids, deadline), deadline)
+        result = detector.format_result(ai_prob)
+        return TokenizedPredictResponse(num_tokens=len(input_ids), stage=STAGE_LLM, **result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Tokenized prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Prediction failed")
 
-        # 3. 문단별 배치 처리
-        paragraph_probs = detector.predict_batch(paragraphs)
+@app.post("/api/predict-ensemble", response_model=EnsemblePredictResponse)
+async def predict_ensemble(request: PredictRequest, http_request: Request):
+    """Fold 어댑터 앙상블 평균 + fold 별 확률/표준편차"""
+    deadline = request_deadline(http_request)
+    try:
+        # 어댑터 수만큼 forward
+        cost = token_cost(await tokenizer_pool.encode([request.text])) * max(len(detector.adapter_names), 1)
+        with admitted(cost, deadline):
+            result = await run_inference(
+                http_request,
+                inference_executor.run(detector.predict_ensemble, request.text, deadline=deadline),
+                deadline
+            )
+        return EnsemblePredictResponse(
+            text=request.text[:100] + "..." if len(request.text) > 100 else request.text,
+            char_count=len(request.text),
+            **result
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Ensemble prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Prediction failed")
 
-        paragraph_analysis = [
-            {"text": para, "ai_probability": prob}
-            for para, prob in zip(paragraphs, paragraph_probs)
-        ]
+@app.post("/api/predict-long", response_model=LongPredictResponse)
+async def predict_long(request: LongPredictRequest, http_request: Request):
+    """MAX_TEXT_LENGTH 를 넘는 문서 - 겹치는 토큰 윈도우 점수를 pooling 으로 집계"""
+    deadline = request_deadline(http_request)
+    window_tokens = request.window_tokens or settings.LONG_WINDOW_TOKENS
+    stride = request.stride or settings.LONG_WINDOW_STRIDE
+    try:
+        # 겹치는 윈도우를 모두 forward (detector 와 같은 윈도우 배치로 계산)
+        num_tokens = (await tokenizer_pool.count_tokens([request.text]))[0]
+        cost = detector.predict_long_cost(num_tokens, window_tokens, stride)
+        with admitted(cost, deadline):
+            result = await run_inference(
+                http_request,
+                inference_executor.run(
+                    detector.predict_long, request.text, request.pooling, window_tokens, stride, deadline=deadline
+                ),
+                deadline
+            )
+        return LongPredictResponse(char_count=len(request.text), **result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Long document prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Prediction failed")
 
-        paragraph_avg = sum(paragraph_probs) / len(paragraph_probs) if paragraph_probs else 0.0
+@app.post("/api/analyze-sentences", response_model=SentenceAnalysisResponse)
+async def analyze_sentences(request: SentenceAnalysisRequest, http_request: Request):
+    """Analyze text paragraph by paragraph (배치 처리)"""
+    deadline = request_deadline(http_request)
+    try:
+        # 1. 문단 분리 (빈 줄 기준 - 두 번 이상의 연속 줄바꿈)
+        paragraphs, char_ends = split_paragraphs(request.text)
 
-        # 4. 전체 평가 결과 구성
-        overall_analysis = OverallAnalysis(
-            full_text_probability=full_result["ai_probability"],
-            prediction=full_result["prediction"],
-            confidence=full_result["confidence"]
-        )
+        # 2. 전체 텍스트 평가 + 문단별 점수 (토큰화는 토큰화 풀, 추론은 추론 스레드에서 실행)
+        input_ids = await encode_analysis(request.text, paragraphs, request.mode)
+        with admitted(token_cost(input_ids), deadline):
+            if request.mode == "single_pass":
+                # 전체 텍스트 1회 forward, 문단 끝 토큰 위치에서 분류 헤드 적용
+                full_prob, paragraph_probs = await run_inference(
+                    http_request,
+                    inference_executor.run(
+                        detector.predict_prefixes, request.text, char_ends, deadline, deadline=deadline
+                    ),
+                    deadline
+                )
+                full_stage, paragraph_stages = STAGE_LLM, [STAGE_LLM] * len(paragraphs)
+            else:
+                # 전체 텍스트 + 문단별 독립 배치 처리 (cascade 확신 구간은 모델 생략)
+                (full_prob, full_stage), (paragraph_probs, paragraph_stages) = await run_inference(
+                    http_request,
+                    asyncio.gather(
+                        batcher.submit(request.text, deadline, input_ids[0]),
+                        inference_executor.run(
+                            detector.predict_batch_staged, paragraphs, input_ids[1:], deadline=deadline
+                        )
+                    ),
+                    deadline
+                )
 
-        return SentenceAnalysisResponse(
-            overall_analysis=overall_analysis,
-            paragraph_analysis=paragraph_analysis,
-            paragraph_average=paragraph_avg
+        # 3. 전체 평가 결과 구성
+        return build_analysis_response(
+            paragraphs, paragraph_probs, paragraph_stages, full_prob, full_stage, request.mode
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Paragraph analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail="Analysis failed")
 
+def build_analysis_response(
+    paragraphs: list[str],
+    paragraph_probs: list[float],
+    paragraph_stages: list[str],
+    full_prob: float,
+    full_stage: str,
+    mode: str
+) -> SentenceAnalysisResponse:
+    """문단별 분석 응답 구성 (일반/스트리밍 엔드포인트 공용)"""
+    full_result = detector.format_result(full_prob)
+
+    paragraph_analysis = [
+        {"text": para, "ai_probability": prob, "stage": stage}
+        for para, prob, stage in zip(paragraphs, paragraph_probs, paragraph_stages)
+    ]
+
+    paragraph_avg = sum(paragraph_probs) / len(paragraph_probs) if paragraph_probs else 0.0
+
+    overall_analysis = OverallAnalysis(
+        full_text_probability=full_result["ai_probability"],
+        prediction=full_result["prediction"],
+        confidence=full_result["confidence"],
+        stage=full_stage
+    )
+
+    return SentenceAnalysisResponse(
+        overall_analysis=overall_analysis,
+        paragraph_analysis=paragraph_analysis,
+        paragraph_average=paragraph_avg,
+        mode=mode
+    )
+
+def ndjson_event(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+@app.post("/api/analyze-sentences/stream")
+async def analyze_sentences_stream(request: SentenceAnalysisRequest, http_request: Request):
+    """문단별 분석 스트리밍 (NDJSON)
+
+    길이 버킷 추론이 끝날 때마다 {"type": "paragraphs", "items": [...]} 를 보내고,
+    마지막에 {"type": "overall", ...} 로 /api/analyze-sentences 와 같은 전체 응답을 보냅니다.
+    오류 시 {"type": "error", "detail": ...} 를 보내고 종료합니다.
+    admission 거절(503/504)은 스트림 시작 전에 일반 HTTP 오류로 응답합니다.
+    """
+    deadline = request_deadline(http_request)
+    paragraphs, char_ends = split_paragraphs(request.text)
+    input_ids = await encode_analysis(request.text, paragraphs, request.mode)
+    ticket = admit(token_cost(input_ids), deadline)
+
+    async def events():
+        paragraph_probs = [0.0] * len(paragraphs)
+        paragraph_stages = [STAGE_LLM] * len(paragraphs)
+        full_task = None
+
+        def paragraph_event(indices):
+            return ndjson_event({
+                "type": "paragraphs",
+                "items": [
+                    {
+                        "index": i,
+                        "text": paragraphs[i],
+                        "ai_probability": paragraph_probs[i],
+                        "stage": paragraph_stages[i]
+                    }
+                    for i in indices
+                ]
+            })
+
+        try:
+            if request.mode == "single_pass":
+                full_prob, paragraph_probs = await inference_executor.run(
+                    detector.predict_prefixes, request.text, char_ends, deadline, deadline=deadline
+                )
+                full_stage = STAGE_LLM
+                yield paragraph_event(range(len(paragraphs)))
+            else:
+                # 전체 텍스트는 배처에서, 문단은 버킷 단위로 추론 스레드에서 진행
+                full_task = asyncio.ensure_future(batcher.submit(request.text, deadline, input_ids[0]))
+                steps = detector.iter_predict_batch_staged(paragraphs, input_ids[1:])
+                while True:
+                    step = await inference_executor.run(next, steps, None, deadline=deadline)
+                    if step is None:
+                        break
+                    indices, probs, stages = step
+                    for i, p, stage in zip(indices, probs, stages):
+                        paragraph_probs[i] = p
+                        paragraph_stages[i] = stage
+                    yield paragraph_event(indices)
+                full_prob, full_stage = await full_task
+
+            response = build_analysis_response(
+                paragraphs, paragraph_probs, paragraph_stages, full_prob, full_stage, request.mode
+            )
+            yield ndjson_event({"type": "overall", **response.model_dump()})
+        except DeadlineExceeded:
+            yield ndjson_event({"type": "error", "detail": "Inference deadline exceeded"})
+        except Exception as e:
+            logger.error(f"Streaming paragraph analysis error: {str(e)}")
+            yield ndjson_event({"type": "error", "detail": "Analysis failed"})
+        finally:
+            # 클라이언트가 끊으면 남은 전체 텍스트 추론도 취소
+            if full_task is not None:
+                full_task.cancel()
+            ticket.release()
+
+    # 본문을 한 번도 읽지 않고 끝나는 경우 (시작 전 연결 끊김, 응답 미전송) 에도 예산을 돌려주도록
+    # 응답 완료 후 background task 와 응답 객체 해제 시점에도 release (ticket 이 한 번만 반영)
+    response = StreamingResponse(
+        events(), media_type="application/x-ndjson", background=BackgroundTask(ticket.release)
+    )
+    weakref.finalize(response, ticket.release)
+    return response
+
+def resolve_data_path(path: str) -> str:
+    """BULK_DATA_DIR 기준 경로 해석 - 디렉터리 밖으로 나가는 경로는 거부"""
+    root = os.path.realpath(settings.BULK_DATA_DIR)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise HTTPException(status_code=400, detail="Path must be inside BULK_DATA_DIR")
+    return resolved
+
+def prune_bulk_jobs():
+    """끝난 지 BULK_JOB_TTL_S 가 지난 job 제거 (이후 조회는 404)"""
+    expired_before = time.monotonic() - settings.BULK_JOB_TTL_S
+    for job_id in [job_id for job_id, job in bulk_jobs.items()
+                   if job.finished_at is not None and job.finished_at < expired_before]:
+        del bulk_jobs[job_id]
+
+@app.post("/api/jobs/bulk-score", response_model=BulkJobStatus)
+async def start_bulk_score(request: BulkScoreRequest):
+    """CSV/JSONL/Parquet 대량 채점 job 시작 (같은 output 의 체크포인트가 있으면 이어서 실행)"""
+    prune_bulk_jobs()
+    input_path = resolve_data_path(request.input_path)
+    output_path = resolve_data_path(request.output_path)
+    if not os.path.isfile(input_path):
+        raise HTTPException(status_code=404, detail="Input file not found")
+    if any(job.status == "running" and job.scorer.output_path == output_path for job in bulk_jobs.values()):
+        raise HTTPException(status_code=409, detail="A job is already writing to this output")
+    try:
+        scorer = BulkScorer(input_path, output_path, request.text_column, request.id_column, request.chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    job = BulkJob(uuid.uuid4().hex[:12], scorer)
+    bulk_jobs[job.job_id] = job
+    job.start(detector, inference_executor, tokenizer_pool, admission)
+    return BulkJobStatus(**job.to_dict())
+
+@app.get("/api/jobs/{job_id}", response_model=BulkJobStatus)
+async def get_bulk_job(job_id: str):
+    """대량 채점 job 진행 상태"""
+    prune_bulk_jobs()
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return BulkJobStatus(**job.to_dict())
+
+@app.delete("/api/jobs/{job_id}", response_model=BulkJobStatus)
+async def cancel_bulk_job(job_id: str):
+    """대량 채점 job 중단 (체크포인트는 유지)"""
+    prune_bulk_jobs()
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.task is not None and not job.task.done():
+        job.task.cancel()
+        try:
+            await job.task
+        except asyncio.CancelledError:
+            pass
+    return BulkJobStatus(**job.to_dict())
+
 if __name__ == "__main__":
+    import tempfile
     import uvicorn
-    uvicorn.run(app, host=settings.HOST, port=settings.PORT)
+    if settings.HTTP_WORKERS > 1:
+        # 워커마다 모델을 올리지 않도록 모델 서버 프로세스 하나를 띄우고 워커는 socket 으로 연결
+        from model_server import spawn
+        socket_path = settings.MODEL_SERVER_SOCKET or os.path.join(
+            tempfile.gettempdir(), f"ai-detector-model-{settings.PORT}.sock"
+        )
+        os.environ["MODEL_SERVER_SOCKET"] = socket_path
+        model_server = spawn(socket_path)
+        try:
+            # 워커는 spawn 시 torch/transformers 를 다시 import 하므로 기본 healthcheck(5s)보다 길게 대기
+            uvicorn.run(
+                "main:app", host=settings.HOST, port=settings.PORT, workers=settings.HTTP_WORKERS,
+                timeout_worker_healthcheck=120
+            )
+        finally:
+            model_server.terminate()
+            model_server.wait()
+    else:
+        uvicorn.run(app, host=settings.HOST, port=settings.PORT)
@@ -0,0 +1,169 @@
+"""
+Prometheus text format 메트릭 (외부 의존성 없음)
+
+관측은 스레드별 shard 에만 기록하므로 hot path 에 lock 이 없고, /metrics 요청 시에만 shard 를 합산합니다.
+"""
+import bisect
+import os
+import threading
+
+import torch
+
+
+class _Sharded:
+    """스레드별 shard(dict: labels -> row) 관리 - shard 등록 시에만 lock 사용"""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._shards: list[dict] = []
+        self._local = threading.local()
+        self._register_lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _row(self, labels: tuple, size: int) -> list:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._register_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        row = shard.get(labels)
+        if row is None:
+            row = shard[labels] = [0] * size
+        return row
+
+    def _merged(self, size: int) -> dict[tuple, list]:
+        merged = {}
+        with self._register_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, row in list(shard.items()):
+                total = merged.setdefault(labels, [0] * size)
+                for i, v in enumerate(row):
+                    total[i] += v
+        return merged
+
+    def _label_str(self, labels: tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{v}"' for k, v in zip(self.label_names, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Sharded):
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, help_text, label_names)
+
+    def inc(self, amount: float = 1.0, *labels):
+        self._row(labels, 1)[0] += amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, row in sorted(self._merged(1).items()):
+            lines.append(f"{self.name}{self._label_str(labels)} {row[0]}")
+        return lines
+
+
+class Histogram(_Sharded):
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...], label_names: tuple[str, ...] = ()):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # row: 버킷별(비누적) count + +Inf count + sum
+        self._size = len(self.buckets) + 2
+
+    def observe(self, value: float, *labels):
+        row = self._row(labels, self._size)
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, row in sorted(self._merged(self._size).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                le = self._label_str(labels, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += row[len(self.buckets)]
+            le = self._label_str(labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(labels)} {row[-1]}")
+            lines.append(f"{self.name}_count{self._label_str(labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """조회 시점에 callback 으로 값을 읽는 gauge - callback 은 {labels tuple: value} 반환"""
+
+    def __init__(self, name: str, help_text: str, callback, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+        self.label_names = label_names
+        REGISTRY.append(self)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.callback().items()):
+            label_str = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            lines.append(f"{self.name}{'{' + label_str + '}' if label_str else ''} {value}")
+        return lines
+
+
+REGISTRY: list = []
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds", "HTTP request latency (streaming: time to first byte)",
+    LATENCY_BUCKETS, ("endpoint", "status")
+)
+STAGE_LATENCY = Histogram(
+    "inference_stage_duration_seconds", "Inference stage latency (queue_wait, tokenize, forward, postprocess)",
+    LATENCY_BUCKETS, ("stage",)
+)
+BATCH_SIZE = Histogram(
+    "inference_batch_size", "Sequences per forward pass", (1, 2, 4, 8, 16, 32, 64, 128)
+)
+PADDING_RATIO = Histogram(
+    "inference_padding_ratio", "Fraction of padded tokens per forward pass",
+    (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+)
+TOKENS_TOTAL = Counter(
+    "inference_tokens_total", "Non-padding tokens processed by the model (rate() = tokens/sec)"
+)
+EARLY_EXIT_DEPTH = Histogram(
+    "inference_exit_layers", "Decoder layers run per sequence when early exit is enabled",
+    (1, 2, 4, 8, 12, 16, 20, 24, 28, 32, 40, 48)
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests rejected before reaching the model (saturated / deadline)", ("reason",)
+)
+
+
+def _process_rss() -> dict:
+    try:
+        with open("/proc/self/statm") as f:
+            return {(): int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")}
+    except OSError:
+        import resource
+        return {(): resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+
+
+def _accelerator_memory() -> dict:
+    if not torch.cuda.is_available():
+        return {}
+    return {(str(i),): torch.cuda.memory_allocated(i) for i in range(torch.cuda.device_count())}
+
+
+Gauge("process_resident_memory_bytes", "Resident memory size in bytes", _process_rss)
+Gauge("accelerator_memory_allocated_bytes", "torch.cuda allocated memory", _accelerator_memory, ("device",))
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
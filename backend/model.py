@@ -1,77 +1,718 @@
+import bisect
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, BitsAndBytesConfig
 from peft import PeftModel, PeftConfig
 import logging
+import metrics
 from config import settings
+from cache import ResultCache, content_key
+from cascade import STAGE_CASCADE, STAGE_LLM, STAGE_NEAR_DUPLICATE, CascadeClassifier
+from early_exit import ProbeHeads, early_exit_forward, last_token_index
+from ipc import ModelClient
+from near_duplicate import NearDuplicateIndex
+from prefix_cache import PrefixKVCache
 
 logger = logging.getLogger(__name__)
 
+# HTTP 워커가 모델 서버 socket 을 기다리는 최대 시간 (8B 모델 로딩 포함)
+MODEL_SERVER_CONNECT_WAIT_S = 600.0
+
+# export_model.py 가 병합 모델 아티팩트에 기록하는 메타데이터 파일
+EXPORT_INFO_FILE = "export_info.json"
+
+ADAPTER_FILES = ("adapter_config.json", "adapter_model.safetensors", "adapter_model.bin")
+
+def adapter_hash(adapter_path: str) -> str:
+    """LoRA 어댑터 설정/가중치 파일 내용의 SHA-256 (병합 아티팩트와 어댑터 일치 여부 확인용)"""
+    digest = hashlib.sha256()
+    for name in ADAPTER_FILES:
+        path = os.path.join(adapter_path, name)
+        if os.path.isfile(path):
+            digest.update(name.encode("utf-8"))
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+def load_profile(backend: str, dtype: str) -> dict:
+    """PEFT 로딩 시간 측정 조건 - export 시 측정한 시간은 서버 로딩 조건이 모두 같을 때만 비교"""
+    return {"host": socket.gethostname(), "backend": backend, "dtype": dtype}
+
+def tokenizer_hash(tokenizer) -> str:
+    """토크나이저 직렬화 내용의 SHA-256"""
+    if hasattr(tokenizer, "backend_tokenizer"):
+        state = json.loads(tokenizer.backend_tokenizer.to_str())
+        # truncation / padding 은 호출할 때마다 바뀌는 설정이므로 제외 (인코딩 전후로 hash 가 달라지지 않도록)
+        state.pop("truncation", None)
+        state.pop("padding", None)
+        serialized = json.dumps(state, sort_keys=True, ensure_ascii=False)
+    else:
+        serialized = json.dumps(tokenizer.get_vocab(), sort_keys=True)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+def window_starts(num_tokens: int, window: int, stride: int) -> list[int]:
+    """겹치는 슬라이딩 윈도우 시작 위치 - 마지막 윈도우는 문서 끝에 맞춤"""
+    if num_tokens <= window:
+        return [0]
+    starts = list(range(0, num_tokens - window + 1, stride))
+    if starts[-1] + window < num_tokens:
+        starts.append(num_tokens - window)
+    return starts
+
+def long_windows(num_tokens: int, window_tokens: int, stride: int, num_special: int) -> tuple[int, list[int]]:
+    """predict_long 윈도우 배치 - (윈도우당 본문 토큰 수, 본문 기준 시작 위치)
+
+    윈도우마다 special token 을 붙이므로 본문 크기는 window_tokens 에서 그만큼 빼고, stride 는 본문 크기 이하로 제한
+    """
+    content_size = max(window_tokens - num_special, 1)
+    return content_size, window_starts(num_tokens, content_size, min(stride, content_size))
+
+def pool_window_probs(probs: list[float], owned_tokens: list[int], pooling: str) -> float:
+    """윈도우 확률 집계 - mean / max / length_weighted (윈도우가 새로 덮는 토큰 수로 가중)"""
+    if pooling == "max":
+        return max(probs)
+    if pooling == "length_weighted":
+        return sum(p * n for p, n in zip(probs, owned_tokens)) / sum(owned_tokens)
+    return sum(probs) / len(probs)
+
+def adapter_paths() -> list[str]:
+    """서빙할 LoRA 어댑터 경로 - ENSEMBLE_ADAPTER_PATHS 가 있으면 fold 앙상블"""
+    return settings.ENSEMBLE_ADAPTER_PATHS or [settings.LORA_ADAPTER_PATH]
+
+def bnb_4bit_config() -> BitsAndBytesConfig:
+    """4-bit quantization config"""
+    return BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_compute_dtype=torch.bfloat16,
+        bnb_4bit_quant_type="nf4",
+        bnb_4bit_use_double_quant=True
+    )
+
+def bucket_by_tokens(lengths: list[int], max_tokens: int, max_items: int | None = None) -> list[list[int]]:
+    """토큰 길이순으로 정렬해 패딩 포함 토큰 수(항목 수 x 최대 길이)가 max_tokens 이하인 버킷으로 분할
+
+    반환값은 원래 인덱스의 리스트이며, 한 항목이 max_tokens 를 넘으면 단독 버킷이 됩니다.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets, current = [], []
+    for i in order:
+        # 오름차순이므로 새 항목의 길이가 곧 버킷의 패딩 길이
+        full = max_items is not None and len(current) >= max_items
+        if current and (full or (len(current) + 1) * lengths[i] > max_tokens):
+            buckets.append(current)
+            current = []
+        current.append(i)
+    if current:
+        buckets.append(current)
+    return buckets
+
+def prepare_cpu_model(peft_model, dtype: torch.dtype = torch.float32, int8: bool = False):
+    """PEFT 모델의 LoRA 를 병합하고 CPU 추론용으로 변환
+
+    int8=True 이면 torch dynamic quantization 으로 nn.Linear 가중치를 int8 로 양자화합니다 (float32 필요).
+    """
+    model = peft_model.merge_and_unload()
+    model = model.to(device="cpu", dtype=torch.float32 if int8 else dtype)
+    model.eval()
+    if int8:
+        model = quantize_int8(model)
+    return model
+
+def quantize_int8(model):
+    """torch dynamic quantization 으로 nn.Linear 가중치를 int8 로 변환 (float32 모델 입력)"""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
 class AITextDetector:
     def __init__(self):
         self.model = None
         self.tokenizer = None
+        self._fingerprint = None
+        self.artifact_info = None
+        self.cascade = None
+        self.probes: ProbeHeads | None = None
+        # 모델 서버 클라이언트 (HTTP 워커 모드: forward 는 모델 서버 프로세스에서 실행)
+        self.remote: ModelClient | None = None
+        # 앙상블 모드에서 하나의 base model 에 올린 fold 어댑터 이름 (단일 어댑터면 빈 리스트)
+        self.adapter_names = []
+        self._adapter_lock = threading.Lock()
+        # fast tokenizer 는 truncation/padding 설정을 호출마다 바꾸므로 스레드 간 동시 호출 불가 ("Already borrowed")
+        self._tokenizer_lock = threading.Lock()
+        self._special_tokens = None
+        self._tokenizer_digest = None
+        self.cache = ResultCache(
+            settings.CACHE_MAX_ENTRIES,
+            settings.CACHE_TTL_S,
+            settings.CACHE_SQLITE_PATH
+        ) if settings.CACHE_ENABLED else None
+        self.near_duplicates = NearDuplicateIndex(
+            settings.NEAR_DUP_THRESHOLD,
+            settings.NEAR_DUP_MAX_ENTRIES,
+            settings.NEAR_DUP_MIN_CHARS,
+            settings.NEAR_DUP_SQLITE_PATH
+        ) if settings.NEAR_DUP_ENABLED else None
+        self.prefix_cache = PrefixKVCache(
+            settings.PREFIX_CACHE_MAX_BYTES,
+            settings.PREFIX_CACHE_MIN_TOKENS
+        ) if settings.PREFIX_CACHE_ENABLED else None
 
     def load_model(self):
-        """Load KANANA model with LoRA adapter and 4-bit quantization"""
-        logger.info("Loading model...")
+        """Load KANANA model with LoRA adapter (INFERENCE_BACKEND 에 따라 4-bit GPU 또는 CPU)"""
+        logger.info(f"Loading model... (backend={settings.INFERENCE_BACKEND})")
+        self._fingerprint = None
+        self._tokenizer_digest = None
+        start = time.perf_counter()
+
+        if settings.CASCADE_ENABLED:
+            self.cascade = CascadeClassifier.load(settings.CASCADE_MODEL_PATH)
+        if settings.EARLY_EXIT_ENABLED:
+            if settings.ENSEMBLE_ADAPTER_PATHS:
+                # probe 는 하나의 어댑터 hidden state 로 학습하므로 fold 앙상블에는 적용하지 않음
+                logger.warning("EARLY_EXIT_ENABLED is ignored with ENSEMBLE_ADAPTER_PATHS")
+            else:
+                self.probes = ProbeHeads.load(settings.EARLY_EXIT_PROBES_PATH)
+        if self.prefix_cache is not None:
+            self.prefix_cache.clear()
+            if settings.ENSEMBLE_ADAPTER_PATHS or self.probes is not None:
+                # KV 는 어댑터마다 다르고, early exit 은 전체 layer 의 KV 를 만들지 않음
+                logger.warning("PREFIX_CACHE_ENABLED is ignored with ENSEMBLE_ADAPTER_PATHS / EARLY_EXIT_ENABLED")
+                self.prefix_cache = None
+
+        # 병합 아티팩트가 있으면 우선 사용 (PEFT 로딩/병합/양자화 생략)
+        if self._load_artifact():
+            elapsed = time.perf_counter() - start
+            peft_seconds = self.artifact_info.get("peft_load_seconds")
+            if peft_seconds:
+                # export 는 CPU / 양자화 없이 측정하므로 호스트/backend/dtype 이 다르면 차이를 함께 표시
+                recorded = self.artifact_info.get("peft_load_profile") or {}
+                current = load_profile(settings.INFERENCE_BACKEND, settings.CPU_DTYPE)
+                differs = [f"{key}={recorded.get(key)}" for key in current if recorded.get(key) != current[key]]
+                note = f", measured with {' '.join(differs)}" if differs else ""
+                logger.info(
+                    f"Model loaded from merged artifact in {elapsed:.1f}s "
+                    f"(PEFT path at export: {peft_seconds:.1f}s, saved {peft_seconds - elapsed:.1f}s{note})"
+                )
+            else:
+                logger.info(f"Model loaded from merged artifact in {elapsed:.1f}s")
+            return
 
         # Load LoRA config first to verify compatibility
-        peft_config = PeftConfig.from_pretrained(settings.LORA_ADAPTER_PATH)
+        peft_config = PeftConfig.from_pretrained(adapter_paths()[0])
         logger.info(f"LoRA config loaded: r={peft_config.r}, alpha={peft_config.lora_alpha}")
 
         # Load tokenizer
-        self.tokenizer = AutoTokenizer.from_pretrained(settings.LORA_ADAPTER_PATH)
-
-        # 4-bit quantization config
-        bnb_config = BitsAndBytesConfig(
-            load_in_4bit=True,
-            bnb_4bit_compute_dtype=torch.bfloat16,
-            bnb_4bit_quant_type="nf4",
-            bnb_4bit_use_double_quant=True
-        )
+        self.tokenizer = AutoTokenizer.from_pretrained(adapter_paths()[0])
+
+        if settings.INFERENCE_BACKEND == "peft_4bit":
+            self.model = self._load_peft_4bit(peft_config)
+        elif settings.INFERENCE_BACKEND in ("cpu", "cpu_int8"):
+            self.model = self._load_cpu(peft_config, int8=settings.INFERENCE_BACKEND == "cpu_int8")
+        else:
+            raise ValueError(f"Unknown INFERENCE_BACKEND: {settings.INFERENCE_BACKEND}")
+
+        logger.info(f"Model loaded successfully in {time.perf_counter() - start:.1f}s")
+
+    def connect_model_server(self, socket_path: str):
+        """모델 서버 프로세스에 연결 (model_server.py) - 토크나이저/캐시/cascade 는 이 프로세스에서 실행"""
+        self._fingerprint = None
+        self._tokenizer_digest = None
+        if settings.CASCADE_ENABLED:
+            self.cascade = CascadeClassifier.load(settings.CASCADE_MODEL_PATH)
+
+        self.remote = ModelClient(socket_path, settings.REQUEST_TIMEOUT_S)
+        self.remote.connect(wait_s=MODEL_SERVER_CONNECT_WAIT_S)
+        info = self.remote.call("info")
+        # 토큰 ID 를 보내므로 서버와 같은 토크나이저를 사용
+        self.tokenizer = info["tokenizer"]
+        self.adapter_names = info["adapter_names"]
+        self._fingerprint = info["fingerprint"]
 
+    @property
+    def tokenizer_digest(self) -> str:
+        """토크나이저 hash - 사전 토큰화된 입력이 같은 토크나이저로 만들어졌는지 확인"""
+        if self._tokenizer_digest is None:
+            self._tokenizer_digest = tokenizer_hash(self.tokenizer)
+        return self._tokenizer_digest
+
+    @property
+    def ready(self) -> bool:
+        """로컬 모델이 로딩됐거나 모델 서버에 연결됨"""
+        return self.model is not None or self.remote is not None
+
+    def server_info(self) -> dict:
+        """모델 서버가 HTTP 워커에 전달하는 정보"""
+        return {
+            "tokenizer": self.tokenizer,
+            "adapter_names": self.adapter_names,
+            "fingerprint": self.fingerprint
+        }
+
+    def _load_artifact(self) -> bool:
+        """MERGED_MODEL_PATH 의 병합 아티팩트 로딩 - 사용할 수 없으면 False"""
+        path = settings.MERGED_MODEL_PATH
+        if not path:
+            return False
+        if settings.ENSEMBLE_ADAPTER_PATHS:
+            logger.warning("Merged artifact holds a single adapter, ignoring it in ensemble mode")
+            return False
+        info_path = os.path.join(path, EXPORT_INFO_FILE)
+        if not os.path.isfile(info_path):
+            logger.warning(f"Merged artifact not found at {path}, falling back to PEFT loading")
+            return False
+        with open(info_path, encoding="utf-8") as f:
+            info = json.load(f)
+
+        # 어댑터가 함께 배포된 경우 아티팩트가 같은 어댑터로 만들어졌는지 확인
+        if os.path.isdir(settings.LORA_ADAPTER_PATH) and adapter_hash(settings.LORA_ADAPTER_PATH) != info["config_hash"]:
+            logger.warning("Merged artifact config hash does not match LORA_ADAPTER_PATH, falling back to PEFT loading")
+            return False
+
+        if settings.INFERENCE_BACKEND == "peft_4bit":
+            kwargs = {"torch_dtype": torch.bfloat16, "device_map": "auto"}
+            if not info["quantized_4bit"]:
+                # LoRA 가 병합된 가중치(W + BA)를 양자화하므로 PEFT 경로(4-bit W + bf16 LoRA)와 logits 가 조금 다름
+                logger.warning(
+                    "Quantizing a non-quantized merged artifact to 4-bit: the LoRA delta is quantized with the base "
+                    "weights, so scores differ slightly from the PEFT path (export with --quantize-4bit to fix the weights)"
+                )
+                kwargs["quantization_config"] = bnb_4bit_config()
+        elif info["quantized_4bit"]:
+            logger.warning("4-bit merged artifact cannot be served on CPU backends, falling back to PEFT loading")
+            return False
+        else:
+            int8 = settings.INFERENCE_BACKEND == "cpu_int8"
+            kwargs = {"torch_dtype": torch.float32 if int8 else getattr(torch, settings.CPU_DTYPE)}
+
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        model = AutoModelForSequenceClassification.from_pretrained(path, **kwargs)
+        model.eval()
+        if settings.INFERENCE_BACKEND == "cpu_int8":
+            model = quantize_int8(model)
+        self.model = model
+        self.artifact_info = info
+        logger.info(f"Merged artifact: {path} (config_hash={info['config_hash'][:12]})")
+        return True
+
+    def _load_peft_4bit(self, peft_config):
+        """bitsandbytes 4-bit 양자화 base model + LoRA 어댑터 (GPU)"""
         # Load base model with quantization
         base_model = AutoModelForSequenceClassification.from_pretrained(
             peft_config.base_model_name_or_path,  # Use config value
             num_labels=2,
-            quantization_config=bnb_config,
+            quantization_config=bnb_4bit_config(),
             torch_dtype=torch.bfloat16,
             device_map="auto"  # Automatic device distribution
         )
 
+        model = self._attach_adapters(base_model)
+        logger.info(f"Device map: {model.hf_device_map}")
+        return model
+
+    def _attach_adapters(self, base_model) -> PeftModel:
+        """base model 하나에 LoRA 어댑터 부착 - 앙상블이면 fold 어댑터를 모두 같은 base 에 로딩"""
+        paths = adapter_paths()
+        ensemble = bool(settings.ENSEMBLE_ADAPTER_PATHS)
+        names = [f"fold{i}" for i in range(len(paths))] if ensemble else ["default"]
+
         # Load LoRA adapter (automatically handles modules_to_save)
-        self.model = PeftModel.from_pretrained(
+        model = PeftModel.from_pretrained(
             base_model,
-            settings.LORA_ADAPTER_PATH,
+            paths[0],
+            adapter_name=names[0],
             is_trainable=False
         )
-        self.model.eval()
+        for name, path in zip(names[1:], paths[1:]):
+            model.load_adapter(path, adapter_name=name, is_trainable=False)
+        model.eval()
 
-        logger.info("Model loaded successfully")
-        logger.info(f"Device map: {self.model.hf_device_map}")
+        self.adapter_names = names if ensemble else []
+        if ensemble:
+            adapter_params = sum(p.numel() for n, p in model.named_parameters() if "lora_" in n or "modules_to_save" in n)
+            logger.info(
+                f"Ensemble adapters loaded on one base model: {names} "
+                f"(adapter params: {adapter_params / 1e6:.1f}M)"
+            )
+        return model
 
-    def predict(self, text: str) -> dict:
-        """Predict AI generation probability"""
-        if self.model is None:
+    def _load_cpu(self, peft_config, int8: bool):
+        """LoRA 를 base 가중치에 병합한 CPU 추론 모델 (bitsandbytes 불필요)"""
+        dtype = torch.float32 if int8 else getattr(torch, settings.CPU_DTYPE)
+        base_model = AutoModelForSequenceClassification.from_pretrained(
+            peft_config.base_model_name_or_path,
+            num_labels=2,
+            torch_dtype=dtype
+        )
+        model = self._attach_adapters(base_model)
+        if self.adapter_names:
+            # 여러 어댑터는 하나의 가중치로 병합할 수 없으므로 PEFT 모델 그대로 CPU 서빙
+            if int8:
+                logger.warning("cpu_int8 is not applied in ensemble mode, serving unmerged float32 adapters")
+            return model.to("cpu")
+        return prepare_cpu_model(model, dtype, int8)
+
+    @property
+    def fingerprint(self) -> str:
+        """모델/어댑터 식별자 - 캐시 키에 포함되어 어댑터 교체 시 이전 결과를 무효화"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update(self.model.config.to_json_string().encode("utf-8"))
+            digest.update(f"max_length={settings.MAX_TEXT_LENGTH}".encode("utf-8"))
+            for adapter_dir in adapter_paths():
+                if os.path.isdir(adapter_dir):
+                    for name in sorted(os.listdir(adapter_dir)):
+                        stat = os.stat(os.path.join(adapter_dir, name))
+                        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+            if self.probes is not None:
+                # early exit 은 확신 구간에서 probe 확률을 반환하므로 결과가 달라짐
+                stat = os.stat(settings.EARLY_EXIT_PROBES_PATH)
+                digest.update(f"early_exit:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def lookup(self, texts: list[str]) -> list[float | None]:
+        """캐시된 AI 확률 조회 (미스는 None)"""
+        if self.cache is None:
+            return [None] * len(texts)
+        return [self.cache.get(content_key(t, self.fingerprint)) for t in texts]
+
+    def store(self, texts: list[str], ai_probs: list[float]):
+        """추론 결과를 캐시 / 유사 문단 인덱스에 저장"""
+        if self.cache is not None:
+            self.cache.put_many([
+                (content_key(t, self.fingerprint), p) for t, p in zip(texts, ai_probs)
+            ])
+        if self.near_duplicates is not None:
+            self.near_duplicates.add_many(texts, ai_probs, self.fingerprint)
+
+    def resolve_cheap(self, texts: list[str]) -> tuple[list[float | None], list[str]]:
+        """모델 호출 없이 결과 캐시 → 유사 문단 재사용 → cascade 1단계 순서로 처리 가능한 입력 해결
+
+        반환값: (AI 확률 - 미해결은 None, 응답 단계)
+        """
+        ai_probs = self.lookup(texts)
+        stages = [STAGE_LLM] * len(texts)
+        if self.near_duplicates is not None:
+            for i, p in enumerate(ai_probs):
+                if p is None:
+                    match = self.near_duplicates.lookup(texts[i], self.fingerprint)
+                    if match is not None:
+                        ai_probs[i] = match[0]
+                        stages[i] = STAGE_NEAR_DUPLICATE
+        if self.cascade is not None:
+            unresolved = [i for i, p in enumerate(ai_probs) if p is None]
+            if unresolved:
+                decided = self.cascade.decide([texts[i] for i in unresolved])
+                for i, p in zip(unresolved, decided):
+                    if p is not None:
+                        ai_probs[i] = p
+                        stages[i] = STAGE_CASCADE
+        return ai_probs, stages
+
+    def cache_stats(self) -> dict:
+        if self.cache is None:
+            return {"enabled": False}
+        return self.cache.stats()
+
+    def near_duplicate_stats(self) -> dict:
+        if self.near_duplicates is None:
+            return {"enabled": False}
+        return self.near_duplicates.stats()
+
+    def prefix_cache_stats(self) -> dict:
+        if self.remote is not None:
+            return self.remote.call("prefix_cache_stats")
+        if self.prefix_cache is None:
+            return {"enabled": False}
+        return self.prefix_cache.stats()
+
+    def encode(self, texts: list[str]) -> list[list[int]]:
+        """텍스트를 토큰 ID 리스트로 변환 (패딩 없음)"""
+        start = time.perf_counter()
+        with self._tokenizer_lock:
+            input_ids = self.tokenizer(
+                texts,
+                truncation=True,
+                max_length=settings.MAX_TEXT_LENGTH
+            )["input_ids"]
+        metrics.STAGE_LATENCY.observe(time.perf_counter() - start, "tokenize")
+        return input_ids
+
+    def _each_adapter(self):
+        """앙상블이면 fold 어댑터를 하나씩 활성화하며 반복, 단일 어댑터면 한 번 반복"""
+        if not self.adapter_names:
+            yield None
+            return
+        # set_adapter 는 모델 상태를 바꾸므로 추론 스레드가 여러 개일 때를 대비해 잠금
+        with self._adapter_lock:
+            for name in self.adapter_names:
+                self.model.set_adapter(name)
+                yield name
+
+    def special_tokens(self) -> tuple[list[int], list[int]]:
+        """토크나이저가 붙이는 (앞, 뒤) special token ID - 윈도우마다 동일하게 붙이기 위함"""
+        if self._special_tokens is None:
+            with self._tokenizer_lock:
+                with_special = self.tokenizer("가")["input_ids"]
+                content = self.tokenizer("가", add_special_tokens=False)["input_ids"]
+            k = next(
+                i for i in range(len(with_special) - len(content) + 1)
+                if with_special[i:i + len(content)] == content
+            )
+            self._special_tokens = (with_special[:k], with_special[k + len(content):])
+        return self._special_tokens
+
+    def predict_long_cost(self, num_tokens: int, window_tokens: int, stride: int) -> int:
+        """predict_long 이 forward 하는 토큰 수 (admission 비용) - num_tokens: special token 을 포함한 전체 토큰 수"""
+        prefix, suffix = self.special_tokens()
+        num_special = len(prefix) + len(suffix)
+        content_tokens = max(num_tokens - num_special, 0)
+        content_size, starts = long_windows(content_tokens, window_tokens, stride, num_special)
+        return sum(min(content_size, content_tokens - s) + num_special for s in starts)
+
+    def predict_long(self, text: str, pooling: str, window_tokens: int, stride: int) -> dict:
+        """MAX_TEXT_LENGTH 를 넘는 문서를 겹치는 토큰 윈도우로 나눠 배치 추론 후 집계
+
+        윈도우는 MAX_BATCH_TOKENS 예산만큼씩 묶어 처리하므로 문서 길이와 무관하게 활성 메모리가 제한됩니다.
+        """
+        if not self.ready:
             raise RuntimeError("Model not loaded")
 
-        # Tokenize
-        inputs = self.tokenizer(
-            text,
-            truncation=True,
-            max_length=settings.MAX_TEXT_LENGTH,
-            return_tensors="pt"
-        )
+        start_time = time.perf_counter()
+        prefix, suffix = self.special_tokens()
+        with self._tokenizer_lock:
+            token_ids = self.tokenizer(text, add_special_tokens=False)["input_ids"]
+        content_size, starts = long_windows(len(token_ids), window_tokens, stride, len(prefix) + len(suffix))
+
+        windows_per_batch = max(settings.MAX_BATCH_TOKENS // window_tokens, 1)
+        probs = []
+        for i in range(0, len(starts), windows_per_batch):
+            batch = [
+                prefix + token_ids[s:s + content_size] + suffix
+                for s in starts[i:i + windows_per_batch]
+            ]
+            probs.extend(self.score_ids(batch))
+
+        # 각 윈도우가 앞 윈도우 이후로 새로 덮는 토큰 수
+        ends = [min(s + content_size, len(token_ids)) for s in starts]
+        owned = [ends[0]] + [ends[j] - ends[j - 1] for j in range(1, len(ends))]
+        ai_prob = pool_window_probs(probs, owned, pooling)
+
+        elapsed = time.perf_counter() - start_time
+        processed_tokens = sum(e - s for s, e in zip(starts, ends))
+        result = self.format_result(ai_prob)
+        result.update({
+            "pooling": pooling,
+            "num_tokens": len(token_ids),
+            "windows": [
+                {"start_token": s, "end_token": e, "ai_probability": round(p, 4)}
+                for s, e, p in zip(starts, ends, probs)
+            ],
+            "tokens_per_sec": round(processed_tokens / elapsed, 1) if elapsed > 0 else 0.0,
+        })
+        return result
+
+    def score_ids_per_adapter(self, batch_ids: list[list[int]], deadline: float | None = None) -> torch.Tensor:
+        """토큰 ID 배치의 어댑터별 AI 확률 - shape (어댑터 수, 배치), 어댑터는 마이크로 배치 단위로 전환
+
+        deadline(time.monotonic() 기준)은 모델 서버 모드에서 남은 시간으로 전달되어 서버 큐에서도 적용됩니다.
+        """
+        if not self.ready:
+            raise RuntimeError("Model not loaded")
+        if self.remote is not None:
+            return torch.tensor(self.remote.call("score_ids", batch_ids, deadline=deadline))
+
+        start = time.perf_counter()
+        with self._tokenizer_lock:
+            inputs = self.tokenizer.pad(
+                {"input_ids": batch_ids},
+                padding=True,
+                return_tensors="pt"
+            )
         # Note: No explicit .to(device) needed with device_map="auto"
+        metrics.STAGE_LATENCY.observe(time.perf_counter() - start, "tokenize")
+
+        real_tokens = sum(len(ids) for ids in batch_ids)
+        padded_tokens = inputs["input_ids"].numel()
+        metrics.BATCH_SIZE.observe(len(batch_ids))
+        metrics.PADDING_RATIO.observe(1 - real_tokens / padded_tokens if padded_tokens else 0.0)
+
+        if self.probes is not None and not self.adapter_names:
+            return self._score_early_exit(inputs, real_tokens)
+        if self.prefix_cache is not None and not self.adapter_names:
+            return self._score_prefix_cached(batch_ids, inputs, real_tokens)
+
+        rows = []
+        forward_time = postprocess_time = 0.0
+        with torch.no_grad():
+            for _ in self._each_adapter():
+                start = time.perf_counter()
+                logits = self.pooled_logits(inputs)
+                if logits.is_cuda:
+                    torch.cuda.synchronize(logits.device)
+                forward_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                probs = torch.softmax(logits.float(), dim=-1)
+                rows.append(probs[:, 1].cpu())  # Probability of class 1 (AI-generated)
+                postprocess_time += time.perf_counter() - start
 
-        # Inference
+        metrics.STAGE_LATENCY.observe(forward_time, "forward")
+        metrics.STAGE_LATENCY.observe(postprocess_time, "postprocess")
+        metrics.TOKENS_TOTAL.inc(real_tokens)
+        return torch.stack(rows)
+
+    def _score_early_exit(self, inputs, real_tokens: int) -> torch.Tensor:
+        """probe 가 확신하는 layer 에서 멈추는 forward - shape (1, 배치)"""
+        backbone, head = self._classifier_parts()
+        start = time.perf_counter()
+        with torch.no_grad():
+            probs, depth = early_exit_forward(
+                backbone, head, self.probes, inputs["input_ids"], inputs["attention_mask"]
+            )
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        metrics.STAGE_LATENCY.observe(time.perf_counter() - start, "forward")
+        for layers in depth.tolist():
+            metrics.EARLY_EXIT_DEPTH.observe(layers)
+        metrics.TOKENS_TOTAL.inc(real_tokens)
+        return probs.unsqueeze(0)
+
+    def _score_prefix_cached(self, batch_ids: list[list[int]], inputs, real_tokens: int) -> torch.Tensor:
+        """접두사 KV 캐시를 쓰는 forward - shape (1, 배치)
+
+        캐시에 공통 접두사가 있는 입력은 접두사 이후 토큰만 하나씩 forward 하고,
+        나머지는 한 번의 패딩된 forward 로 계산한 뒤 각 시퀀스의 KV 를 저장 (오른쪽 패딩이면 패딩 앞 위치는 패딩 없는 forward 와 같음)
+        """
+        probs = torch.empty(len(batch_ids))
+        misses = []
+        start = time.perf_counter()
         with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            probs = torch.softmax(logits, dim=-1)
-            ai_prob = probs[0, 1].item()  # Probability of class 1 (AI-generated)
+            for i, ids in enumerate(batch_ids):
+                match = self.prefix_cache.match(ids)
+                if match is None:
+                    misses.append(i)
+                    continue
+                length, past = match
+                outputs = self.model(
+                    input_ids=torch.tensor([ids[length:]]),
+                    attention_mask=torch.ones(1, len(ids), dtype=torch.long),
+                    past_key_values=past,
+                    use_cache=True
+                )
+                probs[i] = torch.softmax(outputs.logits.float(), dim=-1)[0, 1].cpu()
+                self.prefix_cache.put(ids, outputs.past_key_values)
+                real_tokens -= length
+
+            if len(misses) == len(batch_ids):
+                outputs = self.model(**inputs, use_cache=True)
+            elif misses:
+                with self._tokenizer_lock:
+                    inputs = self.tokenizer.pad(
+                        {"input_ids": [batch_ids[i] for i in misses]},
+                        padding=True,
+                        return_tensors="pt"
+                    )
+                outputs = self.model(**inputs, use_cache=True)
+            if misses:
+                probs[misses] = torch.softmax(outputs.logits.float(), dim=-1)[:, 1].cpu()
+                right_padded = self.tokenizer.padding_side == "right"
+                for row, i in enumerate(misses):
+                    # 왼쪽 패딩이면 패딩이 없는 (가장 긴) 시퀀스만 저장
+                    if right_padded or len(batch_ids[i]) == inputs["input_ids"].shape[1]:
+                        self.prefix_cache.put(batch_ids[i], outputs.past_key_values, row)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        metrics.STAGE_LATENCY.observe(time.perf_counter() - start, "forward")
+        metrics.TOKENS_TOTAL.inc(real_tokens)
+        return probs.unsqueeze(0)
+
+    def score_ids(self, batch_ids: list[list[int]]) -> list[float]:
+        """토큰 ID 배치를 한 번의 패딩된 forward pass로 추론 (앙상블이면 fold 평균)"""
+        return self.score_ids_per_adapter(batch_ids).mean(dim=0).tolist()
 
-        # Determine prediction and confidence
+    def predict_ensemble(self, text: str) -> dict:
+        """fold 별 AI 확률과 평균/표준편차 (캐시를 거치지 않음)"""
+        fold_probs = self.score_ids_per_adapter(self.encode([text]))[:, 0]
+        result = self.format_result(fold_probs.mean().item())
+        result["fold_probabilities"] = [round(p, 4) for p in fold_probs.tolist()]
+        result["fold_std"] = round(fold_probs.std(unbiased=False).item(), 4)
+        return result
+
+    def _classifier_parts(self):
+        """(backbone, score head) 반환 - LoRA 어댑터가 주입된 모듈을 그대로 사용"""
+        base = self.model.get_base_model() if hasattr(self.model, "get_base_model") else self.model
+        return getattr(base, base.base_model_prefix), base.score
+
+    def pooled_logits(self, inputs) -> torch.Tensor:
+        """분류 logits - shape (배치, 라벨 수)
+
+        self.model(**inputs) 와 같은 값이지만 KV 캐시를 만들지 않고 (use_cache=False),
+        분류 헤드를 전체 위치가 아닌 행별 pooling 위치(마지막 non-pad 토큰)의 hidden state 에만 적용
+        """
+        backbone, head = self._classifier_parts()
+        input_ids, attention_mask = inputs["input_ids"], inputs["attention_mask"]
+        hidden = backbone(input_ids=input_ids, attention_mask=attention_mask, use_cache=False).last_hidden_state
+        # LlamaForSequenceClassification 과 같은 규칙: pad_token_id 가 아닌 가장 오른쪽 토큰
+        pad_token_id = backbone.config.pad_token_id
+        non_pad = attention_mask if pad_token_id is None else (input_ids != pad_token_id).long()
+        positions = last_token_index(non_pad.to(hidden.device))
+        return head(hidden[torch.arange(hidden.shape[0], device=hidden.device), positions])
+
+    def predict_prefixes(
+        self, text: str, char_ends: list[int], deadline: float | None = None
+    ) -> tuple[float, list[float]]:
+        """전체 텍스트를 한 번만 forward 하여 문단 끝 위치마다 분류 헤드를 적용
+
+        causal 모델이므로 각 문단 점수는 해당 문단까지의 prefix 에 조건화된 점수입니다.
+        반환값: (전체 텍스트 AI 확률, 문단별 AI 확률)
+        deadline 은 score_ids_per_adapter 와 같이 모델 서버 모드에서만 사용합니다.
+        """
+        if not self.ready:
+            raise RuntimeError("Model not loaded")
+        if self.remote is not None:
+            # hidden state 가 필요하므로 토큰화까지 모델 서버에서 실행
+            return self.remote.call("predict_prefixes", text, char_ends, deadline=deadline)
+
+        with self._tokenizer_lock:
+            encoding = self.tokenizer(
+                text,
+                truncation=True,
+                max_length=settings.MAX_TEXT_LENGTH,
+                return_offsets_mapping=True,
+                return_tensors="pt"
+            )
+        offsets = encoding.pop("offset_mapping")[0].tolist()
+        # special token(BOS 등)은 offset 이 (0, 0) 이므로 제외
+        content = [(start, i) for i, (start, end) in enumerate(offsets) if end > start]
+        token_starts = [start for start, _ in content]
+
+        # 문단 끝 문자 위치 → 그 이전에 시작하는 마지막 토큰 (truncation 시 마지막 토큰으로 clip)
+        positions = [
+            content[max(bisect.bisect_left(token_starts, end) - 1, 0)][1]
+            for end in char_ends
+        ]
+        # 전체 텍스트 점수는 predict() 와 동일하게 마지막 토큰에서 읽음
+        positions.append(len(offsets) - 1)
+
+        backbone, head = self._classifier_parts()
+        rows = []
+        with torch.no_grad():
+            for _ in self._each_adapter():
+                hidden = backbone(**encoding, use_cache=False).last_hidden_state
+                logits = head(hidden[0, positions])
+                rows.append(torch.softmax(logits.float(), dim=-1)[:, 1].cpu())
+        probs = torch.stack(rows).mean(dim=0).tolist()
+
+        return probs[-1], [round(p, 4) for p in probs[:-1]]
+
+    @staticmethod
+    def format_result(ai_prob: float) -> dict:
+        """AI 확률을 판정/신뢰도 응답으로 변환"""
         prediction = "AI 생성" if ai_prob > 0.5 else "사람 작성"
 
         if ai_prob > 0.8 or ai_prob < 0.2:
@@ -87,28 +728,63 @@ class AITextDetector:
             "confidence": confidence
         }
 
+    def predict(self, text: str) -> dict:
+        """Predict AI generation probability"""
+        if not self.ready:
+            raise RuntimeError("Model not loaded")
+
+        ai_probs, stages = self.predict_batch_staged([text])
+        result = self.format_result(ai_probs[0])
+        result["stage"] = stages[0]
+        return result
+
     def predict_batch(self, texts: list[str]) -> list[float]:
         """배치로 여러 텍스트 처리 (문장별 분석용)"""
-        if self.model is None:
+        return self.predict_batch_staged(texts)[0]
+
+    def predict_batch_staged(
+        self, texts: list[str], input_ids: list[list[int]] | None = None
+    ) -> tuple[list[float], list[str]]:
+        """predict_batch + 텍스트별 응답 단계 (cascade / llm) - input_ids: 미리 토큰화한 결과 (texts 와 같은 순서)"""
+        if not self.ready:
             raise RuntimeError("Model not loaded")
 
-        # 배치 토크나이징
-        inputs = self.tokenizer(
-            texts,
-            truncation=True,
-            max_length=settings.MAX_TEXT_LENGTH,
-            padding=True,
-            return_tensors="pt"
-        )
+        ai_probs = [0.0] * len(texts)
+        stages = [STAGE_LLM] * len(texts)
+        for indices, bucket_probs, bucket_stages in self.iter_predict_batch_staged(texts, input_ids):
+            for i, p, stage in zip(indices, bucket_probs, bucket_stages):
+                ai_probs[i] = p
+                stages[i] = stage
+        return ai_probs, stages
 
-        # 배치 추론
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            probs = torch.softmax(logits, dim=-1)
-            ai_probs = probs[:, 1].tolist()  # 모든 샘플의 AI 확률
+    def iter_predict_batch_staged(self, texts: list[str], input_ids: list[list[int]] | None = None):
+        """predict_batch_staged 를 단계별로 yield - (원래 인덱스, AI 확률, 응답 단계)
+
+        캐시/cascade 로 해결된 입력을 먼저 내보내고, 나머지는 길이별 버킷(MAX_BATCH_TOKENS 예산)마다
+        추론이 끝나는 대로 내보냅니다 (스트리밍 응답용).
+        input_ids 를 주면 (TokenizerPool 등에서 미리 토큰화) 추론 스레드에서 다시 토큰화하지 않습니다.
+        """
+        if not self.ready:
+            raise RuntimeError("Model not loaded")
+
+        # 캐시/cascade 로 해결되지 않은 입력만 모델에 전달
+        ai_probs, stages = self.resolve_cheap(texts)
+        resolved = [i for i, p in enumerate(ai_probs) if p is not None]
+        if resolved:
+            yield resolved, [round(ai_probs[i], 4) for i in resolved], [stages[i] for i in resolved]
 
-        return [round(p, 4) for p in ai_probs]
+        misses = [i for i, p in enumerate(ai_probs) if p is None]
+        if not misses:
+            return
+        if input_ids is None:
+            miss_ids = self.encode([texts[i] for i in misses])
+        else:
+            miss_ids = [input_ids[i] for i in misses]
+        for bucket in bucket_by_tokens([len(ids) for ids in miss_ids], settings.MAX_BATCH_TOKENS):
+            indices = [misses[j] for j in bucket]
+            scored = self.score_ids([miss_ids[j] for j in bucket])
+            self.store([texts[i] for i in indices], scored)
+            yield indices, [round(p, 4) for p in scored], [STAGE_LLM] * len(indices)
 
 # Global detector instance (singleton)
 detector = AITextDetector()
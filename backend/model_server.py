@@ -0,0 +1,130 @@
+"""
+모델 서버 프로세스: 모델을 한 번만 로딩하고 여러 uvicorn HTTP 워커의 토큰 ID 를 모아 배치 추론
+
+    cd backend
+    python model_server.py --socket /tmp/kanana-model.sock
+    MODEL_SERVER_SOCKET=/tmp/kanana-model.sock uvicorn main:app --workers 4
+
+HTTP_WORKERS > 1 로 `python main.py` 를 실행하면 이 서버를 자식 프로세스로 띄운 뒤 워커를 시작합니다.
+HTTP 워커는 요청 검증, 토큰화, 결과 캐시, cascade 를 처리하고 모델 forward 만 Unix socket 으로 보냅니다.
+모든 워커의 입력은 하나의 MicroBatcher 큐에서 토큰 길이별로 묶이므로 워커 수와 무관하게 모델 메모리는 한 벌입니다.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from batcher import MicroBatcher
+from config import settings
+from executor import InferenceExecutor
+from ipc import bind_unix_socket, encode_frame, read_frame
+from model import AITextDetector, detector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ModelServer:
+    """Unix socket 으로 받은 요청을 모델에 전달 - 연결마다 요청을 동시에 처리하고 request id 로 응답"""
+
+    def __init__(self, detector: AITextDetector, executor: InferenceExecutor, batcher: MicroBatcher):
+        self.detector = detector
+        self.executor = executor
+        self.batcher = batcher
+
+    async def _score_ids(self, batch_ids: list[list[int]], deadline: float) -> list[list[float]]:
+        """입력을 하나씩 배처에 넣어 다른 워커의 요청과 함께 묶음 - 반환 shape (어댑터 수, 배치)"""
+        columns = await asyncio.gather(
+            *(self.batcher.submit_ids_per_adapter(ids, deadline) for ids in batch_ids)
+        )
+        return [list(row) for row in zip(*columns)]
+
+    async def _handle(self, method: str, args: tuple, remaining_s: float | None):
+        # 워커가 보낸 남은 시간으로 이 프로세스의 마감 시각 계산 (없으면 REQUEST_TIMEOUT_S)
+        deadline = time.monotonic() + (settings.REQUEST_TIMEOUT_S if remaining_s is None else remaining_s)
+        if method == "score_ids":
+            return await self._score_ids(*args, deadline)
+        if method == "predict_prefixes":
+            return await self.executor.run(self.detector.predict_prefixes, *args, deadline=deadline)
+        if method == "info":
+            return self.detector.server_info()
+        if method == "prefix_cache_stats":
+            return self.detector.prefix_cache_stats()
+        raise ValueError(f"Unknown method: {method}")
+
+    async def _respond(
+        self, writer: asyncio.StreamWriter, request_id: int, method: str, args: tuple, remaining_s: float | None
+    ):
+        try:
+            response = (request_id, True, await self._handle(method, args, remaining_s))
+        except Exception as e:
+            logger.error(f"Model server {method} error: {str(e)}")
+            response = (request_id, False, (type(e).__name__, str(e)))
+        if not writer.is_closing():
+            writer.write(encode_frame(response))
+            await writer.drain()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+        try:
+            while True:
+                request_id, method, args, remaining_s = await read_frame(reader)
+                task = asyncio.create_task(self._respond(writer, request_id, method, args, remaining_s))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # 워커 연결이 끊기면 대기 중인 요청은 큐에서 빠짐 (모델 시간을 쓰지 않음)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve(self, socket_path: str):
+        server = await asyncio.start_unix_server(self._serve_connection, sock=bind_unix_socket(socket_path))
+        logger.info(f"Model server listening on {socket_path}")
+        async with server:
+            await server.serve_forever()
+
+
+async def serve(socket_path: str):
+    # SIGTERM 에도 배처 정리 후 socket 파일 삭제
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    executor = InferenceExecutor(settings.INFERENCE_WORKERS, settings.TORCH_NUM_THREADS)
+    executor.start()
+    detector.load_model()
+    detector.cache = None  # 결과 캐시 / 유사 문단 인덱스는 HTTP 워커에서 처리
+    detector.near_duplicates = None
+    batcher = MicroBatcher(detector, executor, settings.BATCH_SIZE, settings.BATCH_MAX_WAIT_MS)
+    await batcher.start()
+    try:
+        await ModelServer(detector, executor, batcher).serve(socket_path)
+    finally:
+        await batcher.stop()
+        executor.shutdown()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def spawn(socket_path: str) -> subprocess.Popen:
+    """모델 서버를 자식 프로세스로 실행 (워커는 socket 이 생길 때까지 연결을 재시도)"""
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--socket", socket_path])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared model server for multi-worker deployments")
+    parser.add_argument("--socket", default=settings.MODEL_SERVER_SOCKET, required=not settings.MODEL_SERVER_SOCKET,
+                        help="Unix socket 경로 (기본: MODEL_SERVER_SOCKET)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.socket))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
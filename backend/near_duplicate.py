@@ -0,0 +1,208 @@
+import logging
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cache import content_key, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# MinHash 파라미터 - 64 해시 = 8 band x 8 row, LSH 후보 임계값 약 (1/8)^(1/8) = 0.77
+# (Jaccard 0.85 쌍은 92%, 0.9 쌍은 99% 확률로 후보가 됨, 후보는 서명 일치율로 다시 확인)
+NUM_PERM = 64
+NUM_BANDS = 8
+ROWS_PER_BAND = NUM_PERM // NUM_BANDS
+SHINGLE_SIZE = 4  # 문자 shingle 길이 (공백 포함)
+MINHASH_SEED = 1
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_SHINGLE_BASE = np.uint64(1_000_003)
+_WHITESPACE = re.compile(r'\s+')
+
+# 해시 파라미터가 바뀌면 저장된 서명을 쓸 수 없음 (디스크 계층 호환성 확인용)
+SIGNATURE_VERSION = f"minhash-v1:{NUM_PERM}:{NUM_BANDS}:{SHINGLE_SIZE}:{MINHASH_SEED}"
+
+
+def _permutations() -> tuple[np.ndarray, np.ndarray]:
+    # (a * h + b) mod p, p = 2^31 - 1 - a, b, h < p 이므로 uint64 를 넘지 않음
+    rng = np.random.RandomState(MINHASH_SEED)
+    a = rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+    b = rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+    return a, b
+
+
+_PERM_A, _PERM_B = _permutations()
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """정규화한 텍스트의 문자 SHINGLE_SIZE-gram 해시 (중복 제거, uint64 < 2^31 - 1)"""
+    text = _WHITESPACE.sub(" ", normalize_text(text))
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    n = len(codes) - SHINGLE_SIZE + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.uint64)
+    # 다항 해시를 shingle 위치 전체에 대해 한 번에 계산
+    hashes = np.zeros(n, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        hashes = hashes * _SHINGLE_BASE + codes[offset:offset + n]
+    return np.unique(hashes % _MERSENNE_PRIME)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash 서명 (NUM_PERM 개 uint32) - 두 서명의 일치율이 shingle 집합 Jaccard 유사도의 추정값"""
+    hashes = shingle_hashes(text)
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _MERSENNE_PRIME, dtype=np.uint32)
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH 기반 유사 문단 인덱스 - 조금 고친 재제출 문단에 이전 LLM 점수를 재사용
+
+    - 정확히 같은 텍스트는 ResultCache 가 처리하고, 이 인덱스는 캐시 미스에 대해서만 조회
+    - 추정 Jaccard 유사도가 threshold 이상인 항목 중 가장 가까운 항목의 점수를 반환
+    - 메모리 LRU (max_entries), 선택적 SQLite 디스크 계층 (재시작 시 최근 max_entries 개를 다시 로딩)
+    - band 키와 항목 키에 모델 fingerprint 를 포함해 다른 모델/어댑터의 점수는 재사용하지 않음
+    """
+
+    def __init__(self, threshold: float, max_entries: int, min_chars: int = 0, sqlite_path: str = ""):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.min_chars = min_chars
+        # key -> (band 키 목록, 서명, AI 확률)
+        self._entries: OrderedDict[str, tuple[list[int], np.ndarray, float]] = OrderedDict()
+        self._buckets: dict[int, list[str]] = {}
+        self._lock = threading.Lock()
+        self.reused = 0  # 재사용으로 생략한 모델 호출 수
+        self.misses = 0
+
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._load(sqlite_path)
+
+    def _load(self, sqlite_path: str):
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS near_duplicates ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, signature BLOB NOT NULL, ai_probability REAL NOT NULL)"
+        )
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'signature_version'").fetchone()
+        if row is None or row[0] != SIGNATURE_VERSION:
+            self._db.execute("DELETE FROM near_duplicates")
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('signature_version', ?)", (SIGNATURE_VERSION,)
+            )
+        # 최근 항목부터 max_entries 개만 유지
+        self._db.execute(
+            "DELETE FROM near_duplicates WHERE rowid NOT IN "
+            "(SELECT rowid FROM near_duplicates ORDER BY rowid DESC LIMIT ?)", (self.max_entries,)
+        )
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key, fingerprint, signature, ai_probability FROM near_duplicates ORDER BY rowid"
+        ).fetchall()
+        for key, fingerprint, signature, ai_prob in rows:
+            self._set(key, fingerprint, np.frombuffer(signature, dtype=np.uint32), ai_prob)
+        logger.info(f"Near-duplicate index disk tier: {sqlite_path} ({len(rows)} entries)")
+
+    def eligible(self, text: str) -> bool:
+        """너무 짧은 문단은 몇 글자만 바뀌어도 점수가 달라질 수 있어 제외"""
+        return len(text.strip()) >= max(self.min_chars, SHINGLE_SIZE)
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray, fingerprint: str) -> list[int]:
+        return [
+            hash((fingerprint, band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()))
+            for band in range(NUM_BANDS)
+        ]
+
+    def lookup(self, text: str, fingerprint: str) -> tuple[float, float] | None:
+        """유사 문단의 (AI 확률, 추정 Jaccard 유사도) - 없으면 None"""
+        if not self.eligible(text):
+            return None
+        signature = minhash_signature(text)
+        band_keys = self._band_keys(signature, fingerprint)
+        with self._lock:
+            candidates = {key for band_key in band_keys for key in self._buckets.get(band_key, ())}
+            best_key, best_similarity = None, 0.0
+            for key in candidates:
+                similarity = float(np.mean(self._entries[key][1] == signature))
+                if similarity > best_similarity:
+                    best_key, best_similarity = key, similarity
+            if best_key is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.reused += 1
+            return self._entries[best_key][2], best_similarity
+
+    def add_many(self, texts: list[str], ai_probs: list[float], fingerprint: str):
+        """LLM 점수를 인덱스에 추가 (디스크 계층은 1회 commit)"""
+        items = [
+            (content_key(text, fingerprint), minhash_signature(text), ai_prob)
+            for text, ai_prob in zip(texts, ai_probs) if self.eligible(text)
+        ]
+        if not items:
+            return
+        with self._lock:
+            evicted = []
+            for key, signature, ai_prob in items:
+                evicted.extend(self._set(key, fingerprint, signature, ai_prob))
+            if self._db is not None:
+                self._db.executemany("DELETE FROM near_duplicates WHERE key = ?", [(key,) for key in evicted])
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO near_duplicates (key, fingerprint, signature, ai_probability) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(key, fingerprint, signature.tobytes(), ai_prob) for key, signature, ai_prob in items]
+                )
+                self._db.commit()
+
+    def _set(self, key: str, fingerprint: str, signature: np.ndarray, ai_prob: float) -> list[str]:
+        """항목 저장 후 LRU 로 밀려난 키 반환"""
+        self._remove(key)
+        band_keys = self._band_keys(signature, fingerprint)
+        self._entries[key] = (band_keys, signature, ai_prob)
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, []).append(key)
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            evicted.append(oldest)
+        return evicted
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in entry[0]:
+            bucket = self._buckets[band_key]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM near_duplicates")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.reused + self.misses
+            return {
+                "enabled": True,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "reused": self.reused,
+                "misses": self.misses,
+                "reuse_rate": round(self.reused / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+
+import torch
+from transformers import DynamicCache
+
+# 접두사 매칭 단위 (토큰 수) - 블록 경계마다 누적 해시를 인덱싱하고, 마지막 블록 이후는 토큰 단위로 비교
+BLOCK_TOKENS = 16
+
+
+def _block_hashes(ids: list[int]) -> list[int]:
+    """BLOCK_TOKENS 경계마다 그 위치까지의 접두사 해시 (i 번째 = ids[:BLOCK_TOKENS * (i + 1)])"""
+    hashes = []
+    h = 0
+    for start in range(0, len(ids) - BLOCK_TOKENS + 1, BLOCK_TOKENS):
+        h = hash((h, tuple(ids[start:start + BLOCK_TOKENS])))
+        hashes.append(h)
+    return hashes
+
+
+def _common_prefix(a: list[int], b: list[int]) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class _Entry:
+    __slots__ = ("ids", "layers", "hashes", "nbytes")
+
+    def __init__(self, ids: list[int], layers: list[tuple[torch.Tensor, torch.Tensor]], hashes: list[int]):
+        self.ids = ids
+        self.layers = layers
+        self.hashes = hashes
+        self.nbytes = sum(k.numel() * k.element_size() + v.numel() * v.element_size() for k, v in layers)
+
+
+class PrefixKVCache:
+    """최근 추론한 토큰 시퀀스의 past key/value 저장소 - 끝부분만 고친 재제출 문서는 바뀐 suffix 만 forward
+
+    - causal 모델이므로 공통 접두사의 key/value 는 이전 요청과 동일 (결과는 전체 forward 와 같음)
+    - 가장 긴 공통 토큰 접두사를 찾아 그 길이만큼 잘라낸 KV (view, 복사 없음) 를 반환
+    - 메모리 사용량(KV 텐서 byte 합) 기준 LRU, 새 항목이 기존 항목 전체를 접두사로 포함하면 기존 항목 제거
+    - 모델/어댑터별로 KV 가 다르므로 단일 어댑터 전용 (모델 교체 시 clear)
+    """
+
+    def __init__(self, max_bytes: int, min_tokens: int = 0):
+        self.max_bytes = max_bytes
+        self.min_tokens = min_tokens
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        # 블록 경계 접두사 해시 -> 그 접두사를 가진 항목 ID
+        self._blocks: dict[int, set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.reused_tokens = 0  # forward 를 생략한 토큰 수
+        self.computed_tokens = 0
+
+    def _longest_match(self, ids: list[int], hashes: list[int]) -> tuple[int | None, int]:
+        # 블록 단위로 가장 길게 이어지는 접두사를 가진 후보 -> 토큰 단위로 실제 공통 접두사 길이 계산 (해시 충돌 대비)
+        candidates: set[int] = set()
+        for h in hashes:
+            found = self._blocks.get(h)
+            if not found:
+                break
+            candidates = found
+        best, best_length = None, 0
+        for entry_id in candidates:
+            length = _common_prefix(ids, self._entries[entry_id].ids)
+            if length > best_length:
+                best, best_length = entry_id, length
+        return best, best_length
+
+    def match(self, ids: list[int]) -> tuple[int, DynamicCache] | None:
+        """ids 와 가장 긴 공통 접두사를 가진 항목의 KV - (접두사 길이, past_key_values), min_tokens 미만이면 None
+
+        마지막 토큰 위치의 logits 가 필요하므로 같은 시퀀스를 다시 보내도 최소 1 토큰은 남김
+        """
+        hashes = _block_hashes(ids)
+        with self._lock:
+            entry_id, length = self._longest_match(ids, hashes)
+            length = min(length, len(ids) - 1)
+            if entry_id is None or length < max(self.min_tokens, 1):
+                self.misses += 1
+                self.computed_tokens += len(ids)
+                return None
+            entry = self._entries[entry_id]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            self.reused_tokens += length
+            self.computed_tokens += len(ids) - length
+            layers = entry.layers
+        # forward 의 cache.update 는 torch.cat 으로 새 텐서를 만들므로 저장된 텐서는 바뀌지 않음
+        past = DynamicCache()
+        for layer_idx, (k, v) in enumerate(layers):
+            past.update(k[:, :, :length], v[:, :, :length], layer_idx)
+        return length, past
+
+    def put(self, ids: list[int], past_key_values, row: int = 0):
+        """forward 결과 KV 저장 - 배치 forward 면 row 번째 시퀀스의 앞 len(ids) 위치 (오른쪽 패딩 기준)"""
+        if len(ids) < max(self.min_tokens, 1):
+            return
+        layers = []
+        for k, v in past_key_values.to_legacy_cache():
+            whole = k.shape[0] == 1 and k.shape[2] == len(ids)
+            k, v = k[row:row + 1, :, :len(ids)], v[row:row + 1, :, :len(ids)]
+            if not whole:
+                # 배치/패딩 텐서의 view 를 그대로 두면 전체 배치 메모리가 유지되므로 복사
+                k, v = k.clone(), v.clone()
+            layers.append((k, v))
+        ids = list(ids)
+        hashes = _block_hashes(ids)
+        entry = _Entry(ids, layers, hashes)
+        if entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            prefix_id, length = self._longest_match(ids, hashes)
+            if prefix_id is not None and length == len(self._entries[prefix_id].ids):
+                # 이어 쓴 문서 - 이전 항목의 KV 는 새 항목의 접두사이므로 중복 저장하지 않음
+                self._remove(prefix_id)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            for h in hashes:
+                self._blocks.setdefault(h, set()).add(entry_id)
+            self.bytes += entry.nbytes
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        for h in entry.hashes:
+            ids = self._blocks.get(h)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._blocks[h]
+        self.bytes -= entry.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._blocks.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            total = self.reused_tokens + self.computed_tokens
+            return {
+                "enabled": True,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "reused_tokens": self.reused_tokens,
+                "reused_token_ratio": round(self.reused_tokens / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,233 @@
+"""
+학습 데이터 전처리: 원본 train/test CSV -> 문단 단위 stratified k-fold Parquet (--format csv 면 CSV)
+
+    cd backend
+    python preprocess.py --raw-dir ../data/raw --output-dir ../data/kfold_csv --workers 4
+    python preprocess.py --tokenizer kakaocorp/kanana-1.5-8b-instruct-2505
+
+notebooks/data_preprocess.py 의 단계를 그대로 따르며 --format csv 면 같은 입력에 대해 byte 단위로 같은 fold CSV 를 만듭니다.
+- 문단 분리: str.split + explode (빈 줄 기준, 문단이 1개 이하인 문서만 줄바꿈 기준으로 다시 분리)
+- 정제: 미리 컴파일한 정규식을 순서대로 Series 전체에 적용 (--workers 로 chunk 단위 multiprocessing)
+- 길이 필터: 라벨별 퍼센타일을 merge 로 붙여 한 번에 비교
+- --tokenizer: 문단 토큰 id 를 input_ids 열로 텍스트 옆에 저장 (Parquet 만) - train.py 가 토큰화 없이 사용
+- sample_submission.csv 는 제출 형식이므로 CSV 그대로 복사
+"""
+import argparse
+import logging
+import os
+import re
+import shutil
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+import data_io
+from config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEED = 42
+TRAIN_COLUMNS = ["title", "full_text", "generated"]
+
+# minimal_preprocess 정규식 (적용 순서가 결과에 영향을 주므로 순서 유지)
+# 예: "<漢>" 은 한자 제거 후 "<>" 가 되어 HTML 태그 패턴에 걸리지 않으므로 두 패턴을 하나로 합칠 수 없음
+CLEANUP_PATTERNS = [
+    (re.compile(r'[\u4E00-\u9FFF]'), ''),                         # 한자 제거
+    (re.compile(r'<[^>]+>'), ''),                                   # HTML 태그 제거
+    (re.compile(r'\(\s*[^\w가-힣]*\s*\)'), ''),                     # 빈 괄호 제거
+    (re.compile(r'\([^\(\)]{0,20}[\?\~]{1,3}[^\(\)]{0,20}\)'), ''),  # ( ? ~ ? ) 제거
+    (re.compile(r'[.,]{3,}'), '.'),                                 # ... → .
+    (re.compile(r'[()]{2,}'), ''),                                  # 괄호 잔재 정리
+    (re.compile(r',\s*,+'), ','),
+    # 중복 공백 제거 - \s+ → ' ' 와 결과가 같지만 이미 한 칸 공백인 곳은 치환하지 않음 (대부분의 매치)
+    (re.compile(r'\s{2,}|[^\S ]'), ' '),
+]
+
+
+def minimal_preprocess(text: str) -> str:
+    """문단 하나 정제 (notebooks/data_preprocess.py 의 minimal_preprocess 와 동일)"""
+    text = text.strip()
+    for pattern, repl in CLEANUP_PATTERNS:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def clean_texts(texts: pd.Series) -> pd.Series:
+    """minimal_preprocess 를 Series 전체에 적용"""
+    texts = texts.str.strip()
+    for pattern, repl in CLEANUP_PATTERNS:
+        texts = texts.str.replace(pattern, repl, regex=True)
+    return texts
+
+
+def _nonempty_parts(texts: pd.Series, separator: str) -> pd.Series:
+    parts = texts.str.split(separator).explode().str.strip()
+    return parts[parts != ""]
+
+
+def split_paragraphs(texts: pd.Series) -> pd.Series:
+    """문단 분리 - 원래 행 index 를 유지한 채 문단마다 한 행 (빈 줄 우선, 문단이 1개 이하면 줄바꿈 기준)"""
+    parts = _nonempty_parts(texts, "\n\n")
+    counts = parts.groupby(level=0).size().reindex(texts.index, fill_value=0)
+    retry = counts.index[counts <= 1]
+    if len(retry):
+        lines = _nonempty_parts(texts.loc[retry], "\n")
+        parts = pd.concat([parts.drop(retry, errors="ignore"), lines]).sort_index(kind="stable")
+    return parts
+
+
+def _paragraph_rows(train_df: pd.DataFrame) -> pd.DataFrame:
+    train_df = train_df.reset_index(drop=True)
+    paragraphs = split_paragraphs(train_df["full_text"])
+    rows = train_df.loc[paragraphs.index]
+    return pd.DataFrame({
+        "title": rows["title"].to_numpy(),
+        "paragraph_index": paragraphs.groupby(level=0).cumcount().to_numpy(),
+        "paragraph_text": clean_texts(paragraphs).to_numpy(),
+        "generated": rows["generated"].to_numpy(),
+    })
+
+
+def convert_train_to_paragraphs(train_df: pd.DataFrame, workers: int = 1) -> pd.DataFrame:
+    """문서 -> 문단 행 (title, paragraph_index, paragraph_text, generated) - workers > 1 이면 chunk 병렬 처리"""
+    if workers <= 1 or len(train_df) < workers:
+        return _paragraph_rows(train_df)
+    chunks = np.array_split(np.arange(len(train_df)), workers * 4)
+    with Pool(workers) as pool:
+        parts = pool.map(_paragraph_rows, [train_df.iloc[chunk] for chunk in chunks if len(chunk)])
+    return pd.concat(parts, ignore_index=True)
+
+
+def length_percentiles(df: pd.DataFrame, low: float = 0.35, high: float = 0.95) -> pd.DataFrame:
+    """라벨별 문단 길이(문자 수) 퍼센타일 - index=라벨, columns=p35/p95"""
+    return (
+        df["full_text"].str.len()
+          .groupby(df["generated"])
+          .quantile([low, high])
+          .unstack(level=1)
+          .rename(columns={low: "p35", high: "p95"})
+    )
+
+
+def filter_by_length(df: pd.DataFrame, percentiles: pd.DataFrame) -> pd.DataFrame:
+    """라벨별 p35 <= 길이 <= p95 인 문단만 유지"""
+    char_len = df["full_text"].str.len().to_numpy()
+    bounds = df[["generated"]].merge(percentiles, left_on="generated", right_index=True, how="left")
+    mask = (bounds["p35"].to_numpy() <= char_len) & (char_len <= bounds["p95"].to_numpy())
+    return df[mask].reset_index(drop=True)
+
+
+def undersample(df: pd.DataFrame, seed: int = SEED) -> pd.DataFrame:
+    """1:1 언더샘플링 - 라벨마다 소수 클래스 개수만큼 랜덤 추출"""
+    min_cnt = df["generated"].value_counts().min()
+    return pd.concat(
+        [group.sample(n=min_cnt, random_state=seed) for _, group in df.groupby("generated")]
+    ).reset_index(drop=True)
+
+
+def make_folds(df: pd.DataFrame, n_splits: int, seed: int = SEED) -> dict[int, pd.DataFrame]:
+    """Stratified k-fold - fold 별 검증 세트를 셔플하고 FOLD{fold}_{순번} ID 부여"""
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    fold_dfs = {}
+    for fold, (_, val_idx) in enumerate(skf.split(df, df["generated"])):
+        fold_df = df.iloc[val_idx].sample(frac=1, random_state=seed).reset_index(drop=True)
+        fold_df.insert(0, "id", [f"FOLD{fold}_{i:05d}" for i in range(len(fold_df))])
+        fold_dfs[fold] = fold_df
+    return fold_dfs
+
+
+def build_folds(train_df: pd.DataFrame, n_splits: int = 4, seed: int = SEED, workers: int = 1) -> dict[int, pd.DataFrame]:
+    """원본 학습 데이터 -> fold 별 DataFrame (문단 분리, 정제, 길이 필터, 언더샘플링, k-fold)"""
+    paragraphs = convert_train_to_paragraphs(train_df, workers)
+    paragraphs = (
+        paragraphs
+          .dropna(subset=["paragraph_text"])
+          .reset_index(drop=True)
+          .rename(columns={"paragraph_text": "full_text"})
+    )
+    percentiles = length_percentiles(paragraphs)
+    logger.info(f"Paragraph length percentiles by label:\n{percentiles}")
+    filtered = filter_by_length(paragraphs, percentiles)
+    logger.info(f"Paragraphs: {len(paragraphs)} -> {len(filtered)} after length filter")
+    balanced = undersample(filtered, seed)
+    logger.info(f"Balanced: {balanced['generated'].value_counts().sort_index().to_dict()}")
+    return make_folds(balanced, n_splits, seed)
+
+
+def preprocess_test(test_df: pd.DataFrame) -> pd.DataFrame:
+    test_df = test_df.copy()
+    test_df["paragraph_text"] = clean_texts(test_df["paragraph_text"])
+    return test_df
+
+
+def save_table(df: pd.DataFrame, path: str, text_column: str, tokenizer=None, max_length: int = settings.MAX_TEXT_LENGTH, tokenizer_digest: str = ""):
+    """DataFrame 저장 - tokenizer 가 있으면 text_column 토큰 id 를 input_ids 열로 함께 저장"""
+    if tokenizer is None:
+        data_io.write_table(df, path)
+        return
+    tokens = data_io.tokenize_texts(df[text_column].tolist(), tokenizer, max_length)
+    data_io.write_table(df, path, tokens, data_io.token_metadata(tokenizer_digest, max_length, text_column))
+
+
+def run(
+    raw_dir: str,
+    output_dir: str,
+    n_splits: int = 4,
+    seed: int = SEED,
+    workers: int = 1,
+    fmt: str = "parquet",
+    tokenizer=None,
+    max_length: int = settings.MAX_TEXT_LENGTH
+):
+    """raw_dir 의 train/test/sample_submission CSV -> output_dir 의 fold{i}.{fmt}, test_preprocessed.{fmt}"""
+    if tokenizer is not None and fmt != "parquet":
+        raise ValueError("Token columns require --format parquet")
+    digest = ""
+    if tokenizer is not None:
+        from model import tokenizer_hash
+        digest = tokenizer_hash(tokenizer)
+
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    train_df = data_io.read_table(os.path.join(raw_dir, "train.csv"), TRAIN_COLUMNS)
+    logger.info(f"Train documents: {len(train_df)}")
+
+    for fold, df in build_folds(train_df, n_splits, seed, workers).items():
+        save_path = os.path.join(output_dir, f"fold{fold}.{fmt}")
+        save_table(df, save_path, "full_text", tokenizer, max_length, digest)
+        logger.info(f"fold{fold}.{fmt} -> {save_path} ({len(df)} rows)")
+
+    test_df = data_io.read_table(os.path.join(raw_dir, "test.csv"))
+    save_table(
+        preprocess_test(test_df), os.path.join(output_dir, f"test_preprocessed.{fmt}"),
+        "paragraph_text", tokenizer, max_length, digest
+    )
+    shutil.copy(os.path.join(raw_dir, "sample_submission.csv"), os.path.join(output_dir, "sample_submission.csv"))
+    logger.info(f"Preprocessing complete in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build paragraph-level stratified k-fold Parquet/CSV files")
+    parser.add_argument("--raw-dir", default="../data/raw")
+    parser.add_argument("--output-dir", default="../data/kfold_csv")
+    parser.add_argument("--n-splits", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, default=1, help="문단 분리/정제 병렬 프로세스 수")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--tokenizer", default="", help="토큰 id 열을 함께 저장할 토크나이저 (학습 모델 이름/경로)")
+    parser.add_argument("--max-length", type=int, default=settings.MAX_TEXT_LENGTH, help="토큰 열 truncation 길이 (train.py --max-length 와 같아야 재사용)")
+    args = parser.parse_args()
+
+    tokenizer = None
+    if args.tokenizer:
+        from train import load_tokenizer
+        tokenizer = load_tokenizer(args.tokenizer)
+    run(args.raw_dir, args.output_dir, args.n_splits, args.seed, args.workers, args.format, tokenizer, args.max_length)
+
+
+if __name__ == "__main__":
+    main()
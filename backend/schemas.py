@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field, field_validator
 
 class PredictRequest(BaseModel):
@@ -15,21 +17,126 @@ class PredictResponse(BaseModel):
     prediction: str  # "AI 생성" or "사람 작성"
     confidence: str  # "높음", "중간", "낮음"
     char_count: int  # 입력 텍스트 글자 수
+    stage: str = "llm"  # 응답 단계: "cascade"(1단계 경량 분류기), "near_duplicate"(유사 문단 점수 재사용) or "llm"
+
+class EnsemblePredictResponse(PredictResponse):
+    fold_probabilities: list[float]  # fold 어댑터별 AI 확률
+    fold_std: float  # fold 간 표준편차 (불확실성)
+
+class TokenizedPredictRequest(BaseModel):
+    input_ids: list[int] = Field(..., min_length=1, max_length=4096)
+    tokenizer_hash: str  # GET /api/tokenizer 의 tokenizer_hash (다른 토크나이저로 만든 ID 거부)
+
+class TokenizedPredictResponse(BaseModel):
+    ai_probability: float = Field(..., ge=0.0, le=1.0)
+    prediction: str
+    confidence: str
+    num_tokens: int  # 모델에 들어간 토큰 수
+    stage: str = "llm"
+
+class TokenizerInfoResponse(BaseModel):
+    tokenizer_hash: str
+    vocab_size: int
+    max_length: int  # 허용되는 최대 input_ids 길이 (MAX_TEXT_LENGTH)
+
+class LongPredictRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=500_000)
+    pooling: Literal["mean", "max", "length_weighted"] = "mean"
+    window_tokens: int | None = Field(None, ge=16, le=4096)  # 기본값: LONG_WINDOW_TOKENS
+    stride: int | None = Field(None, ge=1, le=4096)  # 기본값: LONG_WINDOW_STRIDE
+
+    @field_validator('text')
+    def text_not_empty(cls, v):
+        if not v.strip():
+            raise ValueError('Text cannot be empty')
+        return v
+
+class WindowScore(BaseModel):
+    start_token: int
+    end_token: int
+    ai_probability: float
+
+class LongPredictResponse(BaseModel):
+    ai_probability: float = Field(..., ge=0.0, le=1.0)
+    prediction: str
+    confidence: str
+    pooling: str
+    char_count: int
+    num_tokens: int
+    windows: list[WindowScore]  # 윈도우별 AI 확률
+    tokens_per_sec: float
 
 class SentenceAnalysisRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=4096)
+    # independent: 문단별 독립 추론 / single_pass: 전체 텍스트 1회 forward 후 문단 끝 위치에서 점수 (prefix 조건부)
+    mode: Literal["independent", "single_pass"] = "independent"
 
 class OverallAnalysis(BaseModel):
     full_text_probability: float = Field(..., ge=0.0, le=1.0)
     prediction: str  # "AI 생성" or "사람 작성"
     confidence: str  # "높음", "중간", "낮음"
+    stage: str = "llm"  # 응답 단계: "cascade", "near_duplicate" or "llm"
 
 class SentenceAnalysisResponse(BaseModel):
     overall_analysis: OverallAnalysis  # 전체 텍스트 평가
-    paragraph_analysis: list[dict]  # [{"text": "문단", "ai_probability": 0.85}, ...]
+    paragraph_analysis: list[dict]  # [{"text": "문단", "ai_probability": 0.85, "stage": "llm"}, ...]
     paragraph_average: float  # 문단별 평균 (참고용)
+    mode: str = "independent"  # 문단 점수 계산 방식
+
+class BulkScoreRequest(BaseModel):
+    input_path: str  # BULK_DATA_DIR 기준 CSV/JSONL/Parquet 경로
+    output_path: str  # BULK_DATA_DIR 기준 출력 경로 (.csv 또는 .parquet)
+    text_column: str = "paragraph_text"
+    id_column: str | None = None
+    chunk_size: int = Field(1000, ge=1, le=100_000)
+
+class BulkJobStatus(BaseModel):
+    job_id: str
+    status: str  # "running", "completed", "failed", "cancelled"
+    input_path: str
+    output_path: str
+    rows_done: int
+    rows_per_sec: float
+    error: str | None = None
 
 class HealthResponse(BaseModel):
-    status: str
+    status: str  # /api/health: "healthy", /api/ready: "ready" / "loading" / "saturated"
     model_loaded: bool
     gpu_available: bool
+    queue_tokens: int  # admission 된 요청의 입력 토큰 합
+    queue_requests: int
+    queue_capacity_tokens: int  # 0: admission control 비활성화
+    queue_saturation: float  # queue_tokens / queue_capacity_tokens
+    saturated: bool
+    throughput_tokens_per_s: float | None = None  # 최근 배치 기준 추정 처리량
+
+class NearDuplicateStats(BaseModel):
+    enabled: bool
+    entries: int = 0
+    max_entries: int = 0
+    threshold: float = 0.0
+    reused: int = 0  # 유사 문단 점수 재사용으로 생략한 모델 호출 수
+    misses: int = 0
+    reuse_rate: float = 0.0
+
+class PrefixCacheStats(BaseModel):
+    enabled: bool
+    entries: int = 0
+    bytes: int = 0  # 저장한 KV 텐서 메모리 합
+    max_bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    hit_rate: float = 0.0
+    reused_tokens: int = 0  # 접두사 KV 재사용으로 forward 를 생략한 토큰 수
+    reused_token_ratio: float = 0.0
+
+class CacheStatsResponse(BaseModel):
+    enabled: bool
+    entries: int = 0
+    max_entries: int = 0
+    hits: int = 0
+    disk_hits: int = 0  # SQLite 디스크 계층에서 찾은 횟수
+    misses: int = 0
+    hit_rate: float = 0.0
+    near_duplicate: NearDuplicateStats
+    prefix_cache: PrefixCacheStats
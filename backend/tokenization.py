@@ -0,0 +1,122 @@
+import asyncio
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import metrics
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenizerPool:
+    """토큰화 전용 스레드 풀 - 모델 forward 와 겹쳐서 실행 (fast tokenizer 는 Rust 에서 GIL 을 놓음)
+
+    비동기 encode() 호출은 모아서 한 번의 batch 토큰화로 처리합니다. 워커가 모두 바쁜 동안 들어온 호출은
+    대기했다가 다음 batch 에 함께 묶이므로, 부하가 클수록 batch 가 커집니다.
+    스레드마다 토크나이저 사본을 쓰므로 truncation 설정이 다른 호출끼리 충돌하지 않습니다.
+    """
+
+    def __init__(self, detector, num_workers: int = 2):
+        self.detector = detector
+        self.num_workers = max(1, num_workers)
+        self._pool: ThreadPoolExecutor | None = None
+        self._local = threading.local()
+        self._pending: list[tuple[list[str], asyncio.Future]] = []
+        self._in_flight = 0
+        self._flush_scheduled = False
+
+    def start(self):
+        if self._pool is not None:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="tokenizer")
+        logger.info(f"Tokenizer pool started: workers={self.num_workers}")
+
+    def shutdown(self):
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def _tokenizer(self):
+        tokenizer = getattr(self._local, "tokenizer", None)
+        if tokenizer is None:
+            tokenizer = self._local.tokenizer = copy.deepcopy(self.detector.tokenizer)
+        return tokenizer
+
+    def encode_sync(self, texts: list[str]) -> list[list[int]]:
+        """AITextDetector.encode 와 같은 토큰화 (MAX_TEXT_LENGTH 로 잘라냄, 패딩 없음)"""
+        if not texts:
+            return []
+        start = time.perf_counter()
+        input_ids = self._tokenizer()(
+            texts,
+            truncation=True,
+            max_length=settings.MAX_TEXT_LENGTH
+        )["input_ids"]
+        metrics.STAGE_LATENCY.observe(time.perf_counter() - start, "tokenize")
+        return input_ids
+
+    def count_tokens_sync(self, texts: list[str]) -> list[int]:
+        """잘라내기 없는 토큰 수 (admission 비용 계산용)"""
+        if not texts:
+            return []
+        return [len(ids) for ids in self._tokenizer()(texts, return_attention_mask=False)["input_ids"]]
+
+    def submit(self, texts: list[str]) -> Future:
+        """동기 호출자용 - 토큰화를 풀에 넣고 Future 반환 (다음 chunk 를 미리 토큰화하는 파이프라인)"""
+        if self._pool is None:
+            raise RuntimeError("Tokenizer pool not started")
+        return self._pool.submit(self.encode_sync, texts)
+
+    async def count_tokens(self, texts: list[str]) -> list[int]:
+        if self._pool is None:
+            raise RuntimeError("Tokenizer pool not started")
+        return await asyncio.wrap_future(self._pool.submit(self.count_tokens_sync, texts))
+
+    async def run(self, fn, *args):
+        """토큰화 스레드에서 fn 실행 - 결과 캐시 조회/저장, cascade 처럼 이벤트 루프를 막는 전처리/후처리용"""
+        if self._pool is None:
+            raise RuntimeError("Tokenizer pool not started")
+        return await asyncio.wrap_future(self._pool.submit(fn, *args))
+
+    async def encode(self, texts: list[str]) -> list[list[int]]:
+        """texts 를 토큰화 - 같은 시점에 들어온 다른 호출과 한 번의 batch 로 묶음"""
+        if self._pool is None:
+            raise RuntimeError("Tokenizer pool not started")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        if not self._flush_scheduled:
+            # 같은 이벤트 루프 반복에서 들어온 호출까지 모은 뒤 실행
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if not self._pending or self._in_flight >= self.num_workers:
+            return
+        pending, self._pending = self._pending, []
+        texts = [text for batch, _ in pending for text in batch]
+        self._in_flight += 1
+        job = asyncio.wrap_future(self._pool.submit(self.encode_sync, texts))
+        job.add_done_callback(lambda done: self._resolve(pending, done))
+
+    def _resolve(self, pending: list[tuple[list[str], asyncio.Future]], job: asyncio.Future):
+        self._in_flight -= 1
+        error = None if job.cancelled() else job.exception()
+        offset = 0
+        for batch, future in pending:
+            if not future.done():
+                if job.cancelled():
+                    future.cancel()
+                elif error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(job.result()[offset:offset + len(batch)])
+            offset += len(batch)
+        # 워커가 비었으니 그동안 쌓인 호출 처리
+        self._flush()
@@ -0,0 +1,574 @@
+"""
+LoRA 분류 학습 (notebooks/kanana_fold0.py 의 모듈 버전)
+
+    cd backend
+    python train.py --val-fold 0 --group-by-length
+    python train.py --val-fold 0 --packing --max-length 512
+
+- fold 파일: fold{i}.parquet (없으면 fold{i}.csv) - preprocess.py --tokenizer 로 만든 input_ids 열이 있고
+  토크나이저 hash / max_length 가 같으면 텍스트 열은 읽지 않고 토큰 열만 사용
+- 토큰화 캐시: 토큰 열이 없는 fold 의 토큰화 결과를 {cache-dir}/{토크나이저 hash}/ 에 Arrow IPC 로 저장
+  (파일 크기/수정 시각, max_length 가 같으면 memory map 으로 복사 없이 재사용)
+- length-grouped sampler: 셔플 후 mega batch 안에서 길이순으로 묶어 패딩 감소 (배치 순서는 다시 셔플)
+- packing: 여러 문단을 max_length 행 하나에 이어 붙이고 block-diagonal causal mask + 문단별 position_ids 로
+  문단 간 attention 을 막음 (문단마다 마지막 토큰 hidden state 로 분류 - 따로 forward 한 것과 같은 값)
+- max_length: 기본값은 서빙과 같은 MAX_TEXT_LENGTH, 짧은 truncation / packing 행 길이는 --max-length 512 처럼 지정
+- epoch 마다 tokens/sec (패딩 제외), 패딩 비율 기록, --checkpoint-dir 에 어댑터 checkpoint 저장 (최근 save_total_limit 개 유지)
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import torch
+from peft import LoraConfig, TaskType, get_peft_model
+from sklearn.metrics import roc_auc_score
+from torch.utils.data import Sampler
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, get_linear_schedule_with_warmup
+
+import data_io
+from config import settings
+from model import bnb_4bit_config, tokenizer_hash
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "kakaocorp/kanana-1.5-8b-instruct-2505"
+TARGET_MODULES = ["q_proj", "k_proj", "v_proj", "o_proj", "gate_proj", "up_proj", "down_proj"]
+SEED = 42
+CHECKPOINT_DIR = "../models/checkpoints/kanana"
+
+# 캐시 파일 형식이 바뀌면 이전 캐시를 쓰지 않음
+TOKEN_CACHE_VERSION = "fold-tokens-v2"
+
+
+@dataclass
+class TrainConfig:
+    learning_rate: float = 2e-5
+    batch_size: int = 8  # packing 이면 max_length 행 수
+    eval_batch_size: int = 8
+    epochs: int = 1
+    warmup_ratio: float = 0.0
+    weight_decay: float = 0.0
+    group_by_length: bool = False
+    packing: bool = False
+    log_steps: int = 1000
+    seed: int = SEED
+
+
+class TokenizedFold:
+    """토큰화된 fold - 문단 토큰을 이어 붙인 배열 + 경계 offset (문단 i = tokens[offsets[i]:offsets[i + 1]])"""
+
+    def __init__(self, tokens: np.ndarray, offsets: np.ndarray, labels: np.ndarray, ids: np.ndarray):
+        self.tokens = tokens
+        self.offsets = offsets
+        self.labels = labels  # 라벨이 없으면 -1 (test)
+        self.ids = ids
+
+    @classmethod
+    def from_texts(cls, texts: list[str], labels, ids, tokenizer, max_length: int) -> "TokenizedFold":
+        tokens, offsets = data_io.tokenize_texts(texts, tokenizer, max_length)
+        return cls(tokens, offsets, np.asarray(labels, dtype=np.int64), np.asarray(ids, dtype=str))
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table, label_column: str = "label", id_column: str = "id") -> "TokenizedFold":
+        """input_ids 열이 있는 Arrow Table -> TokenizedFold (토큰/라벨은 Arrow 버퍼를 복사 없이 사용)"""
+        tokens, offsets = data_io.token_arrays(table[data_io.TOKEN_COLUMN])
+        names = table.column_names
+        labels = table[label_column].to_numpy().astype(np.int64, copy=False) if label_column in names else np.full(table.num_rows, -1)
+        ids = table[id_column].to_numpy().astype(str) if id_column in names else np.arange(table.num_rows).astype(str)
+        return cls(tokens, offsets, labels, ids)
+
+    def to_arrow(self) -> pa.Table:
+        return pa.table({
+            data_io.TOKEN_COLUMN: data_io.token_list_array(self.tokens, self.offsets),
+            "label": self.labels,
+            "id": self.ids,
+        })
+
+    @classmethod
+    def load(cls, path: str) -> "TokenizedFold":
+        """Arrow IPC 캐시를 memory map 으로 읽음 (토큰 배열은 페이지 캐시를 그대로 참조)"""
+        return cls.from_arrow(pa.ipc.open_file(pa.memory_map(path)).read_all())
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp"
+        table = self.to_arrow()
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @staticmethod
+    def concat(folds: list["TokenizedFold"]) -> "TokenizedFold":
+        offsets = [np.zeros(1, dtype=np.int64)]
+        total = 0
+        for fold in folds:
+            offsets.append(fold.offsets[1:] + total)
+            total += int(fold.offsets[-1])
+        return TokenizedFold(
+            np.concatenate([fold.tokens for fold in folds]),
+            np.concatenate(offsets),
+            np.concatenate([fold.labels for fold in folds]),
+            np.concatenate([fold.ids for fold in folds])
+        )
+
+
+def token_cache_path(cache_dir: str, data_path: str, tokenizer_digest: str, max_length: int, text_column: str) -> str:
+    """{cache_dir}/{토크나이저 hash 앞 16자}/{파일 이름}.{파일 크기/수정 시각 + max_length hash}.arrow"""
+    stat = os.stat(data_path)
+    key = f"{TOKEN_CACHE_VERSION}:{os.path.abspath(data_path)}:{stat.st_size}:{stat.st_mtime_ns}:{max_length}:{text_column}"
+    name = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(
+        cache_dir, tokenizer_digest[:16], f"{name}.{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.arrow"
+    )
+
+
+def load_tokenized_fold(
+    data_path: str,
+    tokenizer,
+    max_length: int,
+    cache_dir: str = "",
+    text_column: str = "full_text",
+    label_column: str = "generated",
+    id_column: str = "id",
+    tokenizer_digest: str | None = None
+) -> TokenizedFold:
+    """fold 파일 (Parquet/CSV) -> TokenizedFold
+
+    같은 설정으로 만든 input_ids 열이 있으면 토큰/라벨/ID 열만 읽고, 없으면 텍스트를 토큰화 (cache_dir 가 있으면 캐시 사용)
+    """
+    digest = tokenizer_digest or tokenizer_hash(tokenizer)
+    columns = [c for c in (label_column, id_column) if c in data_io.table_columns(data_path)]
+    if data_io.has_tokens(data_path, data_io.token_metadata(digest, max_length, text_column)):
+        table = data_io.read_arrow(data_path, [data_io.TOKEN_COLUMN, *columns])
+        return TokenizedFold.from_arrow(table, label_column, id_column)
+
+    path = ""
+    if cache_dir:
+        path = token_cache_path(cache_dir, data_path, digest, max_length, text_column)
+        if os.path.exists(path):
+            return TokenizedFold.load(path)
+
+    start = time.perf_counter()
+    df = data_io.read_table(data_path, [text_column, *columns])
+    labels = df[label_column] if label_column in df else np.full(len(df), -1)
+    ids = df[id_column].astype(str) if id_column in df else np.arange(len(df)).astype(str)
+    fold = TokenizedFold.from_texts(df[text_column].tolist(), labels, ids, tokenizer, max_length)
+    logger.info(f"Tokenized {data_path}: {len(fold)} rows, {len(fold.tokens)} tokens in {time.perf_counter() - start:.1f}s")
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fold.save(path)
+    return fold
+
+
+class LengthGroupedBatchSampler(Sampler):
+    """길이가 비슷한 문단끼리 배치 - 셔플한 인덱스를 batch_size * mega_batch_mult 개씩 나눠 길이순 정렬 후 배치로 자름
+
+    배치 순서는 다시 셔플하므로 epoch 안에서 길이 순서로 학습되지는 않음. set_epoch 로 epoch 마다 다른 순서.
+    """
+
+    def __init__(self, lengths: np.ndarray, batch_size: int, seed: int = SEED, mega_batch_mult: int = 50, group_by_length: bool = True):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.seed = seed
+        self.mega_batch_mult = mega_batch_mult
+        self.group_by_length = group_by_length
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def batches(self) -> list[np.ndarray]:
+        rng = np.random.default_rng(self.seed + self.epoch)
+        order = rng.permutation(len(self.lengths))
+        if not self.group_by_length:
+            return [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        mega = self.batch_size * self.mega_batch_mult
+        batches = []
+        for start in range(0, len(order), mega):
+            group = order[start:start + mega]
+            group = group[np.argsort(-self.lengths[group], kind="stable")]
+            batches.extend(group[i:i + self.batch_size] for i in range(0, len(group), self.batch_size))
+        return [batches[i] for i in rng.permutation(len(batches))]
+
+    def __iter__(self):
+        return iter(self.batches())
+
+    def __len__(self) -> int:
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+
+def pack_indices(lengths: np.ndarray, max_length: int, seed: int = SEED) -> list[list[int]]:
+    """문단을 max_length 행에 채워 넣기 - 셔플 순서대로, 남은 공간이 가장 작으면서 들어가는 행에 추가 (best-fit)"""
+    rng = np.random.default_rng(seed)
+    rows: list[list[int]] = []
+    by_space: list[list[int]] = [[] for _ in range(max_length + 1)]  # 남은 공간 -> 행 번호
+    for i in rng.permutation(len(lengths)).tolist():
+        n = min(int(lengths[i]), max_length)
+        for space in range(n, max_length + 1):
+            if by_space[space]:
+                r = by_space[space].pop()
+                break
+        else:
+            r, space = len(rows), max_length
+            rows.append([])
+        rows[r].append(i)
+        by_space[space - n].append(r)
+    return rows
+
+
+def collate(fold: TokenizedFold, indices, pad_token_id: int) -> dict:
+    """오른쪽 패딩 배치 - 문단마다 (행, 마지막 토큰 위치) 로 분류"""
+    sequences = [fold[i] for i in indices]
+    width = max(len(s) for s in sequences)
+    input_ids = np.full((len(sequences), width), pad_token_id, dtype=np.int64)
+    attention_mask = np.zeros((len(sequences), width), dtype=np.int64)
+    for row, seq in enumerate(sequences):
+        input_ids[row, :len(seq)] = seq
+        attention_mask[row, :len(seq)] = 1
+    return {
+        "input_ids": torch.from_numpy(input_ids),
+        "attention_mask": torch.from_numpy(attention_mask),
+        "position_ids": None,
+        "segment_rows": torch.arange(len(sequences)),
+        "segment_ends": torch.tensor([len(s) - 1 for s in sequences]),
+        "labels": torch.from_numpy(fold.labels[np.asarray(indices)]),
+        "real_tokens": int(attention_mask.sum()),
+    }
+
+
+def packed_attention_mask(segments: torch.Tensor, dtype: torch.dtype) -> torch.Tensor:
+    """(행, 1, 길이, 길이) additive mask - 같은 문단 안에서만 causal attention (segments: 문단 번호, 패딩 0)"""
+    width = segments.shape[1]
+    causal = torch.ones(width, width, dtype=torch.bool).tril()
+    allowed = causal[None, None] & (segments[:, None, :, None] == segments[:, None, None, :]) & (segments[:, None, None, :] > 0)
+    # 패딩 query 는 자기 자신만 보게 해 softmax 가 정의되도록 함 (출력은 사용하지 않음)
+    allowed |= torch.eye(width, dtype=torch.bool)[None, None]
+    mask = torch.zeros(allowed.shape, dtype=dtype)
+    return mask.masked_fill(~allowed, torch.finfo(dtype).min)
+
+
+def collate_packed(fold: TokenizedFold, rows: list[list[int]], pad_token_id: int, dtype: torch.dtype = torch.float32) -> dict:
+    """packing 배치 - 행마다 여러 문단, 문단마다 position_ids 를 0 부터 다시 시작"""
+    widths = [sum(len(fold[i]) for i in row) for row in rows]
+    width = max(widths)
+    input_ids = np.full((len(rows), width), pad_token_id, dtype=np.int64)
+    position_ids = np.zeros((len(rows), width), dtype=np.int64)
+    segments = np.zeros((len(rows), width), dtype=np.int64)
+    segment_rows, segment_ends, labels = [], [], []
+    for r, row in enumerate(rows):
+        offset = 0
+        for k, i in enumerate(row, start=1):
+            seq = fold[i]
+            input_ids[r, offset:offset + len(seq)] = seq
+            position_ids[r, offset:offset + len(seq)] = np.arange(len(seq))
+            segments[r, offset:offset + len(seq)] = k
+            offset += len(seq)
+            segment_rows.append(r)
+            segment_ends.append(offset - 1)
+            labels.append(fold.labels[i])
+    return {
+        "input_ids": torch.from_numpy(input_ids),
+        "attention_mask": packed_attention_mask(torch.from_numpy(segments), dtype),
+        "position_ids": torch.from_numpy(position_ids),
+        "segment_rows": torch.tensor(segment_rows),
+        "segment_ends": torch.tensor(segment_ends),
+        "labels": torch.tensor(labels),
+        "real_tokens": sum(widths),
+    }
+
+
+def classifier_parts(model):
+    """(backbone, score head) - AITextDetector._classifier_parts 와 같음 (LoRA 가 주입된 모듈 그대로)"""
+    base = model.get_base_model() if hasattr(model, "get_base_model") else model
+    return getattr(base, base.base_model_prefix), base.score
+
+
+def compute_dtype(model) -> torch.dtype:
+    backbone, _ = classifier_parts(model)
+    return backbone.get_input_embeddings().weight.dtype
+
+
+def classify(model, batch: dict) -> torch.Tensor:
+    """배치의 문단별 logits (float32) - shape (문단 수, 라벨 수)"""
+    backbone, head = classifier_parts(model)
+    device = backbone.get_input_embeddings().weight.device
+    position_ids = batch["position_ids"]
+    hidden = backbone(
+        input_ids=batch["input_ids"].to(device),
+        attention_mask=batch["attention_mask"].to(device),
+        position_ids=None if position_ids is None else position_ids.to(device),
+        use_cache=False
+    ).last_hidden_state
+    pooled = hidden[batch["segment_rows"].to(hidden.device), batch["segment_ends"].to(hidden.device)]
+    return head(pooled).float()
+
+
+def epoch_batches(fold: TokenizedFold, config: TrainConfig, max_length: int, epoch: int) -> list:
+    """epoch 의 학습 배치 인덱스 - packing 이면 행(문단 인덱스 리스트)의 리스트, 아니면 문단 인덱스 배열"""
+    if config.packing:
+        rows = pack_indices(fold.lengths, max_length, config.seed + epoch)
+        return [rows[i:i + config.batch_size] for i in range(0, len(rows), config.batch_size)]
+    sampler = LengthGroupedBatchSampler(fold.lengths, config.batch_size, config.seed, group_by_length=config.group_by_length)
+    sampler.set_epoch(epoch)
+    return sampler.batches()
+
+
+def predict(model, fold: TokenizedFold, batch_size: int, pad_token_id: int) -> np.ndarray:
+    """문단별 AI 확률 (길이순 배치로 계산 후 원래 순서로)"""
+    probs = np.zeros(len(fold), dtype=np.float32)
+    order = np.argsort(fold.lengths, kind="stable")
+    model.eval()
+    with torch.no_grad():
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            logits = classify(model, collate(fold, indices, pad_token_id))
+            probs[indices] = torch.softmax(logits, dim=-1)[:, 1].cpu().numpy()
+    return probs
+
+
+def save_checkpoint(model, checkpoint_dir: str, step: int, history: list[dict], save_total_limit: int = 2):
+    """{checkpoint_dir}/checkpoint-{step} 에 어댑터 + 지금까지의 epoch 통계 저장, 오래된 checkpoint 는 save_total_limit 개만 남김"""
+    path = os.path.join(checkpoint_dir, f"checkpoint-{step}")
+    model.save_pretrained(path)
+    with open(os.path.join(path, "train_stats.json"), "w", encoding="utf-8") as f:
+        json.dump({"step": step, "epochs": history}, f, indent=2)
+    logger.info(f"Checkpoint saved: {path}")
+
+    checkpoints = sorted(
+        (name for name in os.listdir(checkpoint_dir) if name.startswith("checkpoint-") and name[11:].isdigit()),
+        key=lambda name: int(name[11:])
+    )
+    for name in checkpoints[:max(len(checkpoints) - save_total_limit, 0)]:
+        shutil.rmtree(os.path.join(checkpoint_dir, name), ignore_errors=True)
+
+
+def train(
+    model,
+    train_fold: TokenizedFold,
+    val_fold: TokenizedFold | None,
+    config: TrainConfig,
+    pad_token_id: int,
+    max_length: int,
+    checkpoint_dir: str = "",
+    save_total_limit: int = 2
+) -> list[dict]:
+    """AdamW + linear schedule 학습 - epoch 별 통계 (loss, tokens/sec, 패딩 비율, 검증 AUC) 반환
+
+    checkpoint_dir 가 있으면 epoch 마다 어댑터 checkpoint 저장 (HF Trainer save_strategy="epoch" 와 같은 위치/이름)
+    """
+    torch.manual_seed(config.seed)
+    dtype = compute_dtype(model)
+    params = [p for p in model.parameters() if p.requires_grad]
+    optimizer = torch.optim.AdamW(params, lr=config.learning_rate, weight_decay=config.weight_decay)
+    # packing 은 epoch 마다 행 구성이 달라 step 수도 달라지므로 전체 epoch 의 배치를 미리 만들어 scheduler 길이를 정확히 맞춤
+    plans = [epoch_batches(train_fold, config, max_length, epoch) for epoch in range(config.epochs)]
+    total_steps = sum(len(batches) for batches in plans)
+    scheduler = get_linear_schedule_with_warmup(optimizer, int(total_steps * config.warmup_ratio), total_steps)
+
+    history = []
+    step = 0
+    for epoch, batches in enumerate(plans):
+        model.train()
+        real_tokens = padded_tokens = paragraphs = 0
+        loss_sum = 0.0
+        start = time.perf_counter()
+        for indices in batches:
+            if config.packing:
+                batch = collate_packed(train_fold, indices, pad_token_id, dtype)
+            else:
+                batch = collate(train_fold, indices, pad_token_id)
+            logits = classify(model, batch)
+            loss = torch.nn.functional.cross_entropy(logits, batch["labels"].to(logits.device))
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            optimizer.zero_grad(set_to_none=True)
+
+            step += 1
+            real_tokens += batch["real_tokens"]
+            padded_tokens += batch["input_ids"].numel()
+            paragraphs += len(batch["labels"])
+            loss_sum += loss.item() * len(batch["labels"])
+            if config.log_steps and (step == 1 or step % config.log_steps == 0):
+                logger.info(f"step {step}/{total_steps} loss={loss.item():.4f} lr={scheduler.get_last_lr()[0]:.2e}")
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        seconds = time.perf_counter() - start
+
+        stats = {
+            "epoch": epoch + 1,
+            "steps": step,
+            "paragraphs": paragraphs,
+            "loss": round(loss_sum / max(paragraphs, 1), 4),
+            "seconds": round(seconds, 2),
+            "tokens_per_sec": round(real_tokens / seconds, 1) if seconds > 0 else 0.0,
+            "real_tokens": real_tokens,
+            "padded_tokens": padded_tokens,
+            "padding_waste": round(1 - real_tokens / padded_tokens, 4) if padded_tokens else 0.0,
+        }
+        if val_fold is not None and len(set(val_fold.labels.tolist())) > 1:
+            stats["val_auc"] = round(float(roc_auc_score(
+                val_fold.labels, predict(model, val_fold, config.eval_batch_size, pad_token_id)
+            )), 4)
+        logger.info(f"epoch {epoch + 1}: {json.dumps(stats)}")
+        history.append(stats)
+        if checkpoint_dir:
+            save_checkpoint(model, checkpoint_dir, step, history, save_total_limit)
+    return history
+
+
+def load_tokenizer(model_name: str):
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    return tokenizer
+
+
+def load_base_model(model_name: str, tokenizer, quantize: bool | None = None):
+    """분류 base 모델 - GPU 면 4-bit (bf16 연산), CPU 면 float32"""
+    if quantize is None:
+        quantize = torch.cuda.is_available()
+    if quantize:
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_name, num_labels=2, quantization_config=bnb_4bit_config(), torch_dtype=torch.bfloat16, device_map="auto"
+        )
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=2, torch_dtype=torch.float32)
+    model.config.pad_token_id = tokenizer.pad_token_id
+    return model
+
+
+def attach_lora(model, r: int = 32, alpha: int = 16, dropout: float = 0.1):
+    lora_config = LoraConfig(
+        r=r,
+        lora_alpha=alpha,
+        lora_dropout=dropout,
+        task_type=TaskType.SEQ_CLS,
+        target_modules=TARGET_MODULES
+    )
+    return get_peft_model(model, lora_config)
+
+
+def seed_everything(seed: int):
+    random.seed(seed)
+    os.environ["PYTHONHASHSEED"] = str(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    torch.cuda.manual_seed(seed)
+
+
+def load_all_folds(fold_dir: str, n_folds: int, tokenizer, max_length: int, cache_dir: str) -> list[TokenizedFold]:
+    digest = tokenizer_hash(tokenizer)
+    return [
+        load_tokenized_fold(data_io.find_table(fold_dir, f"fold{i}"), tokenizer, max_length, cache_dir, tokenizer_digest=digest)
+        for i in range(n_folds)
+    ]
+
+
+def split_folds(folds: list[TokenizedFold], val_fold: int) -> tuple[TokenizedFold, TokenizedFold]:
+    """val_fold 를 검증, 나머지를 학습으로 (notebooks/kanana_fold0.py 와 같은 분할)"""
+    return TokenizedFold.concat([fold for i, fold in enumerate(folds) if i != val_fold]), folds[val_fold]
+
+
+def load_folds(fold_dir: str, n_folds: int, val_fold: int, tokenizer, max_length: int, cache_dir: str) -> tuple[TokenizedFold, TokenizedFold]:
+    return split_folds(load_all_folds(fold_dir, n_folds, tokenizer, max_length, cache_dir), val_fold)
+
+
+def save_adapter(model, tokenizer, output_dir: str, config: TrainConfig, max_length: int, history: list[dict]):
+    """LoRA 어댑터 + 토크나이저 + 학습 통계 (train_stats.json) 저장"""
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, "train_stats.json"), "w", encoding="utf-8") as f:
+        json.dump({"config": asdict(config), "max_length": max_length, "epochs": history}, f, indent=2)
+
+
+def add_training_arguments(parser: argparse.ArgumentParser):
+    """train.py / train_kfold.py 공통 인자 (모델, 데이터, 학습 설정)"""
+    parser.add_argument("--model-name", default=MODEL_NAME)
+    parser.add_argument("--fold-dir", default="../data/kfold_csv")
+    parser.add_argument("--n-folds", type=int, default=4)
+    parser.add_argument("--cache-dir", default="../data/tokenized", help="토큰화 캐시 디렉터리 (빈 문자열: 캐시 안 함)")
+    parser.add_argument(
+        "--max-length", type=int, default=settings.MAX_TEXT_LENGTH,
+        help="truncation 길이 (기본: 서빙과 같은 MAX_TEXT_LENGTH, packing 이면 행 길이 - 예: --packing --max-length 512)"
+    )
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--eval-batch-size", type=int, default=8)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--learning-rate", type=float, default=2e-5)
+    parser.add_argument("--group-by-length", action="store_true")
+    parser.add_argument("--packing", action="store_true")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR, help="epoch 마다 어댑터 checkpoint 저장 (빈 문자열: 저장 안 함)")
+    parser.add_argument("--save-total-limit", type=int, default=2, help="유지할 최근 checkpoint 수")
+    parser.add_argument("--lora-r", type=int, default=32)
+    parser.add_argument("--lora-alpha", type=int, default=16)
+    parser.add_argument("--lora-dropout", type=float, default=0.1)
+    parser.add_argument("--log-steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=SEED)
+
+
+def config_from_args(args) -> TrainConfig:
+    return TrainConfig(
+        learning_rate=args.learning_rate,
+        batch_size=args.batch_size,
+        eval_batch_size=args.eval_batch_size,
+        epochs=args.epochs,
+        group_by_length=args.group_by_length,
+        packing=args.packing,
+        log_steps=args.log_steps,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a LoRA classifier on the k-fold paragraph files")
+    add_training_arguments(parser)
+    parser.add_argument("--val-fold", type=int, default=0)
+    parser.add_argument("--output-dir", default="../models/lora_adapters/kanana")
+    parser.add_argument("--val-preds", default="../outputs/ensemble/val_kanana_pred.parquet", help="검증 fold 예측 (ID, generated, label) - .parquet 또는 .csv")
+    args = parser.parse_args()
+
+    seed_everything(args.seed)
+    config = config_from_args(args)
+    tokenizer = load_tokenizer(args.model_name)
+    train_fold, val_fold = load_folds(args.fold_dir, args.n_folds, args.val_fold, tokenizer, args.max_length, args.cache_dir)
+    logger.info(f"Train: {len(train_fold)}  Validation: {len(val_fold)}")
+
+    model = attach_lora(load_base_model(args.model_name, tokenizer), args.lora_r, args.lora_alpha, args.lora_dropout)
+    model.print_trainable_parameters()
+    history = train(
+        model, train_fold, val_fold, config, tokenizer.pad_token_id, args.max_length,
+        args.checkpoint_dir, args.save_total_limit
+    )
+
+    save_adapter(model, tokenizer, args.output_dir, config, args.max_length, history)
+    logger.info(f"Adapter saved: {args.output_dir}")
+
+    if args.val_preds:
+        probs = predict(model, val_fold, config.eval_batch_size, tokenizer.pad_token_id)
+        os.makedirs(os.path.dirname(args.val_preds) or ".", exist_ok=True)
+        data_io.write_table(pd.DataFrame({"ID": val_fold.ids, "generated": probs, "label": val_fold.labels}), args.val_preds)
+        logger.info(f"Validation predictions saved: {args.val_preds}")
+
+
+if __name__ == "__main__":
+    main()
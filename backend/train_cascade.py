@@ -0,0 +1,101 @@
+"""
+1단계 cascade 분류기 학습 (문자 n-gram TF-IDF + 로지스틱 회귀)
+
+    cd backend
+    python train_cascade.py --val-fold 0 --target-agreement 0.98
+    python train_cascade.py --val-fold 0 --llm-preds ../outputs/ensemble/val_kanana_pred.parquet
+
+notebooks/data_preprocess.py 가 만든 fold 파일 (Parquet, 없으면 CSV) 의 텍스트/라벨 열만 읽어 학습하고, 검증 fold 에서 1단계가 직접 응답하는 구간의 임계값을 조정합니다.
+--llm-preds 를 주면 라벨 대신 LLM 판정과의 일치율을 목표로 합니다 (kanana_fold0.py 의 val 예측 파일).
+"""
+import argparse
+import logging
+import os
+
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.pipeline import make_pipeline
+
+import data_io
+from cascade import CascadeClassifier, tune_thresholds
+from config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FOLD_COLUMNS = ["id", "full_text", "generated"]
+
+
+def load_folds(fold_dir: str, n_folds: int, val_fold: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    fold_paths = [data_io.find_table(fold_dir, f"fold{i}") for i in range(n_folds)]
+    train_df = pd.concat(
+        [data_io.read_table(p, FOLD_COLUMNS) for i, p in enumerate(fold_paths) if i != val_fold],
+        ignore_index=True
+    )
+    val_df = data_io.read_table(fold_paths[val_fold], FOLD_COLUMNS)
+    return train_df, val_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train cascade first-stage classifier")
+    parser.add_argument("--fold-dir", default="../data/kfold_csv")
+    parser.add_argument("--n-folds", type=int, default=4)
+    parser.add_argument("--val-fold", type=int, default=0)
+    parser.add_argument("--target-agreement", type=float, default=0.98)
+    parser.add_argument("--llm-preds", default="", help="검증 fold LLM 예측 파일 (ID, generated) - .parquet 또는 .csv")
+    parser.add_argument("--max-features", type=int, default=300_000)
+    parser.add_argument("--output", default=settings.CASCADE_MODEL_PATH)
+    args = parser.parse_args()
+
+    train_df, val_df = load_folds(args.fold_dir, args.n_folds, args.val_fold)
+    logger.info(f"Train: {len(train_df)}  Validation: {len(val_df)}")
+
+    pipeline = make_pipeline(
+        TfidfVectorizer(analyzer="char_wb", ngram_range=(1, 3), max_features=args.max_features, sublinear_tf=True),
+        LogisticRegression(C=4.0, max_iter=1000)
+    )
+    pipeline.fit(train_df["full_text"], train_df["generated"])
+
+    val_probs = pipeline.predict_proba(val_df["full_text"])[:, 1]
+    logger.info(f"Validation AUC (stage 1): {roc_auc_score(val_df['generated'], val_probs):.4f}")
+
+    if args.llm_preds:
+        llm_df = data_io.read_table(args.llm_preds, ["ID", "generated"])
+        llm_probs = val_df["id"].map(llm_df.set_index("ID")["generated"])
+        missing = val_df["id"][llm_probs.isna()]
+        if len(missing):
+            raise ValueError(
+                f"{args.llm_preds} has no prediction for {len(missing)}/{len(val_df)} validation ids "
+                f"(e.g. {missing.iloc[0]}) - use the val predictions of fold {args.val_fold}"
+            )
+        reference = (llm_probs.to_numpy() > 0.5).astype(int)
+        reference_name = "LLM"
+    else:
+        reference = val_df["generated"].to_numpy()
+        reference_name = "label"
+
+    low, high = tune_thresholds(val_probs, reference, args.target_agreement)
+    answered = (val_probs <= low) | (val_probs >= high)
+    decisions = (val_probs >= high).astype(int)
+    coverage = float(answered.mean())
+    agreement = float((decisions[answered] == reference[answered]).mean()) if answered.any() else 0.0
+    logger.info(
+        f"Thresholds: low={low:.4f} high={high:.4f}  coverage={coverage:.1%}  "
+        f"agreement with {reference_name}={agreement:.2%}"
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    CascadeClassifier(pipeline, low, high, {
+        "val_fold": args.val_fold,
+        "reference": reference_name,
+        "target_agreement": args.target_agreement,
+        "coverage": coverage,
+        "agreement": agreement,
+    }).save(args.output)
+    logger.info(f"Cascade classifier saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
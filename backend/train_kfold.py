@@ -0,0 +1,184 @@
+"""
+k-fold LoRA 학습 오케스트레이터 - base 모델과 토큰화 데이터를 한 번만 로딩하고 fold 마다 어댑터만 교체
+
+    cd backend
+    python train_kfold.py --group-by-length
+    python train_kfold.py --folds 2,3      # 일부 fold 만
+
+fold k 마다: 새 LoRA 어댑터 부착 -> 나머지 fold 로 학습 -> fold k 예측 (OOF) -> 저장 -> 어댑터 제거
+- {output-root}/fold{k}/                어댑터 + 토크나이저 + train_stats.json + val_pred.parquet (ENSEMBLE_ADAPTER_PATHS 로 서빙)
+- {output-root}/kfold_state.json        완료된 fold 별 통계 - fold 가 끝날 때마다 갱신, 다시 실행하면 완료된 fold 는 건너뜀
+- {output-root}/oof_predictions.parquet 완료된 fold 의 out-of-fold 예측 (ID, fold, generated, label)
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.metrics import roc_auc_score
+
+import data_io
+import train
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "kfold_state.json"
+OOF_FILE = "oof_predictions.parquet"
+VAL_PRED_FILE = "val_pred.parquet"
+
+
+def load_state(output_root: str) -> dict:
+    path = os.path.join(output_root, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(output_root: str, state: dict):
+    """중간에 종료돼도 이전 상태 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체"""
+    path = os.path.join(output_root, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def detach_lora(peft_model, head_state: dict):
+    """어댑터를 병합하지 않고 제거해 다음 fold 가 같은 base 모델에서 시작하도록 복원
+
+    unload() 는 LoRA layer 만 원래 모듈로 되돌리고 분류 헤드(modules_to_save)는 학습된 복사본으로 바꾸므로
+    처음 저장해 둔 헤드 가중치를 다시 넣음
+    """
+    base = peft_model.unload()
+    _, head = train.classifier_parts(base)
+    head.load_state_dict(head_state)
+    if hasattr(base, "peft_config"):
+        del base.peft_config
+    return base
+
+
+def write_oof(output_root: str, folds: list[int]) -> pd.DataFrame:
+    """완료된 fold 의 검증 예측을 하나의 OOF 파일로"""
+    oof = pd.concat([
+        data_io.read_table(os.path.join(output_root, f"fold{k}", VAL_PRED_FILE)).assign(fold=k)
+        for k in sorted(folds)
+    ], ignore_index=True)[["ID", "fold", "generated", "label"]]
+    data_io.write_table(oof, os.path.join(output_root, OOF_FILE))
+    return oof
+
+
+def run_setup(args) -> dict:
+    """재실행 시 이전 fold 와 섞어도 되는지 확인하기 위한 설정 (결과에 영향을 주는 인자만)"""
+    return {
+        "model_name": args.model_name,
+        "fold_dir": os.path.abspath(args.fold_dir),
+        "n_folds": args.n_folds,
+        "max_length": args.max_length,
+        "lora": {"r": args.lora_r, "alpha": args.lora_alpha, "dropout": args.lora_dropout},
+        "train": {k: v for k, v in asdict(train.config_from_args(args)).items() if k != "log_steps"},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train all fold adapters on one loaded base model")
+    train.add_training_arguments(parser)
+    parser.add_argument("--folds", default="", help="학습할 fold (콤마 구분, 기본: 전체)")
+    parser.add_argument("--output-root", default="../models/lora_adapters/kanana_kfold")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_root, exist_ok=True)
+    setup = run_setup(args)
+    state = load_state(args.output_root)
+    if state and state["setup"] != setup:
+        raise ValueError(
+            f"{os.path.join(args.output_root, STATE_FILE)} was written with different settings - "
+            "use the same arguments to resume or choose another --output-root"
+        )
+    state = state or {"setup": setup, "folds": {}}
+    targets = [int(k) for k in args.folds.split(",")] if args.folds else list(range(args.n_folds))
+    pending = [k for k in targets if str(k) not in state["folds"]]
+    if not pending:
+        logger.info(f"All requested folds already completed: {sorted(state['folds'])}")
+        write_oof(args.output_root, [int(k) for k in state["folds"]])
+        return
+    logger.info(f"Completed folds: {sorted(state['folds'])}, pending: {pending}")
+
+    config = train.config_from_args(args)
+    start = time.perf_counter()
+    tokenizer = train.load_tokenizer(args.model_name)
+    folds = train.load_all_folds(args.fold_dir, args.n_folds, tokenizer, args.max_length, args.cache_dir)
+    data_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    base = train.load_base_model(args.model_name, tokenizer)
+    model_seconds = time.perf_counter() - start
+    _, head = train.classifier_parts(base)
+    head_state = {k: v.detach().clone() for k, v in head.state_dict().items()}
+    state.setdefault("runs", []).append({
+        "pending": pending, "data_load_seconds": round(data_seconds, 2), "model_load_seconds": round(model_seconds, 2)
+    })
+    logger.info(f"Data loaded in {data_seconds:.1f}s, base model in {model_seconds:.1f}s")
+
+    for k in pending:
+        fold_start = time.perf_counter()
+        train_fold, val_fold = train.split_folds(folds, k)
+        logger.info(f"Fold {k}: train {len(train_fold)}, validation {len(val_fold)}")
+
+        # fold 마다 같은 시드로 LoRA 초기화 (단독 실행 순서와 무관하게 같은 결과)
+        train.seed_everything(args.seed)
+        model = train.attach_lora(base, args.lora_r, args.lora_alpha, args.lora_dropout)
+        history = train.train(
+            model, train_fold, val_fold, config, tokenizer.pad_token_id, args.max_length,
+            os.path.join(args.checkpoint_dir, f"fold{k}") if args.checkpoint_dir else "", args.save_total_limit
+        )
+        train_seconds = time.perf_counter() - fold_start
+
+        start = time.perf_counter()
+        probs = train.predict(model, val_fold, config.eval_batch_size, tokenizer.pad_token_id)
+        predict_seconds = time.perf_counter() - start
+
+        output_dir = os.path.join(args.output_root, f"fold{k}")
+        train.save_adapter(model, tokenizer, output_dir, config, args.max_length, history)
+        data_io.write_table(
+            pd.DataFrame({"ID": val_fold.ids, "generated": probs, "label": val_fold.labels}),
+            os.path.join(output_dir, VAL_PRED_FILE)
+        )
+        base = detach_lora(model, head_state)
+        del model
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+        last = history[-1]
+        state["folds"][str(k)] = {
+            "train_paragraphs": len(train_fold),
+            "val_paragraphs": len(val_fold),
+            "val_auc": round(float(roc_auc_score(val_fold.labels, probs)), 4) if len(np.unique(val_fold.labels)) > 1 else None,
+            "wall_seconds": round(time.perf_counter() - fold_start, 2),
+            "train_seconds": round(train_seconds, 2),
+            "predict_seconds": round(predict_seconds, 2),
+            "tokens_per_sec": round(sum(e["real_tokens"] for e in history) / sum(e["seconds"] for e in history), 1),
+            "padding_waste": last["padding_waste"],
+            "final_loss": last["loss"],
+            "epochs": history,
+        }
+        # 어댑터와 예측을 모두 저장한 뒤에만 완료로 기록 (도중에 종료되면 다음 실행에서 이 fold 부터 다시)
+        save_state(args.output_root, state)
+        logger.info(f"Fold {k} done: {json.dumps({key: v for key, v in state['folds'][str(k)].items() if key != 'epochs'})}")
+
+    oof = write_oof(args.output_root, [int(k) for k in state["folds"]])
+    if len(state["folds"]) == args.n_folds and oof["label"].nunique() > 1:
+        state["oof_auc"] = round(float(roc_auc_score(oof["label"], oof["generated"])), 4)
+        save_state(args.output_root, state)
+        logger.info(f"OOF AUC: {state['oof_auc']}")
+    logger.info(f"OOF predictions: {os.path.join(args.output_root, OOF_FILE)} ({len(oof)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+마이크로 배칭 벤치마크: 동시 요청을 개별 추론 vs MicroBatcher 로 처리했을 때의 처리량 비교
+
+    python benchmarks/bench_batcher.py --requests 256 --concurrency 32
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from tiny_model import load_tiny_detector, synthetic_paragraph
+
+from batcher import MicroBatcher
+from executor import InferenceExecutor
+
+
+async def run_sequential(detector, executor, texts, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(text):
+        async with semaphore:
+            return await executor.run(detector.predict, text)
+
+    await asyncio.gather(*(one(t) for t in texts))
+
+
+async def run_batched(detector, executor, texts, concurrency, max_batch_size, max_wait_ms):
+    batcher = MicroBatcher(detector, executor, max_batch_size, max_wait_ms)
+    await batcher.start()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(text):
+        async with semaphore:
+            return await batcher.submit(text)
+
+    try:
+        await asyncio.gather(*(one(t) for t in texts))
+    finally:
+        await batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_paragraph(rng) for _ in range(args.requests)]
+    detector = load_tiny_detector()
+    executor = InferenceExecutor()
+    executor.start()
+
+    start = time.perf_counter()
+    asyncio.run(run_sequential(detector, executor, texts, args.concurrency))
+    seq = time.perf_counter() - start
+
+    start = time.perf_counter()
+    asyncio.run(run_batched(detector, executor, texts, args.concurrency, args.max_batch_size, args.max_wait_ms))
+    batched = time.perf_counter() - start
+
+    print(f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"개별 추론   : {seq:.3f}s  ({args.requests / seq:.1f} req/s)")
+    print(f"마이크로 배치: {batched:.3f}s  ({args.requests / batched:.1f} req/s)")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+predict_batch 길이 버킷팅 벤치마크: 전체 패딩(padding=True 1배치) vs MAX_BATCH_TOKENS 버킷
+
+    python benchmarks/bench_bucketing.py --paragraphs 64 --trials 20 --max-batch-tokens 4096
+
+학습 데이터 문단 길이 분포를 따르는 합성 한국어 문단으로 패딩 토큰 수, KANANA-8B 기준 추정 FLOPs,
+작은 대체 모델에서의 실제 지연 시간을 비교합니다.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from tiny_model import load_tiny_detector, sample_paragraph_lengths, synthetic_paragraph_of_length
+
+from model import bucket_by_tokens
+
+# KANANA-1.5-8B (Llama 구조) 차원
+KANANA_PARAMS = 8.0e9
+KANANA_LAYERS = 32
+KANANA_HIDDEN = 4096
+
+
+def estimate_flops(batches: list[list[int]]) -> float:
+    """패딩 포함 forward FLOPs 추정: 선형층 2·N·tokens + attention 4·layers·hidden·L² (배치별)"""
+    total = 0.0
+    for lengths in batches:
+        padded = max(lengths)
+        n = len(lengths)
+        total += 2 * KANANA_PARAMS * n * padded
+        total += 4 * KANANA_LAYERS * KANANA_HIDDEN * n * padded ** 2
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paragraphs", type=int, default=64, help="요청 하나의 문단 수")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--max-batch-tokens", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    detector = load_tiny_detector()
+
+    stats = {"padded": [], "bucketed": []}
+    real_tokens = []
+    flops = {"padded": 0.0, "bucketed": 0.0}
+    for _ in range(args.trials):
+        texts = [
+            synthetic_paragraph_of_length(rng, n)
+            for n in sample_paragraph_lengths(rng, args.paragraphs)
+        ]
+        batch_ids = detector.encode(texts)
+        lengths = [len(ids) for ids in batch_ids]
+        real_tokens.append(sum(lengths))
+
+        start = time.perf_counter()
+        detector.score_ids(batch_ids)
+        elapsed = time.perf_counter() - start
+        stats["padded"].append((elapsed, len(lengths) * max(lengths)))
+        flops["padded"] += estimate_flops([lengths])
+
+        buckets = bucket_by_tokens(lengths, args.max_batch_tokens)
+        start = time.perf_counter()
+        for bucket in buckets:
+            detector.score_ids([batch_ids[i] for i in bucket])
+        elapsed = time.perf_counter() - start
+        bucket_lengths = [[lengths[i] for i in bucket] for bucket in buckets]
+        stats["bucketed"].append((elapsed, sum(len(b) * max(b) for b in bucket_lengths)))
+        flops["bucketed"] += estimate_flops(bucket_lengths)
+
+    total_real = sum(real_tokens)
+    print(f"paragraphs/request={args.paragraphs} trials={args.trials} max_batch_tokens={args.max_batch_tokens}")
+    for mode in ("padded", "bucketed"):
+        latencies = [t for t, _ in stats[mode]]
+        padded_tokens = sum(p for _, p in stats[mode])
+        print(
+            f"{mode:9s} latency={statistics.mean(latencies) * 1000:.1f}ms "
+            f"padded_tokens={padded_tokens} padding_ratio={1 - total_real / padded_tokens:.1%} "
+            f"est_flops={flops[mode] / args.trials:.3e}/request"
+        )
+    print(f"추정 FLOPs 감소: {1 - flops['bucketed'] / flops['padded']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
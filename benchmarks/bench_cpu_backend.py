@@ -0,0 +1,84 @@
+"""
+CPU 추론 백엔드 비교: PEFT(LoRA 미병합) vs 병합 fp32/bf16 vs 병합 + dynamic int8
+
+    python benchmarks/bench_cpu_backend.py --hidden-size 256 --layers 4
+
+작은 Llama + LoRA 모델로 각 백엔드가 PEFT 경로와 같은 점수를 내는지 확인(parity)하고,
+predict_batch 지연 시간과 가중치 메모리를 비교합니다. parity 허용 오차를 넘으면 종료 코드 1 을 반환합니다.
+logits parity 테스트: python -m pytest tests/test_cpu_backend.py
+"""
+import argparse
+import copy
+import io
+import random
+import statistics
+import sys
+import time
+
+import torch
+from tiny_model import build_model, build_peft_model, build_tokenizer, load_tiny_detector, synthetic_paragraph
+
+from model import prepare_cpu_model
+
+# (백엔드, dtype, int8, 허용 오차)
+BACKENDS = [
+    ("cpu fp32", torch.float32, False, 1e-4),
+    ("cpu bf16", torch.bfloat16, False, 5e-2),
+    ("cpu_int8", torch.float32, True, 1e-1),
+]
+
+
+def state_dict_bytes(model) -> int:
+    """직렬화된 state_dict 크기 (int8 packed 가중치 포함)"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def time_predict_batch(detector, texts, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        probs = detector.predict_batch(texts)
+        timings.append(time.perf_counter() - start)
+    return probs, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hidden-size", type=int, default=256)
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--texts", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_paragraph(rng) for _ in range(args.texts)]
+
+    tokenizer = build_tokenizer()
+    peft_model = build_peft_model(build_model(tokenizer, hidden_size=args.hidden_size, num_layers=args.layers))
+
+    detector = load_tiny_detector()
+    detector.tokenizer = tokenizer
+    detector.model = peft_model
+    reference, reference_time = time_predict_batch(detector, texts, args.repeats)
+    print(f"{'peft':10s} latency={reference_time * 1000:.1f}ms weights={state_dict_bytes(peft_model) / 2**20:.1f}MiB")
+
+    failed = False
+    for name, dtype, int8, tolerance in BACKENDS:
+        detector.model = prepare_cpu_model(copy.deepcopy(peft_model), dtype, int8)
+        probs, elapsed = time_predict_batch(detector, texts, args.repeats)
+        max_diff = max(abs(a - b) for a, b in zip(reference, probs))
+        ok = max_diff <= tolerance
+        failed |= not ok
+        print(
+            f"{name:10s} latency={elapsed * 1000:.1f}ms weights={state_dict_bytes(detector.model) / 2**20:.1f}MiB "
+            f"max_abs_diff={max_diff:.5f} parity={'OK' if ok else 'FAIL'}"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
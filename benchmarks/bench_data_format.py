@@ -0,0 +1,140 @@
+"""
+fold 데이터 형식 비교 (CPU, 작은 토크나이저): utf-8-sig CSV vs Parquet (column projection) vs 토큰 id 열 / Arrow 캐시
+
+    python benchmarks/bench_data_format.py --paragraphs 40000
+
+합성 fold CSV 를 만들고 같은 내용을 preprocess.py 처럼 Parquet (input_ids 열 포함) 로 저장한 뒤,
+방식마다 새 프로세스에서 전체 fold 를 읽는 시간과 읽는 동안의 peak RSS 증가량 (/proc/self/clear_refs 로 peak 초기화 후 VmHWM)을 출력합니다.
+- DataFrame: 전체 열 vs 학습/평가에 필요한 열 (id, generated) 만
+- 학습 입력 (TokenizedFold): CSV + 토큰화 (캐시 없음) vs Arrow IPC 캐시 (memory map) vs Parquet input_ids 열
+  memory map 은 접근한 페이지만 RSS 에 잡히므로 토큰 checksum 은 측정 후에 계산하고, 세 방식의 토큰이 같은지 확인합니다.
+Parquet 의 peak RSS 에는 Arrow 메모리 풀(mimalloc)이 잡아 두는 영역이 포함됩니다 (ARROW_DEFAULT_MEMORY_POOL=system 이면 줄어듦).
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_train import write_folds
+from tiny_model import build_tokenizer
+
+import data_io
+import preprocess
+import train
+from model import tokenizer_hash
+
+PROJECTION = ["id", "generated"]
+CASES = (
+    "csv (all columns)",
+    "csv (id, generated)",
+    "parquet (all columns)",
+    "parquet (id, generated)",
+    "tokens: csv + tokenize",
+    "tokens: arrow cache (mmap)",
+    "tokens: parquet input_ids",
+)
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def load(case: str, dirs: dict, n_folds: int, max_length: int):
+    if case.startswith("tokens"):
+        tokenizer = train.load_tokenizer(dirs["tokenizer"])
+        fold_dir = dirs["parquet"] if "parquet" in case else dirs["csv"]
+        cache_dir = dirs["cache"] if "cache" in case else ""
+        return lambda: train.load_all_folds(fold_dir, n_folds, tokenizer, max_length, cache_dir)
+    fold_dir, suffix = (dirs["parquet"], ".parquet") if case.startswith("parquet") else (dirs["csv"], ".csv")
+    columns = PROJECTION if "generated" in case else None
+    return lambda: [data_io.read_table(os.path.join(fold_dir, f"fold{k}{suffix}"), columns) for k in range(n_folds)]
+
+
+def checksum(result) -> tuple:
+    if isinstance(result[0], train.TokenizedFold):
+        return (
+            sum(len(fold) for fold in result),
+            sum(len(fold.tokens) for fold in result),
+            sum(int(fold.tokens.sum(dtype=np.int64)) for fold in result),
+            sum(int(fold.labels.sum()) for fold in result),
+        )
+    return (sum(len(df) for df in result), sum(int(df["generated"].sum()) for df in result))
+
+
+def measure(case: str, dirs: dict, n_folds: int, max_length: int) -> tuple[float, int, tuple]:
+    """새 프로세스에서 실행 - 읽기 1회의 시간, peak RSS 증가량, checksum"""
+    run = load(case, dirs, n_folds, max_length)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = _status_kb("VmRSS:")
+    start = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - start
+    peak = (_status_kb("VmHWM:") - before) * 1024
+    return seconds, peak, checksum(result)
+
+
+def directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paragraphs", type=int, default=40000, help="전체 fold 문단 수")
+    parser.add_argument("--n-folds", type=int, default=4)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dirs = {name: os.path.join(tmp, name) for name in ("csv", "parquet", "cache", "tokenizer")}
+        for path in dirs.values():
+            os.makedirs(path)
+        write_folds(dirs["csv"], args.paragraphs, args.n_folds, args.seed)
+        build_tokenizer().save_pretrained(dirs["tokenizer"])
+        tokenizer = train.load_tokenizer(dirs["tokenizer"])
+
+        start = time.perf_counter()
+        digest = tokenizer_hash(tokenizer)
+        for k in range(args.n_folds):
+            df = data_io.read_table(os.path.join(dirs["csv"], f"fold{k}.csv"))
+            preprocess.save_table(
+                df, os.path.join(dirs["parquet"], f"fold{k}.parquet"), "full_text", tokenizer, args.max_length, digest
+            )
+        print(f"wrote parquet with input_ids in {time.perf_counter() - start:.1f}s")
+        train.load_all_folds(dirs["csv"], args.n_folds, tokenizer, args.max_length, dirs["cache"])
+        print(
+            f"size: csv {directory_bytes(dirs['csv']) / 1024 ** 2:.1f}MB, parquet+input_ids {directory_bytes(dirs['parquet']) / 1024 ** 2:.1f}MB,"
+            f" arrow cache {sum(directory_bytes(os.path.join(dirs['cache'], d)) for d in os.listdir(dirs['cache'])) / 1024 ** 2:.1f}MB"
+        )
+
+        spawn = multiprocessing.get_context("spawn")
+        print(f"{'':28s} {'load':>9s} {'peak RSS':>10s} {'vs csv':>7s}")
+        results = {}
+        for case in CASES:
+            runs = []
+            for _ in range(args.repeats):
+                with concurrent.futures.ProcessPoolExecutor(1, mp_context=spawn) as pool:
+                    runs.append(pool.submit(measure, case, dirs, args.n_folds, args.max_length).result())
+            seconds = min(r[0] for r in runs)
+            peak = min(r[1] for r in runs)
+            results[case] = (seconds, peak, runs[0][2])
+            reference = results["tokens: csv + tokenize" if case.startswith("tokens") else CASES[0]][0]
+            print(f"{case:28s} {seconds * 1000:7.1f}ms {peak / 1024 ** 2:8.1f}MB {reference / seconds:6.1f}x")
+
+        token_sums = {results[case][2] for case in CASES if case.startswith("tokens")}
+        frame_sums = {results[case][2] for case in CASES if not case.startswith("tokens")}
+        print(f"identical tokens/labels across token loaders={len(token_sums) == 1}, identical rows/labels across frames={len(frame_sums) == 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+early exit 비교: 전체 forward vs 중간 layer probe 에서 종료
+
+    python benchmarks/bench_early_exit.py --layers 8 --probe-layers 1,3,5 --samples 4000
+
+작은 모델에서 probe 를 학습(전체 모델 판정을 목표로)하고 임계값을 calibration 셋에서 조정한 뒤,
+검증 셋에서 지연 시간 절감, 평균 종료 깊이, 전체 모델과의 판정 일치율을 출력합니다.
+임계값은 일치율의 Wilson 하한으로 정하므로 calibration 셋 (samples / 4) 이 작으면 목표 0.99 에서 종료하는 입력이 거의 없습니다.
+실제 모델 리포트는 notebooks/kanana_early_exit.py 를 사용합니다.
+"""
+import argparse
+import json
+import random
+
+from tiny_model import load_tiny_detector, sample_paragraph_lengths, synthetic_paragraph_of_length
+
+from early_exit import ProbeHeads, collect_features, evaluate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=4000, help="학습 / calibration / 검증으로 나눌 문단 수")
+    parser.add_argument("--layers", type=int, default=8)
+    parser.add_argument("--hidden-size", type=int, default=128)
+    parser.add_argument("--probe-layers", default="1,3,5", help="probe 를 붙일 layer (0-based, 콤마 구분)")
+    parser.add_argument("--target-agreement", type=float, default=0.99, help="notebooks/kanana_early_exit.py 와 같은 목표")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_paragraph_of_length(rng, n) for n in sample_paragraph_lengths(rng, args.samples, 1000)]
+    detector = load_tiny_detector(hidden_size=args.hidden_size, num_layers=args.layers)
+    model, tokenizer = detector.model, detector.tokenizer
+    backbone, head = detector._classifier_parts()
+    input_ids = detector.encode(texts)
+
+    n_fit, n_calib = len(texts) // 2, len(texts) // 4
+    fit_ids, calib_ids, val_ids = input_ids[:n_fit], input_ids[n_fit:n_fit + n_calib], input_ids[n_fit + n_calib:]
+    layers = [int(layer) for layer in args.probe_layers.split(",")]
+
+    fit_features, fit_full = collect_features(model, tokenizer, fit_ids, layers, args.batch_size)
+    calib_features, calib_full = collect_features(model, tokenizer, calib_ids, layers, args.batch_size)
+    probes = ProbeHeads.fit(
+        fit_features, (fit_full > 0.5).astype(int),
+        calib_features, (calib_full > 0.5).astype(int),
+        args.target_agreement
+    )
+    for layer, low, high in zip(probes.layers, probes.low, probes.high):
+        print(f"layer {layer + 1}: low={low:.4f} high={high:.4f}")
+
+    report = evaluate(model, backbone, head, tokenizer, probes, val_ids, args.batch_size)
+    report.pop("full_probs")
+    report.pop("early_exit_probs")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
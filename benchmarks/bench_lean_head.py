@@ -0,0 +1,121 @@
+"""
+분류 forward 비교: self.model(**inputs) (KV 캐시 + 전체 위치 logits) vs detector.pooled_logits (캐시 없음, pooling 위치만)
+
+    python benchmarks/bench_lean_head.py --lengths 128,512,1024,2048,4096 --batch-tokens 8192
+
+길이마다 (batch-tokens / 길이) 개 시퀀스를 오른쪽 패딩 배치로 만들어 두 방식의 지연 시간, 최대 메모리, logits 최대 차이를 출력합니다.
+최대 메모리는 GPU 면 torch.cuda.max_memory_allocated, CPU 면 측정마다 새 프로세스에서 forward 동안의 peak RSS 증가량
+(/proc/self/clear_refs 로 peak 초기화 후 VmHWM)입니다.
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import random
+import statistics
+import time
+
+import torch
+
+from tiny_model import load_tiny_detector, synthetic_paragraph_of_length
+
+from config import settings
+
+VARIANTS = ("model(**inputs)", "pooled_logits")
+
+
+def build(args, length: int):
+    detector = load_tiny_detector(hidden_size=args.hidden_size, num_layers=args.layers)
+    if torch.cuda.is_available():
+        detector.model.to("cuda")
+    rng = random.Random(args.seed)
+    batch = max(args.batch_tokens // length, 1)
+    # 마지막 행만 최대 길이, 나머지는 짧게 (실제 배치처럼 패딩 포함)
+    lengths = [rng.randint(length // 2, length) for _ in range(batch - 1)] + [length]
+    text = synthetic_paragraph_of_length(rng, length * 8)
+    ids = detector.encode([text])[0]
+    while len(ids) < length:
+        ids = ids + ids
+    inputs = detector.tokenizer.pad({"input_ids": [ids[:n] for n in lengths]}, padding=True, return_tensors="pt")
+    if torch.cuda.is_available():
+        inputs = {k: v.to("cuda") for k, v in inputs.items()}
+    return detector, inputs
+
+
+def run_variant(detector, inputs, variant: str) -> torch.Tensor:
+    with torch.no_grad():
+        if variant == VARIANTS[0]:
+            logits = detector.model(**inputs).logits
+        else:
+            logits = detector.pooled_logits(inputs)
+    if logits.is_cuda:
+        torch.cuda.synchronize()
+    return logits
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def cpu_peak_bytes(args, length: int, variant: str) -> int:
+    """새 프로세스에서 실행 - 모델/입력 준비 후 forward 1회 동안의 peak RSS 증가량"""
+    torch.set_num_threads(1)
+    detector, inputs = build(args, length)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = _status_kb("VmRSS:")
+    run_variant(detector, inputs, variant)
+    return (_status_kb("VmHWM:") - before) * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", default="128,512,1024,2048,4096", help=f"MAX_TEXT_LENGTH({settings.MAX_TEXT_LENGTH}) 이하")
+    parser.add_argument("--batch-tokens", type=int, default=8192, help="배치 크기 = batch-tokens / 길이")
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--hidden-size", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    lengths = [n for n in map(int, args.lengths.split(",")) if n <= settings.MAX_TEXT_LENGTH]
+    spawn = multiprocessing.get_context("spawn")
+
+    print(f"{'length':>7s} {'batch':>6s} {'variant':>16s} {'latency':>10s} {'peak mem':>10s}")
+    for length in lengths:
+        detector, inputs = build(args, length)
+        reference = run_variant(detector, inputs, VARIANTS[0])
+        diff = (reference.float() - run_variant(detector, inputs, VARIANTS[1]).float()).abs().max().item()
+        results = {}
+        for variant in VARIANTS:
+            latencies = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                run_variant(detector, inputs, variant)
+                latencies.append(time.perf_counter() - start)
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+                torch.cuda.reset_peak_memory_stats()
+                base = torch.cuda.memory_allocated()
+                run_variant(detector, inputs, variant)
+                peak = torch.cuda.max_memory_allocated() - base
+            else:
+                with concurrent.futures.ProcessPoolExecutor(1, mp_context=spawn) as pool:
+                    peak = pool.submit(cpu_peak_bytes, args, length, variant).result()
+            results[variant] = (statistics.median(latencies), peak)
+            print(
+                f"{length:7d} {inputs['input_ids'].shape[0]:6d} {variant:>16s}"
+                f" {results[variant][0] * 1000:8.1f}ms {peak / 1024 ** 2:8.1f}MB"
+            )
+        (full_s, full_mem), (lean_s, lean_mem) = results[VARIANTS[0]], results[VARIANTS[1]]
+        print(
+            f"{'':14s} latency {full_s / lean_s:.2f}x, peak memory -{(1 - lean_mem / full_mem) * 100 if full_mem else 0:.0f}%,"
+            f" max |logit diff| {diff:.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+접두사 KV 캐시 비교: 전체 forward vs 공통 토큰 접두사 KV 재사용 (편집 후 재제출 trace)
+
+    python benchmarks/bench_prefix_cache.py --documents 16 --edits 8
+
+문서마다 처음 제출 후 끝에 문장 추가 / 마지막 문장 수정 / 중간 문장 수정을 섞어 다시 제출하는 trace 를 만들고,
+같은 trace 를 캐시 없는 detector 와 PrefixKVCache detector 로 한 건씩 채점해 지연 시간, 재사용 토큰 비율,
+두 결과의 최대 확률 차이를 출력합니다.
+캐시 / 비캐시 결과 일치 (배치 hit/miss 혼합, 왼쪽 패딩, 재제출, 작은 메모리 상한, predict_prefixes) 는 tests/test_prefix_cache.py 에서 확인합니다.
+"""
+import argparse
+import random
+import statistics
+import time
+
+import torch
+
+from tiny_model import SAMPLE_SENTENCES, load_tiny_detector, synthetic_document
+
+from prefix_cache import PrefixKVCache
+
+
+def edit(rng: random.Random, text: str) -> str:
+    """재제출 편집 - 끝에 문장 추가(60%) / 마지막 문장 교체(30%) / 중간 문장 교체(10%)"""
+    sentences = text.split(" ")
+    r = rng.random()
+    if r < 0.6:
+        return text + " " + rng.choice(SAMPLE_SENTENCES)
+    index = len(sentences) - 1 if r < 0.9 else rng.randrange(len(sentences))
+    sentences[index] = rng.choice(SAMPLE_SENTENCES)
+    return " ".join(sentences)
+
+
+def edit_trace(rng: random.Random, documents: int, edits: int, paragraphs: int) -> list[str]:
+    """문서별 편집 세션을 섞은 제출 순서 (동시에 여러 사용자가 편집하는 상황)"""
+    sessions = []
+    for _ in range(documents):
+        text = synthetic_document(rng, rng.randint(2, paragraphs))
+        versions = [text]
+        for _ in range(edits):
+            text = edit(rng, text)
+            versions.append(text)
+        sessions.append(versions)
+    trace = []
+    while any(sessions):
+        session = rng.choice([s for s in sessions if s])
+        trace.append(session.pop(0))
+    return trace
+
+
+def replay(detector, trace_ids: list[list[int]]) -> tuple[list[float], list[float]]:
+    probs, latencies = [], []
+    for ids in trace_ids:
+        start = time.perf_counter()
+        probs.append(detector.score_ids([ids])[0])
+        latencies.append(time.perf_counter() - start)
+    return probs, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=16)
+    parser.add_argument("--edits", type=int, default=8, help="문서별 재제출 횟수")
+    parser.add_argument("--paragraphs", type=int, default=8)
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--hidden-size", type=int, default=256)
+    parser.add_argument("--max-bytes", type=int, default=256 * 1024 ** 2)
+    parser.add_argument("--min-tokens", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    torch.set_num_threads(max(torch.get_num_threads(), 1))
+    rng = random.Random(args.seed)
+    baseline = load_tiny_detector(hidden_size=args.hidden_size, num_layers=args.layers)
+    cached = load_tiny_detector(hidden_size=args.hidden_size, num_layers=args.layers)
+    cached.prefix_cache = PrefixKVCache(args.max_bytes, args.min_tokens)
+    trace_ids = baseline.encode(edit_trace(rng, args.documents, args.edits, args.paragraphs))
+    print(f"trace: {len(trace_ids)} submissions, mean {statistics.mean(map(len, trace_ids)):.0f} tokens")
+
+    replay(baseline, trace_ids[:4])  # warmup
+    full_probs, full_latency = replay(baseline, trace_ids)
+    cached_probs, cached_latency = replay(cached, trace_ids)
+
+    for name, latencies in [("full forward", full_latency), ("prefix cache", cached_latency)]:
+        ordered = sorted(latencies)
+        print(
+            f"{name:14s} total={sum(latencies):7.2f}s  p50={ordered[len(ordered) // 2] * 1000:7.1f}ms"
+            f"  p95={ordered[int(len(ordered) * 0.95)] * 1000:7.1f}ms"
+        )
+    print(f"speedup: {sum(full_latency) / sum(cached_latency):.2f}x")
+    print(f"max |prob diff|: {max(abs(a - b) for a, b in zip(full_probs, cached_probs)):.2e}")
+    print(cached.prefix_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
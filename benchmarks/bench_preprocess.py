@@ -0,0 +1,241 @@
+"""
+전처리 비교: 기존 notebooks/data_preprocess.py (iterrows + 문단별 re.sub + 행별 apply) vs backend/preprocess.py
+
+    python benchmarks/bench_preprocess.py --documents 20000 --workers 4
+    python benchmarks/bench_preprocess.py --raw-dir data/raw   # 실제 원본 데이터
+
+합성 원본 데이터(또는 --raw-dir)로 두 구현을 각각 실행해 단계별 시간을 출력하고,
+출력 CSV(fold{i}.csv, test_preprocessed.csv)가 byte 단위로 같은지 확인합니다.
+"""
+import argparse
+import filecmp
+import os
+import random
+import re
+import tempfile
+import time
+
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+from tiny_model import SAMPLE_SENTENCES
+
+import preprocess
+
+SEED = 42
+
+# 정제 대상 패턴이 섞이도록 문장 사이에 넣는 조각
+NOISE = [
+    "漢字", "(漢字)", "<b>", "</b>", "<br/>", "( )", "(?)", "(1990년 ~ ?)", "...", ",,,", ", ,", "((", "  ", "\t",
+    "<漢>", "(, )", "영어(English)",
+]
+
+
+def legacy_minimal_preprocess(text):
+    text = text.strip()
+    text = re.sub(r'[\u4E00-\u9FFF]', '', text)                   # 한자 제거
+    text = re.sub(r'<[^>]+>', '', text)                           # HTML 태그 제거
+    text = re.sub(r'\(\s*[^\w가-힣]*\s*\)', '', text)             # 빈 괄호 제거
+    text = re.sub(r'\([^\(\)]{0,20}[\?\~]{1,3}[^\(\)]{0,20}\)', '', text)  # ( ? ~ ? ) 제거
+    text = re.sub(r'[.,]{3,}', '.', text)                         # ... → .
+    text = re.sub(r'[()]{2,}', '', text)                          # 괄호 잔재 정리
+    text = re.sub(r',\s*,+', ',', text)
+    text = re.sub(r'\s+', ' ', text)                              # 중복 공백 제거
+    return text
+
+
+def legacy_split_into_paragraphs(text):
+    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+    if len(paragraphs) <= 1:
+        paragraphs = [p.strip() for p in text.split('\n') if p.strip()]
+    return paragraphs
+
+
+def legacy_convert_train_to_paragraphs(train_df):
+    rows = []
+    for _, row in train_df.iterrows():
+        title = row['title']
+        full_text = row['full_text']
+        label = row['generated']
+        paragraphs = legacy_split_into_paragraphs(full_text)
+        for idx, para in enumerate(paragraphs):
+            cleaned_para = legacy_minimal_preprocess(para)
+            rows.append({
+                'title': title,
+                'paragraph_index': idx,
+                'paragraph_text': cleaned_para,
+                'generated': label
+            })
+    return pd.DataFrame(rows)
+
+
+def legacy_run(raw_dir, output_dir, timings):
+    """notebooks/data_preprocess.py 의 셀을 순서대로 실행 (출력 print 제외)"""
+    start = time.perf_counter()
+    train_df = pd.read_csv(os.path.join(raw_dir, "train.csv"), encoding="utf-8-sig")
+    test_df = pd.read_csv(os.path.join(raw_dir, "test.csv"), encoding="utf-8-sig")
+    timings["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    paragraph_train = legacy_convert_train_to_paragraphs(train_df)
+    paragraph_train = paragraph_train.dropna(subset=['paragraph_text']).reset_index(drop=True)
+    paragraph_train = paragraph_train.rename(columns={'paragraph_text': 'full_text'})
+    timings["paragraphs"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    paragraph_train['char_len'] = paragraph_train['full_text'].str.len()
+    percentiles = (
+        paragraph_train
+          .groupby('generated')['char_len']
+          .quantile([0.35, 0.95])
+          .unstack(level=1)
+          .rename(columns={0.35: 'p35', 0.95: 'p95'})
+    )
+    mask = paragraph_train.apply(
+        lambda r: percentiles.loc[r['generated'], 'p35'] <= r['char_len'] <= percentiles.loc[r['generated'], 'p95'],
+        axis=1
+    )
+    filtered_df = paragraph_train[mask].reset_index(drop=True).drop(columns=['char_len'])
+    timings["length_filter"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    label_counts = filtered_df['generated'].value_counts()
+    min_cnt = label_counts.min()
+    balanced_df = (
+        filtered_df
+          .groupby('generated', group_keys=False)
+          .apply(lambda x: x.sample(n=min_cnt, random_state=SEED))
+          .reset_index(drop=True)
+    )
+    skf = StratifiedKFold(n_splits=4, shuffle=True, random_state=SEED)
+    fold_dfs = {}
+    for fold, (_, val_idx) in enumerate(skf.split(balanced_df, balanced_df['generated'])):
+        fold_dfs[fold] = balanced_df.iloc[val_idx].sample(frac=1, random_state=SEED).reset_index(drop=True)
+    for fold, df in fold_dfs.items():
+        df.insert(0, 'id', [f"FOLD{fold}_{i:05d}" for i in range(len(df))])
+    for fold, df in fold_dfs.items():
+        df.to_csv(os.path.join(output_dir, f"fold{fold}.csv"), index=False, encoding="utf-8-sig")
+    timings["folds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    test_df['paragraph_text'] = test_df['paragraph_text'].apply(legacy_minimal_preprocess)
+    test_df.to_csv(os.path.join(output_dir, "test_preprocessed.csv"), index=False, encoding='utf-8-sig')
+    timings["test"] = time.perf_counter() - start
+
+
+def vectorized_run(raw_dir, output_dir, workers, timings):
+    start = time.perf_counter()
+    train_df = pd.read_csv(os.path.join(raw_dir, "train.csv"), encoding="utf-8-sig")
+    test_df = pd.read_csv(os.path.join(raw_dir, "test.csv"), encoding="utf-8-sig")
+    timings["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    paragraphs = (
+        preprocess.convert_train_to_paragraphs(train_df, workers)
+          .dropna(subset=["paragraph_text"])
+          .reset_index(drop=True)
+          .rename(columns={"paragraph_text": "full_text"})
+    )
+    timings["paragraphs"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    filtered = preprocess.filter_by_length(paragraphs, preprocess.length_percentiles(paragraphs))
+    timings["length_filter"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for fold, df in preprocess.make_folds(preprocess.undersample(filtered, SEED), 4, SEED).items():
+        df.to_csv(os.path.join(output_dir, f"fold{fold}.csv"), index=False, encoding="utf-8-sig")
+    timings["folds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    preprocess.preprocess_test(test_df).to_csv(
+        os.path.join(output_dir, "test_preprocessed.csv"), index=False, encoding="utf-8-sig"
+    )
+    timings["test"] = time.perf_counter() - start
+
+
+def noisy_paragraph(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 8)):
+        parts.append(rng.choice(SAMPLE_SENTENCES))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(NOISE))
+    return (" " if rng.random() < 0.9 else "  ").join(parts)
+
+
+def write_synthetic_raw(raw_dir: str, documents: int, seed: int):
+    """원본 데이터 형식(train: title/full_text/generated, test: ID/title/paragraph_index/paragraph_text) 생성"""
+    rng = random.Random(seed)
+    train_rows = []
+    for i in range(documents):
+        n = rng.choice([1, 1, 2, 3, 5, 8, 12])
+        separator = rng.choice(["\n\n", "\n\n", "\n", " \n\n  "])
+        paragraphs = [noisy_paragraph(rng) for _ in range(n)]
+        if rng.random() < 0.05:
+            paragraphs.insert(rng.randint(0, n), "   ")  # 공백뿐인 문단
+        train_rows.append({
+            "title": f"문서 {i}",
+            "full_text": separator.join(paragraphs),
+            "generated": int(rng.random() < 0.1),
+        })
+    pd.DataFrame(train_rows).to_csv(os.path.join(raw_dir, "train.csv"), index=False, encoding="utf-8-sig")
+
+    test_rows = [
+        {"ID": f"TEST_{i:04d}", "title": f"시험 {i // 5}", "paragraph_index": i % 5, "paragraph_text": noisy_paragraph(rng)}
+        for i in range(max(documents // 10, 1))
+    ]
+    pd.DataFrame(test_rows).to_csv(os.path.join(raw_dir, "test.csv"), index=False, encoding="utf-8-sig")
+    pd.DataFrame({"ID": [r["ID"] for r in test_rows], "generated": 0}).to_csv(
+        os.path.join(raw_dir, "sample_submission.csv"), index=False, encoding="utf-8-sig"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=20000, help="합성 원본 문서 수")
+    parser.add_argument("--raw-dir", default="", help="실제 원본 데이터 디렉터리 (train.csv, test.csv)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = args.raw_dir
+        if not raw_dir:
+            raw_dir = os.path.join(tmp, "raw")
+            os.makedirs(raw_dir)
+            write_synthetic_raw(raw_dir, args.documents, args.seed)
+
+        results = {}
+        for name, run in [
+            ("legacy", lambda out, t: legacy_run(raw_dir, out, t)),
+            ("vectorized", lambda out, t: vectorized_run(raw_dir, out, 1, t)),
+            (f"vectorized_w{args.workers}", lambda out, t: vectorized_run(raw_dir, out, args.workers, t)),
+        ]:
+            output_dir = os.path.join(tmp, name)
+            os.makedirs(output_dir)
+            timings = {}
+            run(output_dir, timings)
+            results[name] = (output_dir, timings)
+
+        stages = list(results["legacy"][1])
+        print(f"{'':16s}" + "".join(f"{stage:>14s}" for stage in stages) + f"{'total':>10s}")
+        legacy_total = sum(results["legacy"][1].values())
+        for name, (_, timings) in results.items():
+            total = sum(timings.values())
+            print(
+                f"{name:16s}" + "".join(f"{timings[stage]:13.2f}s" for stage in stages)
+                + f"{total:9.2f}s  ({legacy_total / total:.1f}x)"
+            )
+
+        legacy_dir = results["legacy"][0]
+        files = sorted(os.listdir(legacy_dir))
+        for name, (output_dir, _) in results.items():
+            if name == "legacy":
+                continue
+            mismatched = [f for f in files if not filecmp.cmp(os.path.join(legacy_dir, f), os.path.join(output_dir, f), shallow=False)]
+            print(f"{name}: {len(files) - len(mismatched)}/{len(files)} files byte-identical"
+                  + (f" (mismatch: {', '.join(mismatched)})" if mismatched else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+/api/analyze-sentences 문단 점수 방식 비교: independent(전체 + 문단별 독립 추론) vs single_pass(전체 1회 forward)
+
+    python benchmarks/bench_single_pass.py --documents 32 --paragraphs 6
+
+지연 시간과 두 방식 간 점수 일치도(평균 절대 오차, 0.5 기준 판정 일치율)를 출력합니다.
+KANANA 어댑터로 측정하려면 --real 을 지정합니다 (backend/.env 설정 사용).
+"""
+import argparse
+import random
+import statistics
+import time
+
+from tiny_model import load_tiny_detector, synthetic_document
+
+from main import split_paragraphs
+from model import detector as real_detector
+
+
+def run_independent(detector, text):
+    paragraphs, _ = split_paragraphs(text)
+    full = detector.predict(text)["ai_probability"]
+    return full, detector.predict_batch(paragraphs)
+
+
+def run_single_pass(detector, text):
+    _, char_ends = split_paragraphs(text)
+    return detector.predict_prefixes(text, char_ends)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=32)
+    parser.add_argument("--paragraphs", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--real", action="store_true", help="실제 KANANA 어댑터 사용")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [synthetic_document(rng, rng.randint(1, args.paragraphs)) for _ in range(args.documents)]
+
+    if args.real:
+        real_detector.load_model()
+        detector = real_detector
+    else:
+        detector = load_tiny_detector()
+
+    timings = {"independent": [], "single_pass": []}
+    diffs, agree, full_diffs = [], [], []
+    for text in documents:
+        start = time.perf_counter()
+        full_a, paras_a = run_independent(detector, text)
+        timings["independent"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        full_b, paras_b = run_single_pass(detector, text)
+        timings["single_pass"].append(time.perf_counter() - start)
+
+        full_diffs.append(abs(full_a - full_b))
+        for a, b in zip(paras_a, paras_b):
+            diffs.append(abs(a - b))
+            agree.append((a > 0.5) == (b > 0.5))
+
+    for mode, values in timings.items():
+        values = sorted(values)
+        print(
+            f"{mode:12s} mean={statistics.mean(values) * 1000:.1f}ms "
+            f"p50={values[len(values) // 2] * 1000:.1f}ms p95={values[int(len(values) * 0.95) - 1] * 1000:.1f}ms"
+        )
+    speedup = statistics.mean(timings["independent"]) / statistics.mean(timings["single_pass"])
+    print(f"speedup: {speedup:.2f}x")
+    print(f"전체 텍스트 점수 최대 차이: {max(full_diffs):.6f}")
+    print(f"문단 점수 평균 절대 차이: {statistics.mean(diffs):.4f}")
+    print(f"문단 판정 일치율: {sum(agree) / len(agree) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+학습 파이프라인 비교 (CPU, 작은 모델): 랜덤 배치 vs length-grouped 배치 vs packing
+
+    python benchmarks/bench_train.py --paragraphs 4000 --epochs 1
+
+합성 fold CSV 와 작은 base 모델을 임시 디렉터리에 만들고 backend/train.py 로 처음부터 끝까지 학습합니다.
+- 토큰화 캐시: 첫 토큰화 시간 vs 캐시 로딩 시간 (결과 일치 확인)
+- packing attention 격리: 한 행에 이어 붙인 문단의 logits 와 문단별 forward logits 의 최대 차이
+- 방식별 tokens/sec, 패딩 비율, loss, 검증 AUC
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from tiny_model import SAMPLE_SENTENCES, build_model, build_tokenizer, sample_paragraph_lengths
+
+import train
+from train import TrainConfig
+
+
+def labeled_paragraph(rng: random.Random, label: int, target_chars: int) -> str:
+    """라벨마다 다른 문장 분포 (80% 는 라벨 쪽 절반에서 뽑음) - 작은 모델도 학습 가능한 신호"""
+    half = len(SAMPLE_SENTENCES) // 2
+    own = SAMPLE_SENTENCES[half:] if label else SAMPLE_SENTENCES[:half]
+    sentences, length = [], 0
+    while length < target_chars:
+        sentence = rng.choice(own) if rng.random() < 0.8 else rng.choice(SAMPLE_SENTENCES)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def write_folds(fold_dir: str, paragraphs: int, n_folds: int, seed: int):
+    rng = random.Random(seed)
+    lengths = sample_paragraph_lengths(rng, paragraphs, 1500)
+    per_fold = paragraphs // n_folds
+    for fold in range(n_folds):
+        labels = [rng.randint(0, 1) for _ in range(per_fold)]
+        pd.DataFrame({
+            "id": [f"FOLD{fold}_{i:05d}" for i in range(per_fold)],
+            "full_text": [labeled_paragraph(rng, y, n) for y, n in zip(labels, lengths[fold * per_fold:])],
+            "generated": labels,
+        }).to_csv(os.path.join(fold_dir, f"fold{fold}.csv"), index=False, encoding="utf-8-sig")
+
+
+def packing_isolation(model, fold: train.TokenizedFold, pad_token_id: int, max_length: int) -> float:
+    rows = train.pack_indices(fold.lengths[:64], max_length)[:4]
+    model.eval()
+    with torch.no_grad():
+        packed = train.classify(model, train.collate_packed(fold, rows, pad_token_id))
+        single = train.classify(model, train.collate(fold, [i for row in rows for i in row], pad_token_id))
+    return (packed - single).abs().max().item()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paragraphs", type=int, default=4000, help="전체 fold 문단 수")
+    parser.add_argument("--n-folds", type=int, default=4)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--learning-rate", type=float, default=1e-3)
+    parser.add_argument("--hidden-size", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fold_dir, cache_dir, base_dir = (os.path.join(tmp, name) for name in ("folds", "tokenized", "base"))
+        os.makedirs(fold_dir)
+        write_folds(fold_dir, args.paragraphs, args.n_folds, args.seed)
+        tokenizer = build_tokenizer()
+        build_model(tokenizer, args.hidden_size, args.layers, args.seed).save_pretrained(base_dir)
+        tokenizer.save_pretrained(base_dir)
+        tokenizer = train.load_tokenizer(base_dir)
+
+        start = time.perf_counter()
+        train_fold, val_fold = train.load_folds(fold_dir, args.n_folds, 0, tokenizer, args.max_length, cache_dir)
+        tokenize_s = time.perf_counter() - start
+        start = time.perf_counter()
+        cached_train, _ = train.load_folds(fold_dir, args.n_folds, 0, tokenizer, args.max_length, cache_dir)
+        cached_s = time.perf_counter() - start
+        same = np.array_equal(train_fold.tokens, cached_train.tokens) and np.array_equal(train_fold.offsets, cached_train.offsets)
+        print(f"tokenize: {tokenize_s:.2f}s, cached load: {cached_s:.3f}s, identical={same}")
+        print(f"train {len(train_fold)} paragraphs (mean {train_fold.lengths.mean():.0f} tokens), validation {len(val_fold)}")
+
+        results = {}
+        for name, overrides in [
+            ("random", {}),
+            ("group_by_length", {"group_by_length": True}),
+            ("packing", {"packing": True}),
+        ]:
+            train.seed_everything(args.seed)
+            model = train.attach_lora(train.load_base_model(base_dir, tokenizer, quantize=False), r=8, dropout=0.0)
+            if name == "packing":
+                print(f"packing attention isolation: max |logit diff| = "
+                      f"{packing_isolation(model, val_fold, tokenizer.pad_token_id, args.max_length):.1e}")
+            config = TrainConfig(
+                learning_rate=args.learning_rate, batch_size=args.batch_size, epochs=args.epochs,
+                log_steps=0, seed=args.seed, **overrides
+            )
+            if name == "packing":
+                # 행 하나에 평균 max_length / 평균 길이 개 문단이 들어가므로 step 당 문단 수가 비슷하도록 행 수를 줄임
+                config.batch_size = max(1, round(args.batch_size * train_fold.lengths.mean() / args.max_length))
+            results[name] = train.train(model, train_fold, val_fold, config, tokenizer.pad_token_id, args.max_length)[-1]
+
+        print(f"{'':16s} {'steps':>6s} {'seconds':>8s} {'tokens/s':>10s} {'padding':>8s} {'loss':>7s} {'val_auc':>8s}")
+        for name, stats in results.items():
+            print(
+                f"{name:16s} {stats['steps']:6d} {stats['seconds']:8.2f} {stats['tokens_per_sec']:10.1f}"
+                f" {stats['padding_waste']:8.1%} {stats['loss']:7.4f} {stats.get('val_auc', float('nan')):8.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+k-fold 오케스트레이터 확인 (CPU, 작은 모델): 전체 실행 vs 중간에 종료 후 재실행, fold 별 단독 실행과 비교
+
+    python benchmarks/bench_train_kfold.py --paragraphs 2000
+
+1. train_kfold.py 를 한 번에 끝까지 실행 (base 모델 / 토큰화 1회)
+2. 다른 디렉터리에서 crash-fold 학습 도중 예외로 종료시킨 뒤 다시 실행 - 완료된 fold 는 건너뛰고 이어서 학습
+3. 두 실행의 OOF 예측이 같은지 (어댑터 제거 후 base 모델이 원래대로 돌아오는지) 확인하고
+   fold 마다 모델/데이터를 새로 로딩하는 train.py 방식과 총 시간을 비교
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from bench_train import write_folds
+from tiny_model import build_model, build_tokenizer
+
+import data_io
+import train
+import train_kfold
+
+
+def run_kfold(argv: list[str]):
+    sys.argv = ["train_kfold.py", *argv]
+    train_kfold.main()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--n-folds", type=int, default=4)
+    parser.add_argument("--crash-fold", type=int, default=2, help="이 fold 학습 중 예외 발생")
+    parser.add_argument("--hidden-size", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fold_dir, base_dir = os.path.join(tmp, "folds"), os.path.join(tmp, "base")
+        os.makedirs(fold_dir)
+        write_folds(fold_dir, args.paragraphs, args.n_folds, args.seed)
+        tokenizer = build_tokenizer()
+        build_model(tokenizer, args.hidden_size, args.layers, args.seed).save_pretrained(base_dir)
+        tokenizer.save_pretrained(base_dir)
+        common = [
+            "--model-name", base_dir, "--fold-dir", fold_dir, "--n-folds", str(args.n_folds),
+            "--cache-dir", os.path.join(tmp, "tokenized"), "--learning-rate", "1e-3", "--lora-r", "8",
+            "--group-by-length", "--log-steps", "0", "--seed", str(args.seed),
+        ]
+
+        # 1. 한 번에 전체 fold
+        full_root = os.path.join(tmp, "full")
+        start = time.perf_counter()
+        run_kfold([*common, "--output-root", full_root])
+        full_seconds = time.perf_counter() - start
+
+        # 2. crash-fold 에서 종료 후 재실행
+        resume_root = os.path.join(tmp, "resume")
+        original_train = train.train
+        calls = []
+
+        def crashing_train(*a, **kw):
+            calls.append(1)
+            if len(calls) == args.crash_fold + 1:
+                raise RuntimeError("simulated crash")
+            return original_train(*a, **kw)
+
+        train.train = crashing_train
+        try:
+            run_kfold([*common, "--output-root", resume_root])
+        except RuntimeError as e:
+            print(f"first run stopped: {e} ({len(train_kfold.load_state(resume_root)['folds'])} folds completed)")
+        finally:
+            train.train = original_train
+        completed_mtimes = {
+            k: os.path.getmtime(os.path.join(resume_root, f"fold{k}", "adapter_model.safetensors"))
+            for k in train_kfold.load_state(resume_root)["folds"]
+        }
+        run_kfold([*common, "--output-root", resume_root])
+        untouched = all(
+            os.path.getmtime(os.path.join(resume_root, f"fold{k}", "adapter_model.safetensors")) == mtime
+            for k, mtime in completed_mtimes.items()
+        )
+
+        # 3. fold 마다 train.py 처럼 모델/데이터를 새로 로딩
+        start = time.perf_counter()
+        for k in range(args.n_folds):
+            sys.argv = ["train.py", *common, "--val-fold", str(k), "--output-dir", os.path.join(tmp, "single", f"fold{k}"),
+                        "--val-preds", os.path.join(tmp, "single", f"val{k}.parquet")]
+            train.main()
+        single_seconds = time.perf_counter() - start
+
+        full_state, resume_state = train_kfold.load_state(full_root), train_kfold.load_state(resume_root)
+        full_oof = data_io.read_table(os.path.join(full_root, train_kfold.OOF_FILE))
+        resume_oof = data_io.read_table(os.path.join(resume_root, train_kfold.OOF_FILE))
+        single_oof = pd.concat([
+            data_io.read_table(os.path.join(tmp, "single", f"val{k}.parquet")) for k in range(args.n_folds)
+        ], ignore_index=True)
+
+        print(f"{'fold':>4s} {'wall_s':>7s} {'tokens/s':>9s} {'padding':>8s} {'val_auc':>8s}")
+        for k, stats in sorted(full_state["folds"].items()):
+            print(f"{k:>4s} {stats['wall_seconds']:7.2f} {stats['tokens_per_sec']:9.1f} {stats['padding_waste']:8.1%} {stats['val_auc']:8.4f}")
+        print(f"OOF AUC: {full_state['oof_auc']} ({len(full_oof)} rows)")
+        print(f"orchestrator {full_seconds:.1f}s vs per-fold train.py {single_seconds:.1f}s "
+              f"(model load {full_state['runs'][0]['model_load_seconds']}s once)")
+        print(f"resume: {len(resume_state['runs'])} runs, completed folds untouched={untouched}, "
+              f"max |OOF diff| vs uninterrupted = {(full_oof['generated'] - resume_oof['generated']).abs().max():.1e}")
+        print(f"max |OOF diff| vs per-fold train.py = {(full_oof['generated'] - single_oof['generated']).abs().max():.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+HTTP 부하 테스트: backend/main.py 를 작은 Llama + LoRA 대체 모델로 띄우고 엔드포인트별 지연 시간/처리량 측정
+
+    python benchmarks/loadtest.py --concurrency 1 8 32 --rate 20 50 --output results.json
+    python benchmarks/loadtest.py --compare before.json --output after.json
+    python benchmarks/loadtest.py --url http://localhost:8000 --tokenizer ../models/lora_adapters/kanana
+
+- 고정 동시성(closed loop): 각 워커가 응답을 받은 뒤 다음 요청을 보냄
+- 고정 도착률(open loop): Poisson 도착 시각에 응답과 무관하게 요청을 보내고, 지연 시간은 예정 도착 시각부터 측정
+- 워크로드: 학습 데이터 문단 길이 분포를 따르는 합성 한국어 텍스트, 또는 --trace 의 JSONL
+  (각 줄 {"endpoint": ..., "json": {...}} 또는 "text"/"body" 필드가 있는 레코드 - requests.jsonl 형식 그대로 사용 가능)
+
+결과는 키 정렬된 JSON 으로 저장되어 커밋 간 diff 가 가능합니다. httpx 가 필요합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from tiny_model import (
+    BACKEND_DIR,
+    sample_paragraph_lengths,
+    save_tiny_checkpoint,
+    synthetic_paragraph,
+    synthetic_paragraph_of_length,
+)
+
+PARAGRAPH_SEPARATOR = re.compile(r'\n\s*\n')  # main.PARAGRAPH_SEPARATOR 와 동일
+TOKENS_METRIC = re.compile(r'^inference_tokens_total (\S+)$', re.MULTILINE)
+MAX_PREDICT_CHARS = 4096  # PredictRequest.text max_length
+
+ENDPOINTS = {
+    "predict": "/api/predict",
+    "analyze-sentences": "/api/analyze-sentences",
+    "predict-long": "/api/predict-long",
+}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """'predict=0.7,analyze-sentences=0.3' -> {"/api/predict": 0.7, ...}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r} (choose from {', '.join(ENDPOINTS)})")
+        mix[ENDPOINTS[name]] = float(weight or 1.0)
+    return mix
+
+
+def synthetic_payload(rng: random.Random, endpoint: str) -> dict:
+    """엔드포인트별 합성 요청 본문 (문단 길이는 학습 데이터 분포)"""
+    if endpoint == "/api/predict":
+        return {"text": synthetic_paragraph_of_length(rng, sample_paragraph_lengths(rng, 1)[0])}
+    if endpoint == "/api/analyze-sentences":
+        lengths = sample_paragraph_lengths(rng, rng.randint(2, 8))
+        return {"text": "\n\n".join(synthetic_paragraph_of_length(rng, n) for n in lengths)}
+    # predict-long: 여러 윈도우에 걸치는 긴 문서
+    return {"text": "\n\n".join(synthetic_paragraph(rng, 4, 12) for _ in range(rng.randint(8, 24)))}
+
+
+def load_trace(path: str, mix: dict[str, float]) -> list[tuple[str, dict]]:
+    """JSONL trace -> (endpoint, 요청 본문) 리스트"""
+    rng = random.Random(0)
+    endpoints, weights = list(mix), list(mix.values())
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "endpoint" in record:
+                requests.append((record["endpoint"], record["json"]))
+                continue
+            text = record.get("text") or record.get("body")
+            if not text:
+                continue
+            endpoint = rng.choices(endpoints, weights)[0]
+            if endpoint == "/api/predict":
+                text = text[:MAX_PREDICT_CHARS]
+            requests.append((endpoint, {"text": text}))
+    if not requests:
+        raise ValueError(f"No usable requests in trace {path}")
+    return requests
+
+
+def build_workload(args, mix: dict[str, float], n: int) -> list[tuple[str, dict]]:
+    """시나리오마다 같은 요청 순서를 쓰도록 시드 고정"""
+    if args.trace:
+        trace = load_trace(args.trace, mix)
+        return [trace[i % len(trace)] for i in range(n)]
+    rng = random.Random(args.seed)
+    endpoints, weights = list(mix), list(mix.values())
+    return [(e, synthetic_payload(rng, e)) for e in rng.choices(endpoints, weights, k=n)]
+
+
+class TokenCounter:
+    """엔드포인트가 모델에 넣는 입력 토큰 수 (analyze-sentences 는 전체 + 문단별)"""
+
+    def __init__(self, tokenizer_path: str | None):
+        self.tokenizer = None
+        if tokenizer_path:
+            from transformers import AutoTokenizer
+            self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+
+    def _count(self, texts: list[str]) -> int:
+        return sum(len(ids) for ids in self.tokenizer(texts)["input_ids"])
+
+    def __call__(self, endpoint: str, payload: dict) -> int | None:
+        if self.tokenizer is None:
+            return None
+        text = payload["text"]
+        if endpoint == "/api/analyze-sentences":
+            paragraphs = [p.strip() for p in PARAGRAPH_SEPARATOR.split(text) if p.strip()]
+            return self._count([text] + paragraphs)
+        return self._count([text])
+
+
+def percentile(values: list[float], q: float) -> float:
+    """선형 보간 분위수"""
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def summarize(samples: list[tuple[float, int, int | None]], elapsed: float) -> dict:
+    """(지연 시간 s, 상태 코드, 토큰 수) 샘플 -> 통계"""
+    ok = [s for s in samples if s[1] == 200]
+    latencies = sorted(s[0] * 1000 for s in ok)
+    errors = {}
+    for _, status, _ in samples:
+        if status != 200:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+    stats = {
+        "requests": len(samples),
+        "errors": errors,
+        "requests_per_s": round(len(ok) / elapsed, 3),
+    }
+    if latencies:
+        stats.update({
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+        })
+    tokens = [s[2] for s in ok]
+    if tokens and None not in tokens:
+        stats["tokens_per_s"] = round(sum(tokens) / elapsed, 1)
+    return stats
+
+
+async def send(client: httpx.AsyncClient, endpoint: str, payload: dict, scheduled: float) -> tuple[float, int]:
+    try:
+        response = await client.post(endpoint, json=payload)
+        status = response.status_code
+    except httpx.HTTPError:
+        status = 0  # 연결 실패/타임아웃
+    return time.perf_counter() - scheduled, status
+
+
+async def run_closed_loop(client, workload, concurrency: int):
+    """고정 동시성: 워커 concurrency 개가 workload 를 나눠 순차 전송"""
+    samples = [None] * len(workload)
+    cursor = iter(range(len(workload)))
+
+    async def worker():
+        for i in cursor:
+            endpoint, payload = workload[i]
+            samples[i] = await send(client, endpoint, payload, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def run_open_loop(client, workload, rate: float, seed: int):
+    """고정 도착률: Poisson 도착, 지연 시간은 예정 도착 시각 기준 (coordinated omission 방지)"""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    offset = 0.0
+    tasks = []
+    for endpoint, payload in workload:
+        offset += rng.expovariate(rate)
+        scheduled = start + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(client, endpoint, payload, scheduled)))
+    return await asyncio.gather(*tasks)
+
+
+async def server_tokens(client) -> float | None:
+    """서버 /metrics 의 누적 처리 토큰 수"""
+    try:
+        match = TOKENS_METRIC.search((await client.get("/metrics")).text)
+    except httpx.HTTPError:
+        return None
+    return float(match.group(1)) if match else None
+
+
+async def run_scenario(client, name: str, workload, count_tokens, runner) -> dict:
+    tokens_before = await server_tokens(client)
+    start = time.perf_counter()
+    samples = await runner
+    elapsed = time.perf_counter() - start
+    tokens_after = await server_tokens(client)
+
+    by_endpoint = {}
+    for (endpoint, payload), (latency, status) in zip(workload, samples):
+        by_endpoint.setdefault(endpoint, []).append((latency, status, count_tokens(endpoint, payload)))
+
+    result = {
+        "duration_s": round(elapsed, 3),
+        "endpoints": {e: summarize(s, elapsed) for e, s in sorted(by_endpoint.items())},
+        "total": summarize([s for group in by_endpoint.values() for s in group], elapsed),
+    }
+    if tokens_before is not None and tokens_after is not None:
+        result["server_tokens_per_s"] = round((tokens_after - tokens_before) / elapsed, 1)
+
+    total = result["total"]
+    print(
+        f"{name:18s} {total['requests_per_s']:8.1f} req/s  p50={total.get('p50_ms', 0):8.1f}ms  "
+        f"p95={total.get('p95_ms', 0):8.1f}ms  p99={total.get('p99_ms', 0):8.1f}ms  errors={total['errors']}"
+    )
+    return result
+
+
+async def run_all(args, base_url: str, count_tokens) -> dict:
+    mix = args.mix
+    scenarios = {}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=256)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        warmup = build_workload(args, mix, args.warmup)
+        await run_closed_loop(client, warmup, min(4, max(args.warmup, 1)))
+
+        for concurrency in args.concurrency:
+            workload = build_workload(args, mix, args.requests)
+            name = f"concurrency={concurrency}"
+            scenarios[name] = await run_scenario(
+                client, name, workload, count_tokens, run_closed_loop(client, workload, concurrency)
+            )
+        for rate in args.rate:
+            workload = build_workload(args, mix, max(int(rate * args.duration), 1))
+            name = f"rate={rate:g}/s"
+            scenarios[name] = await run_scenario(
+                client, name, workload, count_tokens, run_open_loop(client, workload, rate, args.seed)
+            )
+    return scenarios
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(adapter_dir: str, args, log_file) -> tuple[subprocess.Popen, str]:
+    """대체 모델로 backend/main.py 실행 후 모델 로딩 완료까지 대기"""
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "LORA_ADAPTER_PATH": adapter_dir,
+        "INFERENCE_BACKEND": "cpu",
+        "CPU_DTYPE": "float32",
+        "CACHE_ENABLED": "true" if args.cache else "false",
+    })
+    for item in args.server_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+
+    process = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=BACKEND_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}, see {log_file.name}")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1.0).json().get("model_loaded"):
+                return process, base_url
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not become ready in {args.startup_timeout}s, see {log_file.name}")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=BACKEND_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict):
+    """시나리오/엔드포인트별 주요 지표 변화율 출력"""
+    print(f"\ncompare vs {baseline['meta'].get('commit')}:")
+    for name, scenario in current["scenarios"].items():
+        old_scenario = baseline["scenarios"].get(name)
+        if old_scenario is None:
+            continue
+        for endpoint, stats in scenario["endpoints"].items():
+            old = old_scenario["endpoints"].get(endpoint)
+            if old is None:
+                continue
+            changes = []
+            for key in ("p50_ms", "p95_ms", "p99_ms", "requests_per_s", "tokens_per_s"):
+                if key in stats and old.get(key):
+                    changes.append(f"{key}={stats[key]:g} ({(stats[key] / old[key] - 1) * 100:+.1f}%)")
+            print(f"  {name:18s} {endpoint:24s} " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="이미 실행 중인 서버 (지정하지 않으면 대체 모델로 main.py 실행)")
+    parser.add_argument("--tokenizer", help="--url 사용 시 tokens/s 계산용 토크나이저 경로")
+    parser.add_argument("--hidden-size", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--cache", action="store_true", help="서버 결과 캐시 사용 (기본: 비활성화)")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="서버 설정 덮어쓰기 (예: BATCH_SIZE=16)")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("predict=0.7,analyze-sentences=0.3"),
+                        help="엔드포인트 비율 (predict, analyze-sentences, predict-long)")
+    parser.add_argument("--trace", help="요청을 재생할 JSONL 파일")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="고정 동시성 시나리오당 요청 수")
+    parser.add_argument("--rate", type=float, nargs="*", default=[], help="고정 도착률 (req/s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="고정 도착률 시나리오 길이 (s)")
+    parser.add_argument("--warmup", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="loadtest_results.json")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process = None
+        if args.url:
+            base_url, tokenizer_path = args.url, args.tokenizer
+        else:
+            tokenizer_path = save_tiny_checkpoint(tmp, hidden_size=args.hidden_size, num_layers=args.layers)
+            log_file = open(os.path.join(tmp, "server.log"), "w")
+            process, base_url = start_server(tokenizer_path, args, log_file)
+        try:
+            scenarios = asyncio.run(run_all(args, base_url, TokenCounter(tokenizer_path)))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    meta = {
+        "commit": git_commit(),
+        "server": args.url or f"stand-in llama hidden={args.hidden_size} layers={args.layers}",
+        "server_env": sorted(args.server_env),
+        "cache": args.cache,
+        "mix": args.mix,
+        "trace": args.trace,
+        "seed": args.seed,
+        "cpu_count": os.cpu_count(),
+    }
+    results = {"meta": meta, "scenarios": scenarios}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+    print(f"saved {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
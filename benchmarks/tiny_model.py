@@ -0,0 +1,142 @@
+"""
+CPU에서 실행 가능한 작은 무작위 초기화 Llama 분류기
+
+KANANA-8B 없이 배치/스케줄링/캐시 등 추론 경로를 검증하고 벤치마크하기 위한 대체 모델입니다.
+"""
+import os
+import random
+import sys
+
+import torch
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+from transformers import LlamaConfig, LlamaForSequenceClassification, PreTrainedTokenizerFast
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+SAMPLE_SENTENCES = [
+    "인공지능 기술은 최근 몇 년 사이 급격하게 발전하였다.",
+    "이 문단은 위키피디아 문서의 일부를 발췌한 것이다.",
+    "조선 시대의 행정 구역은 팔도로 나뉘어 있었다.",
+    "해당 지역은 온화한 해양성 기후를 보이며 강수량이 많다.",
+    "그는 대학에서 물리학을 전공한 뒤 연구소에 들어갔다.",
+    "이러한 변화는 사회 전반에 걸쳐 큰 영향을 미쳤다.",
+    "경기는 연장전 끝에 홈 팀의 승리로 마무리되었다.",
+    "이 소설은 출간 직후 평단의 호평을 받았다.",
+    "강의 하류에는 넓은 평야가 펼쳐져 있어 농업이 발달하였다.",
+    "따라서 다양한 관점에서 문제를 검토할 필요가 있다.",
+    "첫 번째 앨범은 발매 일주일 만에 십만 장이 판매되었다.",
+    "이 건축물은 국가 지정 문화재로 등록되어 보호받고 있다.",
+]
+
+SPECIAL_TOKENS = ["<pad>", "<s>", "</s>", "<unk>"]
+
+
+def synthetic_paragraph(rng: random.Random, min_sentences: int = 1, max_sentences: int = 8) -> str:
+    """샘플 문장을 이어 붙인 한국어 문단 생성"""
+    n = rng.randint(min_sentences, max_sentences)
+    return " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(n))
+
+
+def synthetic_paragraph_of_length(rng: random.Random, target_chars: int) -> str:
+    """목표 글자 수에 맞춰 샘플 문장을 이어 붙인 문단 생성"""
+    sentences = []
+    length = 0
+    while length < target_chars:
+        sentence = rng.choice(SAMPLE_SENTENCES)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)[:max(target_chars, 1)]
+
+
+def sample_paragraph_lengths(rng: random.Random, n: int, max_chars: int = 4000) -> list[int]:
+    """학습 데이터 문단 길이 분포(중앙값 146자, 75% 243자)에 맞춘 log-normal 샘플"""
+    return [min(max(int(rng.lognormvariate(4.98, 0.76)), 3), max_chars) for _ in range(n)]
+
+
+def synthetic_document(rng: random.Random, n_paragraphs: int) -> str:
+    """빈 줄로 구분된 여러 문단으로 이루어진 문서 생성"""
+    return "\n\n".join(synthetic_paragraph(rng) for _ in range(n_paragraphs))
+
+
+def build_tokenizer(vocab_size: int = 512) -> PreTrainedTokenizerFast:
+    """샘플 문장으로 학습한 byte-level BPE 토크나이저"""
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=SPECIAL_TOKENS,
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+    )
+    tokenizer.train_from_iterator(SAMPLE_SENTENCES, trainer)
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        pad_token="<pad>",
+        bos_token="<s>",
+        eos_token="</s>",
+        unk_token="<unk>",
+    )
+
+
+def build_model(tokenizer, hidden_size: int = 64, num_layers: int = 2, seed: int = 0):
+    """무작위 초기화된 작은 LlamaForSequenceClassification"""
+    torch.manual_seed(seed)
+    config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=num_layers,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=8192,
+        pad_token_id=tokenizer.pad_token_id,
+        num_labels=2,
+    )
+    return LlamaForSequenceClassification(config).eval()
+
+
+def build_peft_model(base_model, r: int = 8, seed: int = 1):
+    """학습 스크립트와 같은 target_modules 의 LoRA 어댑터를 붙인 PEFT 모델 (무작위 초기화로 어댑터 효과가 0 이 아님)"""
+    from peft import LoraConfig, TaskType, get_peft_model
+
+    torch.manual_seed(seed)
+    lora_config = LoraConfig(
+        r=r,
+        lora_alpha=16,
+        lora_dropout=0.0,
+        task_type=TaskType.SEQ_CLS,
+        target_modules=["q_proj", "k_proj", "v_proj", "o_proj", "gate_proj", "up_proj", "down_proj"],
+        init_lora_weights=False,
+    )
+    return get_peft_model(base_model, lora_config).eval()
+
+
+def load_tiny_detector(detector=None, use_cache: bool = False, **model_kwargs):
+    """AITextDetector 에 작은 모델/토크나이저를 주입 (벤치마크 왜곡 방지를 위해 기본적으로 결과 캐시 비활성화)"""
+    from model import AITextDetector
+
+    detector = detector or AITextDetector()
+    detector.tokenizer = build_tokenizer()
+    detector.model = build_model(detector.tokenizer, **model_kwargs)
+    if not use_cache:
+        detector.cache = None
+    return detector
+
+
+def save_tiny_checkpoint(output_dir: str, hidden_size: int = 64, num_layers: int = 2, r: int = 8) -> str:
+    """base 모델 + LoRA 어댑터 + 토크나이저를 디스크에 저장하고 어댑터 경로 반환 (LORA_ADAPTER_PATH 로 서버 실행용)"""
+    base_dir = os.path.abspath(os.path.join(output_dir, "base"))
+    adapter_dir = os.path.abspath(os.path.join(output_dir, "adapter"))
+
+    tokenizer = build_tokenizer()
+    base_model = build_model(tokenizer, hidden_size=hidden_size, num_layers=num_layers)
+    base_model.save_pretrained(base_dir)
+    tokenizer.save_pretrained(base_dir)
+
+    peft_model = build_peft_model(base_model, r=r)
+    peft_model.peft_config["default"].base_model_name_or_path = base_dir
+    peft_model.save_pretrained(adapter_dir)
+    tokenizer.save_pretrained(adapter_dir)
+    return adapter_dir
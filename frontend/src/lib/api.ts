@@ -2,6 +2,15 @@ import axios from 'axios';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// 응답 단계: 1단계 경량 분류기 / 유사 문단의 이전 LLM 점수 재사용 / KANANA 모델
+export type AnswerStage = 'cascade' | 'near_duplicate' | 'llm';
+
+export const STAGE_LABELS: Record<AnswerStage, string> = {
+  cascade: 'CASCADE',
+  near_duplicate: 'NEAR-DUPLICATE',
+  llm: 'LLM',
+};
+
 export interface PredictRequest {
   text: string;
 }
@@ -12,29 +21,42 @@ export interface PredictResponse {
   prediction: string;
   confidence: string;
   char_count: number;
+  stage: AnswerStage;
 }
 
+// /api/health 는 항상 200 (status: 'healthy'), /api/ready 는 'loading' / 'saturated' 이면 503
 export interface HealthResponse {
-  status: string;
+  status: 'healthy' | 'ready' | 'loading' | 'saturated';
   model_loaded: boolean;
   gpu_available: boolean;
+  queue_tokens: number;
+  queue_requests: number;
+  queue_capacity_tokens: number;
+  queue_saturation: number;
+  saturated: boolean;
+  throughput_tokens_per_s: number | null;
 }
 
 export interface SentenceAnalysis {
   text: string;
   ai_probability: number;
+  stage: AnswerStage;
 }
 
 export interface OverallAnalysis {
   full_text_probability: number;
   prediction: string;
   confidence: string;
+  stage: AnswerStage;
 }
 
+export type AnalysisMode = 'independent' | 'single_pass';
+
 export interface SentenceAnalysisResponse {
   overall_analysis: OverallAnalysis;
   paragraph_analysis: SentenceAnalysis[];
   paragraph_average: number;
+  mode: AnalysisMode;
 }
 
 export const predictText = async (text: string): Promise<PredictResponse> => {
@@ -45,14 +67,74 @@ export const predictText = async (text: string): Promise<PredictResponse> => {
   return response.data;
 };
 
-export const analyzeSentences = async (text: string): Promise<SentenceAnalysisResponse> => {
+export const analyzeSentences = async (
+  text: string,
+  mode: AnalysisMode = 'independent'
+): Promise<SentenceAnalysisResponse> => {
   const response = await axios.post<SentenceAnalysisResponse>(
     `${API_BASE_URL}/api/analyze-sentences`,
-    { text }
+    { text, mode }
   );
   return response.data;
 };
 
+export interface StreamedParagraph extends SentenceAnalysis {
+  index: number;
+}
+
+export type AnalysisStreamEvent =
+  | { type: 'paragraphs'; items: StreamedParagraph[] }
+  | ({ type: 'overall' } & SentenceAnalysisResponse)
+  | { type: 'error'; detail: string };
+
+// 문단 점수를 길이 버킷 단위로 받아 onParagraphs 로 전달하고, 최종 결과(전체 평가 포함)를 반환
+export const analyzeSentencesStream = async (
+  text: string,
+  onParagraphs: (items: StreamedParagraph[]) => void,
+  mode: AnalysisMode = 'independent',
+  signal?: AbortSignal
+): Promise<SentenceAnalysisResponse> => {
+  const response = await fetch(`${API_BASE_URL}/api/analyze-sentences/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ text, mode }),
+    signal,
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Analysis stream failed: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+
+    const lines = buffer.split('\n');
+    buffer = lines.pop() ?? '';
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const event = JSON.parse(line) as AnalysisStreamEvent;
+      if (event.type === 'paragraphs') {
+        onParagraphs(event.items);
+      } else if (event.type === 'overall') {
+        return {
+          overall_analysis: event.overall_analysis,
+          paragraph_analysis: event.paragraph_analysis,
+          paragraph_average: event.paragraph_average,
+          mode: event.mode,
+        };
+      } else {
+        throw new Error(event.detail);
+      }
+    }
+    if (done) break;
+  }
+  throw new Error('Analysis stream ended without a result');
+};
+
 export const checkHealth = async (): Promise<HealthResponse> => {
   const response = await axios.get<HealthResponse>(`${API_BASE_URL}/api/health`);
   return response.data;
@@ -4,7 +4,7 @@ import { Textarea } from '@/components/ui/textarea';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Alert, AlertDescription } from '@/components/ui/alert';
 import { Progress } from '@/components/ui/progress';
-import { analyzeSentences } from '@/lib/api';
+import { analyzeSentences, STAGE_LABELS } from '@/lib/api';
 import type { SentenceAnalysisResponse } from '@/lib/api';
 
 interface HistoryItem {
@@ -181,6 +181,8 @@ export default function AnalyzePage() {
                     para.ai_probability > 0.65 || para.ai_probability < 0.35 ? 'MEDIUM' : 'LOW'
                   }
                 </span>
+                {/* 이전 버전 히스토리에는 stage 가 없을 수 있음 */}
+                {para.stage && <span>⚙ Stage: {STAGE_LABELS[para.stage]}</span>}
               </div>
             </div>
           );
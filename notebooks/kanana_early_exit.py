@@ -0,0 +1,118 @@
+# notebooks 폴더에서 실행되므로 cd 불필요
+# kanana_fold0.py 로 학습한 LoRA 어댑터(또는 병합 아티팩트)에 early exit probe 를 학습합니다.
+# backend 의 AITextDetector 로 모델을 로딩하므로 서빙과 같은 설정(.env / 환경변수)을 사용합니다.
+
+import os
+# 단일 GPU 사용 (GPU 0) - 스크립트 최상단에서 설정
+os.environ["CUDA_VISIBLE_DEVICES"] = "0"
+
+import sys
+sys.path.insert(0, "../backend")
+
+import json
+import random
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.metrics import roc_auc_score
+
+import data_io
+from config import settings
+from early_exit import CALIBRATION_Z, ProbeHeads, collect_features, evaluate
+from model import detector
+
+def seed_everything(seed):
+    random.seed(seed)
+    os.environ['PYTHONHASHSEED'] = str(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    torch.cuda.manual_seed(seed)
+
+SEED = 42
+seed_everything(SEED)
+
+# fold0 을 validation 으로 (kanana_fold0.py 와 동일), 나머지 fold 에서 probe 학습
+val_fold_idx = 0
+fold_paths = [data_io.find_table("../data/kfold_csv", f"fold{i}") for i in range(4)]  # .parquet, 없으면 .csv
+
+FOLD_VAL   = fold_paths[val_fold_idx]
+FOLD_TRAIN = [path for idx, path in enumerate(fold_paths) if idx != val_fold_idx]
+
+# KANANA-1.5-8B 는 32 layer - 중간 이후 layer 에만 probe (앞쪽 layer 는 확신 구간이 거의 없음)
+PROBE_LAYERS     = [11, 15, 19, 23, 27]
+MAX_TRAIN_SAMPLES = 20000   # probe 학습 + 임계값 calibration 에 쓸 train fold 샘플 수
+CALIB_FRACTION   = 0.25     # 그중 임계값 조정용 (probe 학습에 쓰지 않음)
+TARGET_AGREEMENT = 0.99     # 종료 구간에서 전체 모델 판정과의 최소 일치율 (calibration 셋 Wilson 하한 기준)
+BATCH_SIZE       = 8
+MAX_LENGTH       = settings.MAX_TEXT_LENGTH  # 서빙 / 학습 기본 truncation 길이
+
+PROBES_PATH = "../models/early_exit/probes.pt"
+REPORT_PATH = "../outputs/early_exit/report_fold0.json"
+
+# probe 학습에는 텍스트/라벨 열만 필요
+FOLD_COLUMNS = ["full_text", "generated"]
+train_df = pd.concat(
+    [data_io.read_table(p, FOLD_COLUMNS) for p in FOLD_TRAIN],
+    ignore_index=True
+)
+val_df = data_io.read_table(FOLD_VAL, FOLD_COLUMNS)
+
+train_df = train_df.sample(n=min(MAX_TRAIN_SAMPLES, len(train_df)), random_state=SEED).reset_index(drop=True)
+n_calib = int(len(train_df) * CALIB_FRACTION)
+calib_df, fit_df = train_df.iloc[:n_calib], train_df.iloc[n_calib:]
+
+print("▶ Probe 학습 샘플 수:", len(fit_df))
+print("▶ Calibration 샘플 수:", len(calib_df))
+print("▶ 검증 샘플 수:", len(val_df))
+
+detector.load_model()
+model = detector.model
+tokenizer = detector.tokenizer
+backbone, head = detector._classifier_parts()
+num_layers = len(backbone.layers)
+print("▶ Decoder layers:", num_layers, " probe layers:", PROBE_LAYERS)
+
+def encode(texts):
+    return tokenizer(list(texts), truncation=True, max_length=MAX_LENGTH)["input_ids"]
+
+fit_ids   = encode(fit_df["full_text"])
+calib_ids = encode(calib_df["full_text"])
+val_ids   = encode(val_df["full_text"])
+
+# 1. layer 별 pooled hidden state + 전체 모델 확률 수집
+fit_features, fit_full = collect_features(model, tokenizer, fit_ids, PROBE_LAYERS, BATCH_SIZE)
+calib_features, calib_full = collect_features(model, tokenizer, calib_ids, PROBE_LAYERS, BATCH_SIZE)
+
+# 2. probe 는 전체 모델 판정을 따라가도록 학습 (목표는 라벨이 아니라 전체 모델과의 일치)
+probes = ProbeHeads.fit(
+    fit_features, (fit_full > 0.5).astype(int),
+    calib_features, (calib_full > 0.5).astype(int),
+    TARGET_AGREEMENT,
+    metadata={"val_fold": val_fold_idx, "target_agreement": TARGET_AGREEMENT, "calibration_z": CALIBRATION_Z, "max_length": MAX_LENGTH}
+)
+for layer, low, high in zip(probes.layers, probes.low, probes.high):
+    print(f"  layer {layer + 1:2d}: low={low:.4f} high={high:.4f}")
+
+# 3. 검증 fold 에서 전체 forward 와 비교
+report = evaluate(model, backbone, head, tokenizer, probes, val_ids, BATCH_SIZE)
+labels = val_df["generated"].to_numpy()
+report["val_auc_full"] = round(float(roc_auc_score(labels, report.pop("full_probs"))), 4)
+report["val_auc_early_exit"] = round(float(roc_auc_score(labels, report.pop("early_exit_probs"))), 4)
+report["layers"] = [layer + 1 for layer in probes.layers]
+
+print("▶ 평균 종료 깊이:", report["mean_exit_depth"], "/", num_layers)
+print("▶ 종료 분포:", report["exit_counts"])
+print("▶ 전체 모델 판정 일치율:", report["agreement"])
+print("▶ 지연 시간: full={full_seconds}s early_exit={early_exit_seconds}s (절감 {latency_saved:.1%})".format(**report))
+print("▶ Validation AUC: full={val_auc_full} early_exit={val_auc_early_exit}".format(**report))
+
+probes.metadata["report"] = report
+os.makedirs(os.path.dirname(PROBES_PATH), exist_ok=True)
+probes.save(PROBES_PATH)
+print("Probe 저장 완료:", PROBES_PATH)
+
+os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+with open(REPORT_PATH, "w", encoding="utf-8") as f:
+    json.dump(report, f, ensure_ascii=False, indent=2)
+print("리포트 저장 완료:", REPORT_PATH)
@@ -1,4 +1,8 @@
 # notebooks 폴더에서 실행되므로 cd 불필요
+# 학습 로직은 backend/train.py 모듈에 있습니다 (CLI: cd backend && python train.py --val-fold 0 --group-by-length)
+# fold / test 파일은 Parquet (data_preprocess.py 또는 preprocess.py 결과) - 토큰 id 열이 있으면 바로 사용하고,
+# 없으면 토큰화 결과를 ../data/tokenized 에 캐시해 다음 실행부터 memory map 으로 읽습니다.
+# 랜덤 배치 / length-grouped / packing 비교 (CPU, 작은 모델): python benchmarks/bench_train.py
 
 # requirements는 이미 설치되어 있으므로 생략
 # !pip install -r ../requirements.txt --extra-index-url https://download.pytorch.org/whl/cu124
@@ -7,234 +11,88 @@ import os
 # 단일 GPU 사용 (GPU 0) - 스크립트 최상단에서 설정
 os.environ["CUDA_VISIBLE_DEVICES"] = "0"
 
+import sys
+sys.path.insert(0, "../backend")
+
 import pandas as pd
-import numpy as np
-from datasets import Dataset, DatasetDict
-from transformers import AutoTokenizer
-from transformers import AutoModelForSequenceClassification, BitsAndBytesConfig
-from transformers import DataCollatorWithPadding, TrainingArguments, Trainer, TrainerCallback
-from transformers import pipeline
-import torch
-from peft import LoraConfig, TaskType, get_peft_model
-from sklearn.metrics import roc_auc_score
-import datetime as dt
-import random
-import re
-import os
-from tqdm import tqdm
-from torch.utils.data import DataLoader
-
-def seed_everything(seed):
-    random.seed(seed)
-    os.environ['PYTHONHASHSEED'] = str(seed)
-    np.random.seed(seed)
-    torch.manual_seed(seed)
-    torch.cuda.manual_seed(seed)
-    torch.backends.cudnn.deterministic = True
-    torch.backends.cudnn.benchmark = True
+
+import data_io
+import train
+from config import settings
+from train import TrainConfig
 
 SEED = 42
-seed_everything(SEED)
+train.seed_everything(SEED)
 
-# 전체 fold 파일 경로 리스트 (0~3) - notebooks 폴더 기준
+# 전체 fold 파일 경로 - notebooks 폴더 기준
 val_fold_idx = 0  # fold0을 validation으로, 나머지(1,2,3)가 train으로 사용
+FOLD_DIR = "../data/kfold_csv"
+N_FOLDS = 4
 
-fold_paths = [f"../data/kfold_csv/fold{i}.csv" for i in range(4)]
-
-FOLD_VAL   = fold_paths[val_fold_idx]
-FOLD_TRAIN = [path for idx, path in enumerate(fold_paths) if idx != val_fold_idx]
-
-print("▶ Train folds:", FOLD_TRAIN)
-print("▶ Validation fold:", FOLD_VAL)
-
-TEST_CSV        = "../data/kfold_csv/test_preprocessed.csv"
+TEST_PATH       = data_io.find_table(FOLD_DIR, "test_preprocessed")  # .parquet (없으면 --format csv / 이전 전처리의 .csv)
 SUBMISSION_CSV  = "../data/kfold_csv/sample_submission.csv"
-
-train_df = pd.concat(
-    [pd.read_csv(p, encoding="utf-8-sig") for p in FOLD_TRAIN],
-    ignore_index=True
-)
-
-val_df   = pd.read_csv(FOLD_VAL, encoding="utf-8-sig")
-
-train_df = train_df[['full_text', 'generated']].rename(
-    columns={'full_text':'text', 'generated':'label'}
-)
-val_df   = val_df  [['full_text', 'generated']].rename(
-    columns={'full_text':'text', 'generated':'label'}
-)
-
-train_df = train_df.sample(frac=1, random_state=SEED).reset_index(drop=True)
-
-print("최종 학습 샘플 수:", len(train_df))
-print("최종 학습 클래스 분포:", train_df['label'].value_counts().to_dict())
-print("검증 샘플 수:", len(val_df))
-print("검증 클래스 분포:", val_df['label'].value_counts().to_dict())
-
-train_dataset = Dataset.from_pandas(train_df)
-val_dataset   = Dataset.from_pandas(val_df)
+TOKEN_CACHE_DIR = "../data/tokenized"
+MAX_LENGTH      = settings.MAX_TEXT_LENGTH  # 서빙과 같은 truncation 길이 (packing 이면 512 등 짧은 행 길이로)
+CHECKPOINT_DIR  = "../models/checkpoints/kanana"
 
 MODEL_NAME = "kakaocorp/kanana-1.5-8b-instruct-2505"
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-
-def tokenize_function(example):
-    return tokenizer(example["text"], truncation=True)
-
-train_dataset = train_dataset.map(tokenize_function, batched=True)
-val_dataset = val_dataset.map(tokenize_function, batched=True)
-
-train_dataset = train_dataset.remove_columns(["text"])
-val_dataset = val_dataset.remove_columns(["text"])
-
-train_dataset = train_dataset.rename_column("label", "labels")
-val_dataset   = val_dataset.rename_column("label", "labels")
-
-data_collator = DataCollatorWithPadding(tokenizer, padding=True)
-
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+tokenizer = train.load_tokenizer(MODEL_NAME)
 
-bnb_config = BitsAndBytesConfig(
-    load_in_4bit=True,
-    bnb_4bit_compute_dtype=torch.bfloat16,
-    bnb_4bit_quant_type="nf4",
-    bnb_4bit_use_double_quant=True
-)
+train_fold, val_fold = train.load_folds(FOLD_DIR, N_FOLDS, val_fold_idx, tokenizer, MAX_LENGTH, TOKEN_CACHE_DIR)
 
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, num_labels=2, quantization_config=bnb_config, torch_dtype=torch.bfloat16)
-model.to(device)
+print("▶ Validation fold:", val_fold_idx)
+print("최종 학습 샘플 수:", len(train_fold))
+print("최종 학습 클래스 분포:", pd.Series(train_fold.labels).value_counts().to_dict())
+print("검증 샘플 수:", len(val_fold))
+print("검증 클래스 분포:", pd.Series(val_fold.labels).value_counts().to_dict())
 
 R = 32
 LORA_ALPHA = 16
 LORA_DROPOUT = 0.1
-lora_config = LoraConfig(
-    r=R,
-    lora_alpha=LORA_ALPHA,
-    lora_dropout=LORA_DROPOUT,
-    task_type=TaskType.SEQ_CLS,
-    target_modules= ["q_proj","k_proj","v_proj","o_proj","gate_proj","up_proj","down_proj"]
-)
-
-model = get_peft_model(model, lora_config)
 
+model = train.load_base_model(MODEL_NAME, tokenizer)
+model = train.attach_lora(model, R, LORA_ALPHA, LORA_DROPOUT)
 model.print_trainable_parameters()
 
-def compute_metrics(eval_pred):
-    logits, labels = eval_pred
-    probs = logits[:, 1]
-    roc_auc = roc_auc_score(labels, probs)
-    return {"roc_auc": roc_auc}
-
-training_args = TrainingArguments(
-    output_dir="../models/checkpoints/kanana",
-    overwrite_output_dir=True,
+config = TrainConfig(
     learning_rate=2e-5,
-    per_device_train_batch_size=8,   # 6 → 8 (VRAM 여유)
-    per_device_eval_batch_size=8,
-    num_train_epochs=1,
-    eval_strategy="epoch",           # steps → epoch (검증 1회만)
-    save_strategy="epoch",
-    metric_for_best_model="roc_auc",
-    greater_is_better=True,
-    logging_strategy="steps",
-    logging_steps=1000,
-    logging_first_step=True,
-    save_total_limit=2,
-    seed=SEED,
-    dataloader_drop_last=False,
-    report_to="none",
-    label_names=["labels"]
-)
-
-trainer = Trainer(
-    model=model,
-    args=training_args,
-    train_dataset=train_dataset,
-    eval_dataset=val_dataset,
-    tokenizer=tokenizer,
-    data_collator=data_collator,
-    compute_metrics=compute_metrics,
+    batch_size=8,
+    eval_batch_size=8,
+    epochs=1,
+    group_by_length=True,   # 길이가 비슷한 문단끼리 배치 (패딩 감소)
+    packing=False,          # True: 여러 문단을 MAX_LENGTH 행에 이어 붙임 (batch_size 는 행 수)
+    log_steps=1000,
+    seed=SEED
 )
 
-trainer.train()
+# epoch 마다 loss, tokens/sec, 패딩 비율, 검증 AUC
+# epoch 마다 CHECKPOINT_DIR/checkpoint-{step} 에 어댑터 저장 (최근 2개 유지)
+history = train.train(model, train_fold, val_fold, config, tokenizer.pad_token_id, MAX_LENGTH, CHECKPOINT_DIR)
+for stats in history:
+    print(stats)
 
 output_dir = "../models/lora_adapters/kanana"
-trainer.model.save_pretrained(output_dir)
-tokenizer.save_pretrained(output_dir)
+train.save_adapter(model, tokenizer, output_dir, config, MAX_LENGTH, history)
 print("모델이 저장되었습니다:", output_dir)
 
-test_df = pd.read_csv(TEST_CSV, encoding='utf-8-sig')
-submission_df = pd.read_csv(SUBMISSION_CSV, encoding='utf-8-sig')
-
-print("테스트 샘플 수:", len(test_df))
-pred_probs = []
-
-trainer.model.eval()
-
-clf = pipeline(
-    "text-classification",
-    model=trainer.model,
-    tokenizer=tokenizer,
-    return_all_scores=True,
+# 테스트 예측 (길이순 배치)
+test_fold = train.load_tokenized_fold(
+    TEST_PATH, tokenizer, MAX_LENGTH, TOKEN_CACHE_DIR, text_column="paragraph_text", id_column="ID"
 )
+submission_df = pd.read_csv(SUBMISSION_CSV, encoding='utf-8-sig', usecols=["ID"])
+print("테스트 샘플 수:", len(test_fold))
 
-print("샘플 결과 예시:", clf(test_df['paragraph_text'][0]))
-
-for text in test_df['paragraph_text']:
-    scores = clf(text)[0]
-    prob_ai = None
-    for s in scores:
-        if s['label'] in ['LABEL_1', '1', 'generated']:
-            prob_ai = s['score']
-            break
-    if prob_ai is None:
-        prob_ai = scores[1]['score']
-    pred_probs.append(prob_ai)
-
-submission_df['generated'] = pred_probs
+submission_df['generated'] = train.predict(model, test_fold, config.eval_batch_size, tokenizer.pad_token_id)
 
 submission_df
 
-import os
 os.makedirs("../outputs/ensemble", exist_ok=True)
 submission_df.to_csv("../outputs/ensemble/test_kanana_pred.csv", index=False, encoding="utf-8-sig")
 print("Test 예측 저장 완료: ../outputs/ensemble/test_kanana_pred.csv")
 
-def tokenize_test(batch):
-    return tokenizer(batch["text"], truncation=True)
-
-val_ds = Dataset.from_pandas(val_df)
-
-val_ds = val_ds.map(tokenize_test, batched=True,
-                      remove_columns=["text", "label"])
-
-def collate(features):
-    batch = data_collator(features)
-    return batch
-
-BATCH_TEST = 6
-
-loader = DataLoader(
-    val_ds,
-    batch_size=BATCH_TEST,
-    shuffle=False,
-    collate_fn=collate,
-    pin_memory=True,
-)
-
-probs_list = []
-
-with torch.no_grad():
-    for batch in tqdm(loader):
-        batch = {k: v.to(device) for k, v in batch.items()}
-        logits = trainer.model(**batch).logits
-        probs  = torch.softmax(logits, dim=-1)[:, 1]
-        probs_list.append(probs.cpu())
-
-probs = torch.cat(probs_list).to(torch.float32).numpy()
+probs = train.predict(model, val_fold, config.eval_batch_size, tokenizer.pad_token_id)
 print(f"Inference done – {len(probs)} samples")
 
-val_df['generated'] = probs
-val_df['ID'] = pd.read_csv(FOLD_VAL, encoding="utf-8-sig")['id']
-val_df = val_df[['ID', 'generated', 'label']]
-val_df.to_csv("../outputs/ensemble/val_kanana_pred.csv", index=False, encoding="utf-8-sig")
-print("Validation 예측 저장 완료: ../outputs/ensemble/val_kanana_pred.csv")
+val_df = pd.DataFrame({"ID": val_fold.ids, "generated": probs, "label": val_fold.labels})
+val_df.to_parquet("../outputs/ensemble/val_kanana_pred.parquet", index=False)
+print("Validation 예측 저장 완료: ../outputs/ensemble/val_kanana_pred.parquet")
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# backend 모듈과 benchmarks/tiny_model.py (작은 Llama + LoRA 모델) 를 import 할 수 있도록
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "backend"), os.path.join(ROOT, "benchmarks")]
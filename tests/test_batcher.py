@@ -0,0 +1,114 @@
+"""MicroBatcher - 동시 요청을 묶은 결과가 한 건씩 추론한 결과와 같은지, 길이 버킷 / MAX_BATCH_TOKENS 분할 / 마감 시간 제거"""
+import asyncio
+import random
+import time
+
+import pytest
+
+from tiny_model import load_tiny_detector, synthetic_paragraph_of_length
+
+from batcher import MicroBatcher
+from config import settings
+from executor import DeadlineExceeded, InferenceExecutor
+
+TOLERANCE = 1e-5
+
+
+@pytest.fixture(scope="module")
+def tiny_detector():
+    return load_tiny_detector(hidden_size=64, num_layers=2)
+
+
+@pytest.fixture(scope="module")
+def texts():
+    rng = random.Random(0)
+    return [synthetic_paragraph_of_length(rng, rng.choice([20, 80, 300, 900])) for _ in range(24)]
+
+
+@pytest.fixture
+def recorded_batches(tiny_detector, monkeypatch):
+    """score_ids_per_adapter 에 들어간 배치 (토큰 ID 리스트) 기록"""
+    batches = []
+    score = tiny_detector.score_ids_per_adapter
+
+    def record(batch_ids, deadline=None):
+        batches.append(batch_ids)
+        return score(batch_ids, deadline)
+
+    monkeypatch.setattr(tiny_detector, "score_ids_per_adapter", record)
+    return batches
+
+
+async def with_batcher(detector, run, max_batch_size: int = 64, max_wait_ms: float = 50.0):
+    executor = InferenceExecutor(1)
+    executor.start()
+    batcher = MicroBatcher(detector, executor, max_batch_size, max_wait_ms)
+    await batcher.start()
+    try:
+        return await run(batcher)
+    finally:
+        await batcher.stop()
+        executor.shutdown()
+
+
+def test_batched_matches_unbatched(tiny_detector, texts, recorded_batches):
+    """길이가 섞인 동시 요청 - 묶어서 추론해도 요청별 단독 forward 와 같은 확률"""
+    expected = [tiny_detector.score_ids([ids])[0] for ids in tiny_detector.encode(texts)]
+    recorded_batches.clear()
+
+    results = asyncio.run(with_batcher(
+        tiny_detector, lambda batcher: asyncio.gather(*(batcher.submit(text) for text in texts))
+    ))
+    assert len(recorded_batches) < len(texts)  # 실제로 묶였는지
+    diff = max(abs(p - e) for (p, _), e in zip(results, expected))
+    assert diff <= TOLERANCE, f"max |prob diff| {diff:.2e} > {TOLERANCE:.0e}"
+
+
+def test_buckets_respect_max_batch_tokens(tiny_detector, texts, recorded_batches, monkeypatch):
+    """배치마다 패딩 포함 토큰 수 (항목 수 x 최대 길이) 가 MAX_BATCH_TOKENS 이하 (단독으로 넘는 항목 제외), 길이순 버킷"""
+    monkeypatch.setattr(settings, "MAX_BATCH_TOKENS", 1024)
+    input_ids = tiny_detector.encode(texts)
+
+    results = asyncio.run(with_batcher(
+        tiny_detector, lambda batcher: asyncio.gather(*(batcher.submit_ids(ids) for ids in input_ids))
+    ))
+    assert len(results) == len(texts)
+    assert sorted(len(ids) for batch in recorded_batches for ids in batch) == sorted(map(len, input_ids))
+    assert len(recorded_batches) > 1
+    for batch in recorded_batches:
+        lengths = [len(ids) for ids in batch]
+        assert len(batch) == 1 or len(batch) * max(lengths) <= settings.MAX_BATCH_TOKENS
+    # 길이순으로 잘라 만든 버킷이므로 버킷끼리 길이 구간이 겹치지 않음
+    spans = sorted((min(map(len, batch)), max(map(len, batch))) for batch in recorded_batches)
+    assert all(prev[1] <= cur[0] for prev, cur in zip(spans, spans[1:]))
+
+
+def test_max_batch_size(tiny_detector, texts, recorded_batches):
+    input_ids = tiny_detector.encode(texts)
+    asyncio.run(with_batcher(
+        tiny_detector, lambda batcher: asyncio.gather(*(batcher.submit_ids(ids) for ids in input_ids)),
+        max_batch_size=5
+    ))
+    assert max(len(batch) for batch in recorded_batches) <= 5
+
+
+def test_expired_requests_are_dropped(tiny_detector, texts, recorded_batches):
+    """마감 시간이 지난 요청은 DeadlineExceeded 로 끝나고 모델에 보내지 않음 (같은 배치의 나머지는 정상 처리)"""
+    input_ids = tiny_detector.encode(texts[:6])
+    expired = {1, 4}
+
+    async def run(batcher):
+        now = time.monotonic()
+        return await asyncio.gather(
+            *(batcher.submit_ids(ids, now - 1.0 if i in expired else now + 60.0) for i, ids in enumerate(input_ids)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(with_batcher(tiny_detector, run))
+    for i, result in enumerate(results):
+        if i in expired:
+            assert isinstance(result, DeadlineExceeded)
+        else:
+            assert isinstance(result, float)
+    scored = sum(len(batch) for batch in recorded_batches)
+    assert scored == len(input_ids) - len(expired)
@@ -0,0 +1,53 @@
+"""CPU 백엔드 parity - 병합 fp32 / bf16 / dynamic int8 모델의 logits 가 PEFT (LoRA 미병합) 경로와 허용 오차 안에서 같은지"""
+import copy
+import random
+
+import pytest
+import torch
+
+from tiny_model import build_model, build_peft_model, build_tokenizer, synthetic_paragraph
+
+from model import prepare_cpu_model
+
+# (dtype, int8, logits 최대 절대 오차) - dynamic int8 은 activation 도 tensor 단위로 양자화하므로 오차가 가장 큼
+# (무작위 초기화 모델 기준 bf16 ~1e-2, int8 ~1.1e-1)
+BACKENDS = {
+    "cpu_fp32": (torch.float32, False, 1e-4),
+    "cpu_bf16": (torch.bfloat16, False, 5e-2),
+    "cpu_int8": (torch.float32, True, 1.5e-1),
+}
+
+
+def logits(model, inputs: dict) -> torch.Tensor:
+    with torch.no_grad():
+        return model(**inputs).logits.float()
+
+
+@pytest.fixture(scope="module")
+def peft_model_and_inputs():
+    tokenizer = build_tokenizer()
+    peft_model = build_peft_model(build_model(tokenizer, hidden_size=256, num_layers=2))
+    rng = random.Random(0)
+    texts = [synthetic_paragraph(rng) for _ in range(16)]
+    # 오른쪽 패딩 배치 - 분류 헤드는 pad 가 아닌 마지막 토큰에서 pooling
+    inputs = tokenizer(texts, padding=True, return_tensors="pt", return_token_type_ids=False)
+    return peft_model, inputs
+
+
+def test_lora_changes_logits(peft_model_and_inputs):
+    """parity 비교가 의미 있도록 어댑터가 base 모델 logits 를 허용 오차보다 크게 바꾸는지"""
+    peft_model, inputs = peft_model_and_inputs
+    with peft_model.disable_adapter():
+        base = logits(peft_model, inputs)
+    assert (logits(peft_model, inputs) - base).abs().max().item() > BACKENDS["cpu_int8"][2]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_cpu_backend_matches_peft(peft_model_and_inputs, backend):
+    peft_model, inputs = peft_model_and_inputs
+    dtype, int8, tolerance = BACKENDS[backend]
+    reference = logits(peft_model, inputs)
+
+    model = prepare_cpu_model(copy.deepcopy(peft_model), dtype, int8)
+    diff = (logits(model, inputs) - reference).abs().max().item()
+    assert diff <= tolerance, f"{backend}: max |logit diff| {diff:.2e} > {tolerance:.0e}"
@@ -0,0 +1,79 @@
+"""train.py packing - 한 행에 이어 붙인 문단이 서로 attention 하지 않고 (block-diagonal causal mask), 문단별 forward 와 같은 logits 인지"""
+import random
+
+import numpy as np
+import pytest
+import torch
+
+from tiny_model import build_model, build_tokenizer, synthetic_paragraph
+
+import train
+
+TOLERANCE = 1e-5
+
+
+@pytest.fixture(scope="module")
+def model_and_fold():
+    tokenizer = build_tokenizer()
+    model = build_model(tokenizer, hidden_size=64, num_layers=2)
+    model.eval()
+    rng = random.Random(0)
+    texts = [synthetic_paragraph(rng, 1, 4) for _ in range(5)]
+    fold = train.TokenizedFold.from_texts(texts, [0, 1, 0, 1, 1], [str(i) for i in range(5)], tokenizer, 512)
+    return model, fold, tokenizer.pad_token_id
+
+
+def separate_logits(model, fold: train.TokenizedFold, indices: list[int], pad_token_id: int) -> torch.Tensor:
+    """문단마다 패딩 없이 따로 forward"""
+    with torch.no_grad():
+        return torch.cat([train.classify(model, train.collate(fold, [i], pad_token_id)) for i in indices])
+
+
+def test_packed_batch_layout(model_and_fold):
+    """position_ids 는 문단마다 0 부터, 문단 끝 위치 / 라벨 / 패딩이 행 배치와 일치"""
+    _, fold, pad_token_id = model_and_fold
+    rows = [[0, 1, 2], [3, 4]]
+    batch = train.collate_packed(fold, rows, pad_token_id)
+
+    lengths = fold.lengths
+    for r, row in enumerate(rows):
+        expected = np.concatenate([np.arange(lengths[i]) for i in row])
+        assert batch["position_ids"][r, :len(expected)].tolist() == expected.tolist()
+        assert batch["input_ids"][r, :len(expected)].tolist() == np.concatenate([fold[i] for i in row]).tolist()
+    assert batch["segment_rows"].tolist() == [0, 0, 0, 1, 1]
+    assert batch["segment_ends"].tolist() == [
+        lengths[0] - 1, lengths[0] + lengths[1] - 1, lengths[0] + lengths[1] + lengths[2] - 1,
+        lengths[3] - 1, lengths[3] + lengths[4] - 1
+    ]
+    assert batch["labels"].tolist() == [0, 1, 0, 1, 1]
+    assert batch["real_tokens"] == int(lengths.sum())
+
+
+def test_packed_mask_is_block_diagonal_causal(model_and_fold):
+    """query 는 같은 문단의 자기 위치 이하 key 만 봄 (mask 는 (행, 1, query, key))"""
+    _, fold, pad_token_id = model_and_fold
+    batch = train.collate_packed(fold, [[0, 1, 2]], pad_token_id)
+    allowed = (batch["attention_mask"][0, 0] == 0).numpy()
+    segment = np.concatenate([np.full(fold.lengths[i], k) for k, i in enumerate([0, 1, 2])])
+    n = len(segment)
+    expected = np.tril(np.ones((n, n), dtype=bool)) & (segment[:, None] == segment[None, :])
+    assert (allowed[:n, :n] == expected).all()
+
+
+def test_packed_logits_match_separate_forwards(model_and_fold):
+    model, fold, pad_token_id = model_and_fold
+    rows = [[0, 1, 2], [3, 4]]
+    with torch.no_grad():
+        packed = train.classify(model, train.collate_packed(fold, rows, pad_token_id))
+    separate = separate_logits(model, fold, [i for row in rows for i in row], pad_token_id)
+    diff = (packed - separate).abs().max().item()
+    assert diff <= TOLERANCE, f"max |logit diff| {diff:.2e} > {TOLERANCE:.0e}"
+
+
+def test_packed_segments_do_not_see_earlier_segments(model_and_fold):
+    """앞 문단을 바꿔도 뒤 문단의 logits 는 그대로 (문단 경계를 넘는 attention 이 없음)"""
+    model, fold, pad_token_id = model_and_fold
+    with torch.no_grad():
+        before = train.classify(model, train.collate_packed(fold, [[0, 2]], pad_token_id))
+        after = train.classify(model, train.collate_packed(fold, [[1, 2]], pad_token_id))
+    assert (before[1] - after[1]).abs().max().item() <= TOLERANCE
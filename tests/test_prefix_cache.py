@@ -0,0 +1,122 @@
+"""접두사 KV 캐시 - 캐시를 쓴 결과가 전체 forward (캐시 없음) 와 같은지 (한 건씩 / hit-miss 혼합 배치 / 왼쪽 패딩 / predict_prefixes)"""
+import random
+
+import pytest
+
+from tiny_model import SAMPLE_SENTENCES, load_tiny_detector, synthetic_document, synthetic_paragraph
+
+from model import AITextDetector
+from prefix_cache import PrefixKVCache
+
+TOLERANCE = 1e-5
+
+
+@pytest.fixture(scope="module")
+def tiny_detector():
+    return load_tiny_detector(hidden_size=64, num_layers=2)
+
+
+def cached_detector(baseline, max_bytes: int = 64 * 1024 ** 2, padding_side: str = "right"):
+    """baseline 과 같은 모델/토크나이저를 쓰고 PrefixKVCache 만 켠 detector"""
+    detector = AITextDetector()
+    detector.model = baseline.model
+    detector.tokenizer = baseline.tokenizer
+    detector.tokenizer.padding_side = padding_side
+    detector.cache = None
+    detector.prefix_cache = PrefixKVCache(max_bytes, min_tokens=16)
+    return detector
+
+
+def uncached_scores(detector, batch_ids: list[list[int]]) -> list[float]:
+    """캐시 없이 한 건씩 (패딩 없는) forward"""
+    prefix_cache, detector.prefix_cache = detector.prefix_cache, None
+    try:
+        return [detector.score_ids([ids])[0] for ids in batch_ids]
+    finally:
+        detector.prefix_cache = prefix_cache
+
+
+def edit_trace(rng: random.Random, documents: int = 4, edits: int = 4) -> list[str]:
+    """문서마다 처음 제출 후 끝에 문장을 추가하거나 마지막 문장을 바꿔 다시 제출"""
+    trace = []
+    for _ in range(documents):
+        text = synthetic_document(rng, 3)
+        trace.append(text)
+        for _ in range(edits):
+            if rng.random() < 0.6:
+                text = text + " " + rng.choice(SAMPLE_SENTENCES)
+            else:
+                text = text.rsplit(" ", 1)[0] + " " + rng.choice(SAMPLE_SENTENCES)
+            trace.append(text)
+    return trace
+
+
+def assert_close(expected: list[float], actual: list[float]):
+    diff = max(abs(a - b) for a, b in zip(expected, actual))
+    assert diff <= TOLERANCE, f"max |prob diff| {diff:.2e} > {TOLERANCE:.0e}"
+
+
+@pytest.fixture(scope="module")
+def trace_ids(tiny_detector):
+    return tiny_detector.encode(edit_trace(random.Random(0)))
+
+
+def test_single_requests_match(tiny_detector, trace_ids):
+    """한 건씩 재제출 - hit 은 공통 접두사 이후 토큰만 forward"""
+    detector = cached_detector(tiny_detector)
+    actual = [detector.score_ids([ids])[0] for ids in trace_ids]
+    assert detector.prefix_cache.stats()["hits"] > 0
+    assert_close(uncached_scores(tiny_detector, trace_ids), actual)
+
+
+def test_identical_resubmit_matches(tiny_detector, trace_ids):
+    """같은 시퀀스 재제출 - 마지막 1 토큰만 forward"""
+    detector = cached_detector(tiny_detector)
+    detector.score_ids(trace_ids[:4])
+    actual = [detector.score_ids([ids])[0] for ids in trace_ids[:4]]
+    assert detector.prefix_cache.stats()["hits"] == 4
+    assert_close(uncached_scores(tiny_detector, trace_ids[:4]), actual)
+
+
+@pytest.mark.parametrize("padding_side", ["right", "left"])
+def test_mixed_batches_match(tiny_detector, trace_ids, padding_side):
+    """hit / miss 가 섞인 배치 - miss 는 패딩된 배치 한 번으로 forward 한 뒤 KV 저장"""
+    detector = cached_detector(tiny_detector, padding_side=padding_side)
+    try:
+        expected = uncached_scores(detector, trace_ids)
+        actual = []
+        for start in range(0, len(trace_ids), 5):
+            actual.extend(detector.score_ids(trace_ids[start:start + 5]))
+    finally:
+        tiny_detector.tokenizer.padding_side = "right"
+    stats = detector.prefix_cache.stats()
+    assert stats["hits"] > 0 and stats["misses"] > 0
+    assert_close(expected, actual)
+
+
+def test_small_max_bytes_matches(tiny_detector, trace_ids):
+    """메모리 상한이 항목 하나 크기 정도면 계속 제거되지만 결과는 같고 상한을 넘지 않음"""
+    detector = cached_detector(tiny_detector)
+    detector.score_ids([trace_ids[0]])
+    detector.prefix_cache = PrefixKVCache(detector.prefix_cache.bytes, min_tokens=16)
+    actual = [detector.score_ids([ids])[0] for ids in trace_ids]
+    assert detector.prefix_cache.bytes <= detector.prefix_cache.max_bytes
+    assert_close(uncached_scores(tiny_detector, trace_ids), actual)
+
+
+def test_predict_prefixes_matches_cached_scores(tiny_detector):
+    """predict_prefixes (전체 텍스트 한 번 forward) 의 문단 prefix 점수가 캐시를 거친 접두사 채점과 같은지"""
+    rng = random.Random(1)
+    paragraphs = [synthetic_paragraph(rng, 3) for _ in range(4)]
+    text = "\n\n".join(paragraphs)
+    char_ends = [len("\n\n".join(paragraphs[:k + 1])) for k in range(len(paragraphs))]
+
+    detector = cached_detector(tiny_detector)
+    # 앞 문단까지의 접두사를 순서대로 채점 - 두 번째부터는 이전 접두사의 KV 를 재사용
+    prefix_ids = detector.encode([text[:end] for end in char_ends])
+    cached = [detector.score_ids([ids])[0] for ids in prefix_ids]
+    assert detector.prefix_cache.stats()["hits"] == len(paragraphs) - 1
+
+    overall, paragraph_probs = detector.predict_prefixes(text, char_ends)
+    assert abs(overall - cached[-1]) <= TOLERANCE
+    assert max(abs(a - b) for a, b in zip(paragraph_probs, cached)) <= 5e-5 + TOLERANCE